@@ -1,148 +1,266 @@
-#!/usr/bin/env python3
-"""
-Installationsskript für EasyOCR und die benötigten Sprachmodelle.
-Dieses Skript sollte in der virtuellen Umgebung ausgeführt werden.
-"""
-
-import subprocess
-import sys
-import os
-import easyocr
-
-def install_easyocr():
-    """Installiert EasyOCR und Abhängigkeiten."""
-    print("=== EasyOCR Installation ===")
-    
-    # Installiere EasyOCR und OpenCV
-    packages = [
-        "easyocr",
-        "opencv-python", 
-        "Pillow",
-        "numpy"
-    ]
-    
-    for package in packages:
-        print(f"Installiere {package}...")
-        try:
-            subprocess.check_call([
-                sys.executable, "-m", "pip", "install", 
-                "--no-cache-dir", package
-            ])
-            print(f"✓ {package} erfolgreich installiert")
-        except subprocess.CalledProcessError as e:
-            print(f"✗ Fehler beim Installieren von {package}: {e}")
-            return False
-    
-    return True
-
-def download_models():
-    """Lädt die EasyOCR-Modelle in den Projektordner herunter."""
-    print("\n=== EasyOCR Modelle Download ===")
-    
-    # Bestimme den Modellordner im Projekt
-    project_dir = os.path.dirname(os.path.abspath(__file__))
-    model_dir = os.path.join(project_dir, 'config', 'easyocr_models')
-    
-    # Erstelle den Ordner falls er nicht existiert
-    os.makedirs(model_dir, exist_ok=True)
-    print(f"Modellordner: {model_dir}")
-    
-    # Lösche eventuell vorhandene Modelle
-    for file in os.listdir(model_dir):
-        if file.endswith('.pth'):
-            os.remove(os.path.join(model_dir, file))
-            print(f"Alte Modelldatei gelöscht: {file}")
-    
-    try:
-        print("Initialisiere EasyOCR Reader und lade Modelle herunter...")
-        print("Dies kann einige Minuten dauern...")
-        
-        # Sprachenliste für deutsche, italienische, französische und englische Texte
-        # 'latin' wird nicht unterstützt, verwende 'en' für lateinische Buchstaben
-        languages = ['de', 'it', 'fr', 'en']
-        
-        # Initialisiere Reader mit Download in den Projektordner
-        # Bei der ersten Initialisierung lädt EasyOCR automatisch die Modelle herunter
-        reader = easyocr.Reader(
-            languages,
-            gpu=False,  # Keine GPU verwenden
-            model_storage_directory=model_dir
-        )
-        
-        print("✓ EasyOCR Reader erfolgreich initialisiert")
-        print("✓ Modelle erfolgreich heruntergeladen")
-        
-        # Prüfe, welche Modelle heruntergeladen wurden
-        model_files = [f for f in os.listdir(model_dir) if f.endswith('.pth')]
-        print(f"Heruntergeladene Modelle ({len(model_files)}):")
-        for model_file in model_files:
-            print(f"  - {model_file}")
-        
-        return True
-        
-    except Exception as e:
-        print(f"✗ Fehler beim Herunterladen der Modelle: {e}")
-        return False
-
-def test_installation():
-    """Testet die EasyOCR-Installation."""
-    print("\n=== Installation Test ===")
-    
-    try:
-        import easyocr
-        print("✓ EasyOCR Import erfolgreich")
-        
-        # Teste Reader-Initialisierung
-        model_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config', 'easyocr_models')
-        
-        reader = easyocr.Reader(
-            ['de', 'it', 'fr', 'en'],
-            gpu=False,
-            model_storage_directory=model_dir
-        )
-        
-        print("✓ EasyOCR Reader erfolgreich initialisiert")
-        print("✓ Installation vollständig und funktionsfähig")
-        return True
-        
-    except Exception as e:
-        print(f"✗ Fehler beim Testen der Installation: {e}")
-        return False
-
-def main():
-    """Hauptfunktion für die Installation."""
-    print("EasyOCR Installation für PDF Code Comparator")
-    print("=" * 50)
-    
-    # Prüfe Python-Version
-    if sys.version_info < (3, 7):
-        print("✗ Python 3.7 oder höher erforderlich")
-        return False
-    
-    print(f"✓ Python Version: {sys.version}")
-    
-    # Installiere EasyOCR
-    if not install_easyocr():
-        print("✗ EasyOCR Installation fehlgeschlagen")
-        return False
-    
-    # Lade Modelle herunter
-    if not download_models():
-        print("✗ Modell-Download fehlgeschlagen")
-        return False
-    
-    # Teste Installation
-    if not test_installation():
-        print("✗ Installationstest fehlgeschlagen")
-        return False
-    
-    print("\n" + "=" * 50)
-    print("✓ EasyOCR Installation erfolgreich abgeschlossen!")
-    print("Sie können jetzt das Hauptprogramm starten mit:")
-    print("python -m src.main")
-    
-    return True
-
-if __name__ == "__main__":
-    success = main()
+#!/usr/bin/env python3
+"""
+Installationsskript für EasyOCR und die benötigten Sprachmodelle.
+Dieses Skript sollte in der virtuellen Umgebung ausgeführt werden.
+"""
+
+import subprocess
+import sys
+import threading
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# HINWEIS: easyocr wird bewusst NICHT auf Modulebene importiert. Der Import
+# zieht torch/torchvision/scipy nach sich (mehrere Sekunden) und würde vor
+# der eigentlichen Installation ohnehin fehlschlagen. Stattdessen importieren
+# die Funktionen, die easyocr benötigen, es lokal.
+
+# Gemeinsamer Wheel-Cache für alle install_*.py-Skripte - Wiederholungsläufe
+# und die überlappenden Paketlisten der Skripte laden so nichts doppelt herunter
+PIP_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".pip-cache")
+
+PIP_BASE_ARGS = [
+    "-m", "pip", "install",
+    "--cache-dir", PIP_CACHE_DIR, "--prefer-binary",
+    "--disable-pip-version-check", "--no-input", "-q"
+]
+
+# Hält die Ausgabe parallel laufender pip-Prozesse zeilenweise zusammen
+_print_lock = threading.Lock()
+
+def _pip_install_streamed(args, prefix=""):
+    """
+    Führt pip über Popen aus und reicht dessen Ausgabe zeilenweise sofort
+    durch, statt bis zum Prozessende zu blockieren. So bleibt der Fortschritt
+    auch bei langen Installationen sichtbar.
+    """
+    process = subprocess.Popen(
+        args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+        text=True, bufsize=1
+    )
+    for line in process.stdout:
+        with _print_lock:
+            print(f"{prefix}{line}", end='')
+    return process.wait()
+
+def _pip_install_many(packages):
+    """
+    Installiert mehrere Pakete über einen einzigen gebündelten pip-Aufruf.
+    Das spart N-1 Interpreter-Starts plus Versions-Checks und lässt pip den
+    Abhängigkeitsgraphen über alle Pakete teilen. Nur im Fehlerfall werden
+    die Pakete einzeln (parallel) installiert, um den Verursacher zu finden.
+    """
+    returncode = _pip_install_streamed([sys.executable, *PIP_BASE_ARGS, *packages])
+
+    if returncode == 0:
+        for package in packages:
+            print(f"✓ {package} erfolgreich installiert")
+        return True
+
+    print("✗ Gebündelte Installation fehlgeschlagen - versuche Pakete einzeln...")
+
+    max_workers = min(len(packages), os.cpu_count() or 4)
+    all_ok = True
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(
+                _pip_install_streamed,
+                [sys.executable, *PIP_BASE_ARGS, package],
+                prefix=f"[{package}] "
+            ): package
+            for package in packages
+        }
+
+        for future in as_completed(futures):
+            package = futures[future]
+            if future.result() == 0:
+                print(f"✓ {package} erfolgreich installiert")
+            else:
+                print(f"✗ Fehler beim Installieren von {package}")
+                all_ok = False
+
+    return all_ok
+
+def install_easyocr():
+    """Installiert EasyOCR und Abhängigkeiten."""
+    print("=== EasyOCR Installation ===")
+
+    # Installiere EasyOCR und OpenCV
+    packages = [
+        "easyocr",
+        "opencv-python",
+        "Pillow",
+        "numpy"
+    ]
+
+    print(f"Installiere parallel: {', '.join(packages)}...")
+    return _pip_install_many(packages)
+
+# Sprachenliste für deutsche, italienische, französische und englische Texte
+# 'latin' wird nicht unterstützt, verwende 'en' für lateinische Buchstaben
+LANGUAGES = ['de', 'it', 'fr', 'en']
+
+# Modelldateien, die EasyOCR für die obigen Sprachen benötigt
+# (deterministische Dateinamen: Erkennungsnetz + lateinisches Rekognitionsmodell)
+EXPECTED_MODEL_FILES = {'craft_mlt_25k.pth', 'latin_g2.pth'}
+
+# Einmal auf Modulebene berechnen - os.path.abspath kostet pro Aufruf einen
+# getcwd-Syscall, und der Pfad ändert sich zur Laufzeit nicht
+_PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+_MODEL_DIR = os.path.join(_PROJECT_DIR, 'config', 'easyocr_models')
+
+def _build_reader(model_dir):
+    """
+    Initialisiert den EasyOCR Reader. Jede Initialisierung lädt die
+    .pth-Modelle komplett in den Speicher — daher nur einmal aufrufen
+    und die Instanz weiterreichen.
+    """
+    import easyocr
+
+    # Alle vier Sprachen teilen sich dasselbe lateinische Rekognitionsmodell.
+    # Liegen die Modelle bereits lokal vor, den Download komplett deaktivieren -
+    # sonst prüft EasyOCR beim Init die Modell-URLs per HTTP für jede Sprache.
+    models_present = os.path.isdir(model_dir) and EXPECTED_MODEL_FILES.issubset(
+        {f for f in os.listdir(model_dir) if f.endswith('.pth')}
+    )
+
+    return easyocr.Reader(
+        LANGUAGES,
+        gpu=False,  # Keine GPU verwenden
+        model_storage_directory=model_dir,
+        detector=True,
+        recognizer=True,
+        download_enabled=not models_present
+    )
+
+def download_models(force_redownload=False):
+    """
+    Lädt die EasyOCR-Modelle in den Projektordner herunter.
+
+    Args:
+        force_redownload (bool): Löscht vorhandene Modelle und lädt sie neu
+                                 herunter (altes Verhalten, per
+                                 --force-redownload aktivierbar).
+
+    Returns:
+        easyocr.Reader: Der initialisierte Reader (zur Wiederverwendung im
+                        Installationstest) oder None im Fehlerfall.
+    """
+    print("\n=== EasyOCR Modelle Download ===")
+
+    # Bestimme den Modellordner im Projekt
+    model_dir = _MODEL_DIR
+
+    # Erstelle den Ordner falls er nicht existiert
+    os.makedirs(model_dir, exist_ok=True)
+    print(f"Modellordner: {model_dir}")
+
+    # os.scandir liefert DirEntry-Objekte mit gecachten Metadaten und spart
+    # gegenüber listdir + join die zusätzlichen stat-Aufrufe
+    with os.scandir(model_dir) as entries:
+        existing_models = [e for e in entries if e.name.endswith('.pth') and e.is_file()]
+
+    if not force_redownload and EXPECTED_MODEL_FILES.issubset({e.name for e in existing_models}):
+        # Alle benötigten Modelle sind bereits vorhanden - der Reader nutzt
+        # die lokalen Dateien, der erneute Download von mehreren hundert MB
+        # entfällt bei Wiederholungsläufen komplett.
+        print(f"Alle benötigten Modelle bereits vorhanden ({len(existing_models)} Dateien) - Download wird übersprungen")
+    else:
+        # Lösche eventuell vorhandene (unvollständige) Modelle
+        for entry in existing_models:
+            os.remove(entry.path)
+            print(f"Alte Modelldatei gelöscht: {entry.name}")
+
+    try:
+        print("Initialisiere EasyOCR Reader und lade Modelle herunter...")
+        print("Dies kann einige Minuten dauern...")
+
+        # Initialisiere Reader mit Download in den Projektordner
+        # Bei der ersten Initialisierung lädt EasyOCR automatisch die Modelle herunter
+        reader = _build_reader(model_dir)
+
+        print("✓ EasyOCR Reader erfolgreich initialisiert")
+        print("✓ Modelle erfolgreich heruntergeladen")
+        
+        # Prüfe, welche Modelle heruntergeladen wurden
+        with os.scandir(model_dir) as entries:
+            model_files = [e.name for e in entries if e.name.endswith('.pth') and e.is_file()]
+        print(f"Heruntergeladene Modelle ({len(model_files)}):")
+        for model_file in model_files:
+            print(f"  - {model_file}")
+
+        return reader
+
+    except Exception as e:
+        print(f"✗ Fehler beim Herunterladen der Modelle: {e}")
+        return None
+
+def test_installation(reader=None):
+    """
+    Testet die EasyOCR-Installation.
+
+    Args:
+        reader (easyocr.Reader): Bereits initialisierter Reader aus
+                                 download_models(). Nur wenn keiner übergeben
+                                 wird (Standalone-Aufruf), wird neu initialisiert.
+    """
+    print("\n=== Installation Test ===")
+
+    try:
+        import easyocr
+        print("✓ EasyOCR Import erfolgreich")
+
+        if reader is None:
+            # Teste Reader-Initialisierung (nur beim Standalone-Aufruf nötig)
+            reader = _build_reader(_MODEL_DIR)
+            print("✓ EasyOCR Reader erfolgreich initialisiert")
+        else:
+            print("✓ EasyOCR Reader aus Modell-Download wiederverwendet")
+
+        print("✓ Installation vollständig und funktionsfähig")
+        return True
+
+    except Exception as e:
+        print(f"✗ Fehler beim Testen der Installation: {e}")
+        return False
+
+def main():
+    """Hauptfunktion für die Installation."""
+    print("EasyOCR Installation für PDF Code Comparator")
+    print("=" * 50)
+    
+    # Prüfe Python-Version
+    if sys.version_info < (3, 7):
+        print("✗ Python 3.7 oder höher erforderlich")
+        return False
+    
+    print(f"✓ Python Version: {sys.version}")
+    
+    # Installiere EasyOCR
+    if not install_easyocr():
+        print("✗ EasyOCR Installation fehlgeschlagen")
+        return False
+    
+    # Lade Modelle herunter (liefert den initialisierten Reader zurück)
+    # Mit --force-redownload werden vorhandene Modelle verworfen und neu geladen
+    reader = download_models(force_redownload="--force-redownload" in sys.argv)
+    if reader is None:
+        print("✗ Modell-Download fehlgeschlagen")
+        return False
+
+    # Teste Installation (verwendet den Reader aus dem Download wieder)
+    if not test_installation(reader):
+        print("✗ Installationstest fehlgeschlagen")
+        return False
+    
+    print("\n" + "=" * 50)
+    print("✓ EasyOCR Installation erfolgreich abgeschlossen!")
+    print("Sie können jetzt das Hauptprogramm starten mit:")
+    print("python -m src.main")
+    
+    return True
+
+if __name__ == "__main__":
+    success = main()
     sys.exit(0 if success else 1)
\ No newline at end of file
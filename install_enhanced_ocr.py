@@ -1,112 +1,189 @@
-#!/usr/bin/env python3
-"""
-Installationsskript für erweiterte OCR-Abhängigkeiten.
-Installiert OpenCV und PIL für bessere Bildverarbeitung.
-"""
-
-import subprocess
-import sys
-import os
-
-def install_enhanced_ocr_dependencies():
-    """Installiert alle Abhängigkeiten für erweiterte OCR."""
-    print("=== Erweiterte OCR Abhängigkeiten Installation ===")
-    
-    packages = [
-        "opencv-python",
-        "Pillow",
-        "numpy",
-        "PyMuPDF",
-        "pandas", 
-        "openpyxl"
-    ]
-    
-    for package in packages:
-        print(f"Installiere {package}...")
-        try:
-            subprocess.check_call([
-                sys.executable, "-m", "pip", "install", 
-                "--no-cache-dir", package
-            ])
-            print(f"✓ {package} erfolgreich installiert")
-        except subprocess.CalledProcessError as e:
-            print(f"✗ Fehler beim Installieren von {package}: {e}")
-            return False
-    
-    return True
-
-def test_enhanced_ocr():
-    """Testet alle OCR-Abhängigkeiten."""
-    print("\n=== Test der erweiterten OCR ===")
-    
-    try:
-        # Teste OpenCV
-        import cv2
-        print(f"✓ OpenCV verfügbar: {cv2.__version__}")
-        
-        # Teste PIL
-        from PIL import Image, ImageEnhance
-        print("✓ PIL/Pillow verfügbar")
-        
-        # Teste NumPy
-        import numpy as np
-        print(f"✓ NumPy verfügbar: {np.__version__}")
-        
-        # Teste PyMuPDF
-        import fitz
-        print(f"✓ PyMuPDF verfügbar: {fitz.version}")
-        
-        # Teste Tesseract
-        result = subprocess.run(['tesseract', '--version'], 
-                              capture_output=True, text=True)
-        if result.returncode == 0:
-            version_line = result.stdout.split('\n')[0]
-            print(f"✓ Tesseract gefunden: {version_line}")
-        else:
-            print("✗ Tesseract nicht gefunden")
-            return False
-        
-        print("✓ Alle Abhängigkeiten für erweiterte OCR verfügbar")
-        return True
-        
-    except Exception as e:
-        print(f"✗ Fehler beim Testen: {e}")
-        return False
-
-def main():
-    """Hauptfunktion für die Installation."""
-    print("Erweiterte OCR Installation für PDF Code Comparator")
-    print("=" * 55)
-    
-    # Prüfe Python-Version
-    if sys.version_info < (3, 7):
-        print("✗ Python 3.7 oder höher erforderlich")
-        return False
-    
-    print(f"✓ Python Version: {sys.version}")
-    
-    # Installiere Abhängigkeiten
-    if not install_enhanced_ocr_dependencies():
-        print("✗ Installation fehlgeschlagen")
-        return False
-    
-    # Teste Installation
-    if not test_enhanced_ocr():
-        print("✗ Test fehlgeschlagen")
-        return False
-    
-    print("\n" + "=" * 55)
-    print("✓ Erweiterte OCR Installation erfolgreich!")
-    print("Das System nutzt jetzt:")
-    print("- Erweiterte Bildverbesserung mit OpenCV")
-    print("- Kontrast- und Schärfeverbesserung mit PIL")
-    print("- Rauschreduktion und adaptive Binarisierung")
-    print("- Optimierte Tesseract-Parameter")
-    print("\nSie können jetzt das Hauptprogramm starten mit:")
-    print("python -m src.main")
-    
-    return True
-
-if __name__ == "__main__":
-    success = main()
+#!/usr/bin/env python3
+"""
+Installationsskript für erweiterte OCR-Abhängigkeiten.
+Installiert OpenCV und PIL für bessere Bildverarbeitung.
+"""
+
+import subprocess
+import sys
+import threading
+import os
+import shutil
+import functools
+import contextlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Gemeinsamer Wheel-Cache für alle install_*.py-Skripte - Wiederholungsläufe
+# und die überlappenden Paketlisten der Skripte laden so nichts doppelt herunter
+PIP_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".pip-cache")
+
+PIP_BASE_ARGS = [
+    "-m", "pip", "install",
+    "--cache-dir", PIP_CACHE_DIR, "--prefer-binary",
+    "--disable-pip-version-check", "--no-input", "-q"
+]
+
+# Hält die Ausgabe parallel laufender pip-Prozesse zeilenweise zusammen
+_print_lock = threading.Lock()
+
+def _pip_install_streamed(args, prefix=""):
+    """
+    Führt pip über Popen aus und reicht dessen Ausgabe zeilenweise sofort
+    durch, statt bis zum Prozessende zu blockieren. So bleibt der Fortschritt
+    auch bei langen Installationen sichtbar.
+    """
+    process = subprocess.Popen(
+        args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+        text=True, bufsize=1
+    )
+    for line in process.stdout:
+        with _print_lock:
+            print(f"{prefix}{line}", end='')
+    return process.wait()
+
+def _pip_install_many(packages):
+    """
+    Installiert mehrere Pakete über einen einzigen gebündelten pip-Aufruf.
+    Das spart N-1 Interpreter-Starts plus Versions-Checks und lässt pip den
+    Abhängigkeitsgraphen über alle Pakete teilen. Nur im Fehlerfall werden
+    die Pakete einzeln (parallel) installiert, um den Verursacher zu finden.
+    """
+    returncode = _pip_install_streamed([sys.executable, *PIP_BASE_ARGS, *packages])
+
+    if returncode == 0:
+        for package in packages:
+            print(f"✓ {package} erfolgreich installiert")
+        return True
+
+    print("✗ Gebündelte Installation fehlgeschlagen - versuche Pakete einzeln...")
+
+    max_workers = min(len(packages), os.cpu_count() or 4)
+    all_ok = True
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(
+                _pip_install_streamed,
+                [sys.executable, *PIP_BASE_ARGS, package],
+                prefix=f"[{package}] "
+            ): package
+            for package in packages
+        }
+
+        for future in as_completed(futures):
+            package = futures[future]
+            if future.result() == 0:
+                print(f"✓ {package} erfolgreich installiert")
+            else:
+                print(f"✗ Fehler beim Installieren von {package}")
+                all_ok = False
+
+    return all_ok
+
+@functools.lru_cache(maxsize=None)
+def _tool_version(cmd):
+    """
+    Ermittelt die Versionsausgabe eines externen Tools und cached sie, damit
+    pro Installationslauf höchstens ein Prozess gestartet wird. shutil.which
+    dient als billiger Vorab-Check ohne Prozess-Spawn.
+    """
+    if shutil.which(cmd[0]) is None:
+        return None
+    # Gezielt nur die erwartbaren Fehler unterdrücken - kein bare except,
+    # damit KeyboardInterrupt/SystemExit durchgereicht werden
+    with contextlib.suppress(FileNotFoundError, subprocess.SubprocessError, OSError):
+        result = subprocess.run(list(cmd), capture_output=True, text=True)
+        if result.returncode == 0:
+            return result.stdout.strip()
+    return None
+
+def install_enhanced_ocr_dependencies():
+    """Installiert alle Abhängigkeiten für erweiterte OCR."""
+    print("=== Erweiterte OCR Abhängigkeiten Installation ===")
+
+    packages = [
+        "opencv-python",
+        "Pillow",
+        "numpy",
+        "PyMuPDF",
+        "pandas",
+        "openpyxl"
+    ]
+
+    print(f"Installiere parallel: {', '.join(packages)}...")
+    return _pip_install_many(packages)
+
+def test_enhanced_ocr():
+    """Testet alle OCR-Abhängigkeiten."""
+    print("\n=== Test der erweiterten OCR ===")
+    
+    try:
+        # Teste OpenCV
+        import cv2
+        print(f"✓ OpenCV verfügbar: {cv2.__version__}")
+        
+        # Teste PIL
+        from PIL import Image, ImageEnhance
+        print("✓ PIL/Pillow verfügbar")
+        
+        # Teste NumPy
+        import numpy as np
+        print(f"✓ NumPy verfügbar: {np.__version__}")
+        
+        # Teste PyMuPDF
+        import fitz
+        print(f"✓ PyMuPDF verfügbar: {fitz.version}")
+        
+        # Teste Tesseract (gecachte Erkennung, kein erneuter Prozess-Spawn)
+        tesseract_version = _tool_version(('tesseract', '--version'))
+        if tesseract_version:
+            version_line = tesseract_version.split('\n')[0]
+            print(f"✓ Tesseract gefunden: {version_line}")
+        else:
+            print("✗ Tesseract nicht gefunden")
+            return False
+        
+        print("✓ Alle Abhängigkeiten für erweiterte OCR verfügbar")
+        return True
+        
+    except Exception as e:
+        print(f"✗ Fehler beim Testen: {e}")
+        return False
+
+def main():
+    """Hauptfunktion für die Installation."""
+    print("Erweiterte OCR Installation für PDF Code Comparator")
+    print("=" * 55)
+    
+    # Prüfe Python-Version
+    if sys.version_info < (3, 7):
+        print("✗ Python 3.7 oder höher erforderlich")
+        return False
+    
+    print(f"✓ Python Version: {sys.version}")
+    
+    # Installiere Abhängigkeiten
+    if not install_enhanced_ocr_dependencies():
+        print("✗ Installation fehlgeschlagen")
+        return False
+    
+    # Teste Installation
+    if not test_enhanced_ocr():
+        print("✗ Test fehlgeschlagen")
+        return False
+    
+    print("\n" + "=" * 55)
+    print("✓ Erweiterte OCR Installation erfolgreich!")
+    print("Das System nutzt jetzt:")
+    print("- Erweiterte Bildverbesserung mit OpenCV")
+    print("- Kontrast- und Schärfeverbesserung mit PIL")
+    print("- Rauschreduktion und adaptive Binarisierung")
+    print("- Optimierte Tesseract-Parameter")
+    print("\nSie können jetzt das Hauptprogramm starten mit:")
+    print("python -m src.main")
+    
+    return True
+
+if __name__ == "__main__":
+    success = main()
     sys.exit(0 if success else 1)
\ No newline at end of file
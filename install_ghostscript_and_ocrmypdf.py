@@ -1,161 +1,261 @@
-#!/usr/bin/env python3
-"""
-Installationsskript für Ghostscript und OCRmyPDF.
-Dieses Skript installiert alle benötigten Abhängigkeiten für OCRmyPDF.
-"""
-
-import subprocess
-import sys
-import os
-import urllib.request
-import zipfile
-import shutil
-
-def download_and_install_ghostscript():
-    """Lädt Ghostscript herunter und installiert es."""
-    print("=== Ghostscript Installation ===")
-    
-    # Ghostscript Download URL für Windows 64-bit
-    gs_url = "https://github.com/ArtifexSoftware/ghostpdl-downloads/releases/download/gs10031/gs10031w64.exe"
-    gs_installer = "gs_installer.exe"
-    
-    try:
-        print("Lade Ghostscript herunter...")
-        urllib.request.urlretrieve(gs_url, gs_installer)
-        print("✓ Ghostscript heruntergeladen")
-        
-        print("Starte Ghostscript Installation...")
-        print("WICHTIG: Installieren Sie Ghostscript in den Standard-Pfad!")
-        
-        # Starte Installer
-        result = subprocess.run([gs_installer], check=False)
-        
-        if result.returncode == 0:
-            print("✓ Ghostscript Installation abgeschlossen")
-            
-            # Füge Ghostscript zum PATH hinzu
-            gs_path = r"C:\Program Files\gs\gs10.03.1\bin"
-            if os.path.exists(gs_path):
-                current_path = os.environ.get('PATH', '')
-                if gs_path not in current_path:
-                    os.environ['PATH'] = gs_path + os.pathsep + current_path
-                    print(f"✓ Ghostscript zum PATH hinzugefügt: {gs_path}")
-                return True
-            else:
-                print("⚠ Ghostscript installiert, aber Pfad nicht gefunden. Bitte manuell zum PATH hinzufügen.")
-                return True
-        else:
-            print("✗ Ghostscript Installation fehlgeschlagen")
-            return False
-            
-    except Exception as e:
-        print(f"✗ Fehler bei Ghostscript Installation: {e}")
-        return False
-    finally:
-        # Lösche Installer
-        if os.path.exists(gs_installer):
-            os.remove(gs_installer)
-
-def install_ocrmypdf():
-    """Installiert OCRmyPDF und Abhängigkeiten."""
-    print("\n=== OCRmyPDF Installation ===")
-    
-    packages = [
-        "ocrmypdf",
-        "PyMuPDF",
-        "pandas", 
-        "openpyxl"
-    ]
-    
-    for package in packages:
-        print(f"Installiere {package}...")
-        try:
-            subprocess.check_call([
-                sys.executable, "-m", "pip", "install", 
-                "--no-cache-dir", package
-            ])
-            print(f"✓ {package} erfolgreich installiert")
-        except subprocess.CalledProcessError as e:
-            print(f"✗ Fehler beim Installieren von {package}: {e}")
-            return False
-    
-    return True
-
-def test_ocrmypdf():
-    """Testet OCRmyPDF mit allen Abhängigkeiten."""
-    print("\n=== OCRmyPDF Test ===")
-    
-    try:
-        # Teste OCRmyPDF Import
-        import ocrmypdf
-        print("✓ OCRmyPDF Import erfolgreich")
-        
-        # Teste Ghostscript
-        result = subprocess.run(['gswin64c', '--version'], 
-                              capture_output=True, text=True)
-        if result.returncode == 0:
-            print(f"✓ Ghostscript gefunden: {result.stdout.strip()}")
-        else:
-            print("✗ Ghostscript nicht im PATH gefunden")
-            return False
-        
-        # Teste Tesseract
-        result = subprocess.run(['tesseract', '--version'], 
-                              capture_output=True, text=True)
-        if result.returncode == 0:
-            version_line = result.stdout.split('\n')[0]
-            print(f"✓ Tesseract gefunden: {version_line}")
-        else:
-            print("✗ Tesseract nicht gefunden")
-            return False
-        
-        print("✓ Alle OCRmyPDF Abhängigkeiten verfügbar")
-        return True
-        
-    except Exception as e:
-        print(f"✗ Fehler beim Testen: {e}")
-        return False
-
-def main():
-    """Hauptfunktion für die Installation."""
-    print("Ghostscript & OCRmyPDF Installation für PDF Code Comparator")
-    print("=" * 60)
-    
-    # Prüfe ob Ghostscript bereits installiert ist
-    try:
-        result = subprocess.run(['gswin64c', '--version'], 
-                              capture_output=True, text=True)
-        if result.returncode == 0:
-            print("✓ Ghostscript bereits installiert")
-            gs_installed = True
-        else:
-            gs_installed = False
-    except:
-        gs_installed = False
-    
-    # Installiere Ghostscript falls nötig
-    if not gs_installed:
-        if not download_and_install_ghostscript():
-            print("✗ Ghostscript Installation fehlgeschlagen")
-            return False
-    
-    # Installiere OCRmyPDF
-    if not install_ocrmypdf():
-        print("✗ OCRmyPDF Installation fehlgeschlagen")
-        return False
-    
-    # Teste Installation
-    if not test_ocrmypdf():
-        print("✗ OCRmyPDF Test fehlgeschlagen")
-        return False
-    
-    print("\n" + "=" * 60)
-    print("✓ Ghostscript & OCRmyPDF Installation erfolgreich!")
-    print("Sie können jetzt das Hauptprogramm starten mit:")
-    print("python -m src.main")
-    
-    return True
-
-if __name__ == "__main__":
-    success = main()
+#!/usr/bin/env python3
+"""
+Installationsskript für Ghostscript und OCRmyPDF.
+Dieses Skript installiert alle benötigten Abhängigkeiten für OCRmyPDF.
+"""
+
+import subprocess
+import sys
+import threading
+import os
+import functools
+import contextlib
+import urllib.request
+import zipfile
+import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+@functools.lru_cache(maxsize=None)
+def _tool_version(cmd):
+    """
+    Ermittelt die Versionsausgabe eines externen Tools und cached sie, damit
+    pro Installationslauf höchstens ein Prozess gestartet wird. shutil.which
+    dient als billiger Vorab-Check ohne Prozess-Spawn.
+    """
+    if shutil.which(cmd[0]) is None:
+        return None
+    # Gezielt nur die erwartbaren Fehler unterdrücken - kein bare except,
+    # damit KeyboardInterrupt/SystemExit durchgereicht werden
+    with contextlib.suppress(FileNotFoundError, subprocess.SubprocessError, OSError):
+        result = subprocess.run(list(cmd), capture_output=True, text=True)
+        if result.returncode == 0:
+            return result.stdout.strip()
+    return None
+
+# Gemeinsamer Wheel-Cache für alle install_*.py-Skripte - Wiederholungsläufe
+# und die überlappenden Paketlisten der Skripte laden so nichts doppelt herunter
+PIP_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".pip-cache")
+
+PIP_BASE_ARGS = [
+    "-m", "pip", "install",
+    "--cache-dir", PIP_CACHE_DIR, "--prefer-binary",
+    "--disable-pip-version-check", "--no-input", "-q"
+]
+
+# Hält die Ausgabe parallel laufender pip-Prozesse zeilenweise zusammen
+_print_lock = threading.Lock()
+
+def _pip_install_streamed(args, prefix=""):
+    """
+    Führt pip über Popen aus und reicht dessen Ausgabe zeilenweise sofort
+    durch, statt bis zum Prozessende zu blockieren. So bleibt der Fortschritt
+    auch bei langen Installationen sichtbar.
+    """
+    process = subprocess.Popen(
+        args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+        text=True, bufsize=1
+    )
+    for line in process.stdout:
+        with _print_lock:
+            print(f"{prefix}{line}", end='')
+    return process.wait()
+
+def _pip_install_many(packages):
+    """
+    Installiert mehrere Pakete über einen einzigen gebündelten pip-Aufruf.
+    Das spart N-1 Interpreter-Starts plus Versions-Checks und lässt pip den
+    Abhängigkeitsgraphen über alle Pakete teilen. Nur im Fehlerfall werden
+    die Pakete einzeln (parallel) installiert, um den Verursacher zu finden.
+    """
+    returncode = _pip_install_streamed([sys.executable, *PIP_BASE_ARGS, *packages])
+
+    if returncode == 0:
+        for package in packages:
+            print(f"✓ {package} erfolgreich installiert")
+        return True
+
+    print("✗ Gebündelte Installation fehlgeschlagen - versuche Pakete einzeln...")
+
+    max_workers = min(len(packages), os.cpu_count() or 4)
+    all_ok = True
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(
+                _pip_install_streamed,
+                [sys.executable, *PIP_BASE_ARGS, package],
+                prefix=f"[{package}] "
+            ): package
+            for package in packages
+        }
+
+        for future in as_completed(futures):
+            package = futures[future]
+            if future.result() == 0:
+                print(f"✓ {package} erfolgreich installiert")
+            else:
+                print(f"✗ Fehler beim Installieren von {package}")
+                all_ok = False
+
+    return all_ok
+
+# Ghostscript Download URL für Windows 64-bit
+GS_URL = "https://github.com/ArtifexSoftware/ghostpdl-downloads/releases/download/gs10031/gs10031w64.exe"
+GS_INSTALLER = "gs_installer.exe"
+
+def download_ghostscript_installer():
+    """Lädt den Ghostscript-Installer herunter (kann im Hintergrund-Thread laufen)."""
+    try:
+        print("Lade Ghostscript herunter...")
+        # 1-MiB-Puffer statt der 8-KiB-Blöcke von urlretrieve - reduziert die
+        # Anzahl der Syscalls für den ~60-MB-Installer um fast zwei Größenordnungen
+        with urllib.request.urlopen(GS_URL) as response, open(GS_INSTALLER, 'wb') as f:
+            shutil.copyfileobj(response, f, length=1 << 20)
+        print("✓ Ghostscript heruntergeladen")
+        return True
+    except Exception as e:
+        print(f"✗ Fehler beim Ghostscript-Download: {e}")
+        return False
+
+def install_ghostscript():
+    """Installiert den bereits heruntergeladenen Ghostscript-Installer."""
+    print("=== Ghostscript Installation ===")
+
+    gs_installer = GS_INSTALLER
+
+    try:
+        print("Starte Ghostscript Installation...")
+        print("WICHTIG: Installieren Sie Ghostscript in den Standard-Pfad!")
+        
+        # Starte Installer
+        result = subprocess.run([gs_installer], check=False)
+        
+        if result.returncode == 0:
+            print("✓ Ghostscript Installation abgeschlossen")
+            
+            # Füge Ghostscript zum PATH hinzu
+            gs_path = r"C:\Program Files\gs\gs10.03.1\bin"
+            if os.path.exists(gs_path):
+                current_path = os.environ.get('PATH', '')
+                if gs_path not in current_path:
+                    os.environ['PATH'] = gs_path + os.pathsep + current_path
+                    print(f"✓ Ghostscript zum PATH hinzugefügt: {gs_path}")
+                return True
+            else:
+                print("⚠ Ghostscript installiert, aber Pfad nicht gefunden. Bitte manuell zum PATH hinzufügen.")
+                return True
+        else:
+            print("✗ Ghostscript Installation fehlgeschlagen")
+            return False
+            
+    except Exception as e:
+        print(f"✗ Fehler bei Ghostscript Installation: {e}")
+        return False
+    finally:
+        # Lösche Installer
+        if os.path.exists(gs_installer):
+            os.remove(gs_installer)
+
+def download_and_install_ghostscript():
+    """Lädt Ghostscript herunter und installiert es (serielle Variante)."""
+    if not download_ghostscript_installer():
+        return False
+    return install_ghostscript()
+
+def install_ocrmypdf():
+    """Installiert OCRmyPDF und Abhängigkeiten."""
+    print("\n=== OCRmyPDF Installation ===")
+    
+    packages = [
+        "ocrmypdf",
+        "PyMuPDF",
+        "pandas",
+        "openpyxl"
+    ]
+
+    print(f"Installiere parallel: {', '.join(packages)}...")
+    return _pip_install_many(packages)
+
+def test_ocrmypdf():
+    """Testet OCRmyPDF mit allen Abhängigkeiten."""
+    print("\n=== OCRmyPDF Test ===")
+    
+    try:
+        # Teste OCRmyPDF Import
+        import ocrmypdf
+        print("✓ OCRmyPDF Import erfolgreich")
+        
+        # Teste Ghostscript (gecachte Erkennung, kein erneuter Prozess-Spawn)
+        gs_version = _tool_version(('gswin64c', '--version'))
+        if gs_version:
+            print(f"✓ Ghostscript gefunden: {gs_version}")
+        else:
+            print("✗ Ghostscript nicht im PATH gefunden")
+            return False
+        
+        # Teste Tesseract (gecachte Erkennung, kein erneuter Prozess-Spawn)
+        tesseract_version = _tool_version(('tesseract', '--version'))
+        if tesseract_version:
+            version_line = tesseract_version.split('\n')[0]
+            print(f"✓ Tesseract gefunden: {version_line}")
+        else:
+            print("✗ Tesseract nicht gefunden")
+            return False
+        
+        print("✓ Alle OCRmyPDF Abhängigkeiten verfügbar")
+        return True
+        
+    except Exception as e:
+        print(f"✗ Fehler beim Testen: {e}")
+        return False
+
+def main():
+    """Hauptfunktion für die Installation."""
+    print("Ghostscript & OCRmyPDF Installation für PDF Code Comparator")
+    print("=" * 60)
+    
+    # Prüfe ob Ghostscript bereits installiert ist - shutil.which ist ein
+    # reiner PATH-Scan ohne Prozess-Spawn; die Version wird hier nicht benötigt
+    gs_installed = shutil.which('gswin64c') is not None
+    if gs_installed:
+        print("✓ Ghostscript bereits installiert")
+    
+    # Installiere Ghostscript falls nötig
+    if not gs_installed:
+        # Der Ghostscript-Download und die pip-Installationen sind beides reine
+        # Netzwerk-I/O: Download im Hintergrund starten und erst vor dem
+        # Installer-Aufruf auf das Ergebnis warten.
+        print("Starte Ghostscript-Download im Hintergrund...")
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            gs_download = executor.submit(download_ghostscript_installer)
+            ocrmypdf_ok = install_ocrmypdf()
+            gs_downloaded = gs_download.result()
+
+        if not gs_downloaded or not install_ghostscript():
+            print("✗ Ghostscript Installation fehlgeschlagen")
+            return False
+
+        if not ocrmypdf_ok:
+            print("✗ OCRmyPDF Installation fehlgeschlagen")
+            return False
+    else:
+        # Installiere OCRmyPDF
+        if not install_ocrmypdf():
+            print("✗ OCRmyPDF Installation fehlgeschlagen")
+            return False
+
+    # Teste Installation
+    if not test_ocrmypdf():
+        print("✗ OCRmyPDF Test fehlgeschlagen")
+        return False
+    
+    print("\n" + "=" * 60)
+    print("✓ Ghostscript & OCRmyPDF Installation erfolgreich!")
+    print("Sie können jetzt das Hauptprogramm starten mit:")
+    print("python -m src.main")
+    
+    return True
+
+if __name__ == "__main__":
+    success = main()
     sys.exit(0 if success else 1)
\ No newline at end of file
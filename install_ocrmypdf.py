@@ -1,96 +1,154 @@
-#!/usr/bin/env python3
-"""
-Installationsskript für OCRmyPDF.
-Dieses Skript sollte in der virtuellen Umgebung ausgeführt werden.
-"""
-
-import subprocess
-import sys
-import os
-
-def install_ocrmypdf():
-    """Installiert OCRmyPDF und Abhängigkeiten."""
-    print("=== OCRmyPDF Installation ===")
-    
-    # Installiere OCRmyPDF
-    packages = [
-        "ocrmypdf",
-        "PyMuPDF",  # fitz
-        "pandas",
-        "openpyxl"
-    ]
-    
-    for package in packages:
-        print(f"Installiere {package}...")
-        try:
-            subprocess.check_call([
-                sys.executable, "-m", "pip", "install", 
-                "--no-cache-dir", package
-            ])
-            print(f"✓ {package} erfolgreich installiert")
-        except subprocess.CalledProcessError as e:
-            print(f"✗ Fehler beim Installieren von {package}: {e}")
-            return False
-    
-    return True
-
-def test_installation():
-    """Testet die OCRmyPDF-Installation."""
-    print("\n=== Installation Test ===")
-    
-    try:
-        import ocrmypdf
-        print("✓ OCRmyPDF Import erfolgreich")
-        
-        # Teste Tesseract-Verfügbarkeit
-        result = subprocess.run([
-            sys.executable, "-c", 
-            "import ocrmypdf; print('OCRmyPDF Version:', ocrmypdf.__version__)"
-        ], capture_output=True, text=True)
-        
-        if result.returncode == 0:
-            print("✓ OCRmyPDF funktionsfähig")
-            print(result.stdout.strip())
-        else:
-            print("✗ OCRmyPDF Test fehlgeschlagen")
-            print(result.stderr)
-            return False
-        
-        return True
-        
-    except Exception as e:
-        print(f"✗ Fehler beim Testen der Installation: {e}")
-        return False
-
-def main():
-    """Hauptfunktion für die Installation."""
-    print("OCRmyPDF Installation für PDF Code Comparator")
-    print("=" * 50)
-    
-    # Prüfe Python-Version
-    if sys.version_info < (3, 7):
-        print("✗ Python 3.7 oder höher erforderlich")
-        return False
-    
-    print(f"✓ Python Version: {sys.version}")
-    
-    # Installiere OCRmyPDF
-    if not install_ocrmypdf():
-        print("✗ OCRmyPDF Installation fehlgeschlagen")
-        return False
-    
-    # Teste Installation
-    if not test_installation():
-        print("✗ Installationstest fehlgeschlagen")
-        return False
-    
-    print("\n" + "=" * 50)
-    print("✓ OCRmyPDF Installation erfolgreich abgeschlossen!")
-    print("Sie können jetzt das Hauptprogramm starten mit:")
-    print("python -m src.main")
-    
-    return True
-
-if __name__ == "__main__":
-    success = main()
+#!/usr/bin/env python3
+"""
+Installationsskript für OCRmyPDF.
+Dieses Skript sollte in der virtuellen Umgebung ausgeführt werden.
+"""
+
+import subprocess
+import sys
+import threading
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Gemeinsamer Wheel-Cache für alle install_*.py-Skripte - Wiederholungsläufe
+# und die überlappenden Paketlisten der Skripte laden so nichts doppelt herunter
+PIP_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".pip-cache")
+
+PIP_BASE_ARGS = [
+    "-m", "pip", "install",
+    "--cache-dir", PIP_CACHE_DIR, "--prefer-binary",
+    "--disable-pip-version-check", "--no-input", "-q"
+]
+
+# Hält die Ausgabe parallel laufender pip-Prozesse zeilenweise zusammen
+_print_lock = threading.Lock()
+
+def _pip_install_streamed(args, prefix=""):
+    """
+    Führt pip über Popen aus und reicht dessen Ausgabe zeilenweise sofort
+    durch, statt bis zum Prozessende zu blockieren. So bleibt der Fortschritt
+    auch bei langen Installationen sichtbar.
+    """
+    process = subprocess.Popen(
+        args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+        text=True, bufsize=1
+    )
+    for line in process.stdout:
+        with _print_lock:
+            print(f"{prefix}{line}", end='')
+    return process.wait()
+
+def _pip_install_many(packages):
+    """
+    Installiert mehrere Pakete über einen einzigen gebündelten pip-Aufruf.
+    Das spart N-1 Interpreter-Starts plus Versions-Checks und lässt pip den
+    Abhängigkeitsgraphen über alle Pakete teilen. Nur im Fehlerfall werden
+    die Pakete einzeln (parallel) installiert, um den Verursacher zu finden.
+    """
+    returncode = _pip_install_streamed([sys.executable, *PIP_BASE_ARGS, *packages])
+
+    if returncode == 0:
+        for package in packages:
+            print(f"✓ {package} erfolgreich installiert")
+        return True
+
+    print("✗ Gebündelte Installation fehlgeschlagen - versuche Pakete einzeln...")
+
+    max_workers = min(len(packages), os.cpu_count() or 4)
+    all_ok = True
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(
+                _pip_install_streamed,
+                [sys.executable, *PIP_BASE_ARGS, package],
+                prefix=f"[{package}] "
+            ): package
+            for package in packages
+        }
+
+        for future in as_completed(futures):
+            package = futures[future]
+            if future.result() == 0:
+                print(f"✓ {package} erfolgreich installiert")
+            else:
+                print(f"✗ Fehler beim Installieren von {package}")
+                all_ok = False
+
+    return all_ok
+
+def install_ocrmypdf():
+    """Installiert OCRmyPDF und Abhängigkeiten."""
+    print("=== OCRmyPDF Installation ===")
+
+    # Installiere OCRmyPDF
+    packages = [
+        "ocrmypdf",
+        "PyMuPDF",  # fitz
+        "pandas",
+        "openpyxl"
+    ]
+
+    print(f"Installiere parallel: {', '.join(packages)}...")
+    return _pip_install_many(packages)
+
+def test_installation():
+    """Testet die OCRmyPDF-Installation."""
+    print("\n=== Installation Test ===")
+    
+    try:
+        import ocrmypdf
+        print("✓ OCRmyPDF Import erfolgreich")
+        
+        # Teste Tesseract-Verfügbarkeit
+        result = subprocess.run([
+            sys.executable, "-c", 
+            "import ocrmypdf; print('OCRmyPDF Version:', ocrmypdf.__version__)"
+        ], capture_output=True, text=True)
+        
+        if result.returncode == 0:
+            print("✓ OCRmyPDF funktionsfähig")
+            print(result.stdout.strip())
+        else:
+            print("✗ OCRmyPDF Test fehlgeschlagen")
+            print(result.stderr)
+            return False
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ Fehler beim Testen der Installation: {e}")
+        return False
+
+def main():
+    """Hauptfunktion für die Installation."""
+    print("OCRmyPDF Installation für PDF Code Comparator")
+    print("=" * 50)
+    
+    # Prüfe Python-Version
+    if sys.version_info < (3, 7):
+        print("✗ Python 3.7 oder höher erforderlich")
+        return False
+    
+    print(f"✓ Python Version: {sys.version}")
+    
+    # Installiere OCRmyPDF
+    if not install_ocrmypdf():
+        print("✗ OCRmyPDF Installation fehlgeschlagen")
+        return False
+    
+    # Teste Installation
+    if not test_installation():
+        print("✗ Installationstest fehlgeschlagen")
+        return False
+    
+    print("\n" + "=" * 50)
+    print("✓ OCRmyPDF Installation erfolgreich abgeschlossen!")
+    print("Sie können jetzt das Hauptprogramm starten mit:")
+    print("python -m src.main")
+    
+    return True
+
+if __name__ == "__main__":
+    success = main()
     sys.exit(0 if success else 1)
\ No newline at end of file
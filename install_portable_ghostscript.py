@@ -1,168 +1,273 @@
-#!/usr/bin/env python3
-"""
-Portable Ghostscript Installation ohne Admin-Rechte.
-Lädt eine portable Version von Ghostscript herunter und konfiguriert sie.
-"""
-
-import subprocess
-import sys
-import os
-import urllib.request
-import zipfile
-import shutil
-
-def download_portable_ghostscript():
-    """Lädt portable Ghostscript-Version herunter."""
-    print("=== Portable Ghostscript Installation ===")
-    
-    # Portable Ghostscript Download (ohne Installer)
-    gs_url = "https://github.com/ArtifexSoftware/ghostpdl-downloads/releases/download/gs10031/gs10031w64.zip"
-    gs_zip = "ghostscript_portable.zip"
-    gs_dir = "ghostscript"
-    
-    try:
-        print("Lade portable Ghostscript herunter...")
-        urllib.request.urlretrieve(gs_url, gs_zip)
-        print("✓ Ghostscript heruntergeladen")
-        
-        # Entpacke Ghostscript
-        print("Entpacke Ghostscript...")
-        with zipfile.ZipFile(gs_zip, 'r') as zip_ref:
-            zip_ref.extractall(gs_dir)
-        
-        # Finde die Ghostscript-Executable
-        gs_exe = None
-        for root, dirs, files in os.walk(gs_dir):
-            for file in files:
-                if file in ['gswin64c.exe', 'gs.exe']:
-                    gs_exe = os.path.join(root, file)
-                    break
-            if gs_exe:
-                break
-        
-        if gs_exe:
-            gs_exe = os.path.abspath(gs_exe)
-            print(f"✓ Ghostscript gefunden: {gs_exe}")
-            
-            # Teste Ghostscript
-            result = subprocess.run([gs_exe, '--version'], 
-                                  capture_output=True, text=True)
-            if result.returncode == 0:
-                print(f"✓ Ghostscript funktionsfähig: {result.stdout.strip()}")
-                return gs_exe
-            else:
-                print("✗ Ghostscript Test fehlgeschlagen")
-                return None
-        else:
-            print("✗ Ghostscript Executable nicht gefunden")
-            return None
-            
-    except Exception as e:
-        print(f"✗ Fehler bei Ghostscript Installation: {e}")
-        return None
-    finally:
-        # Lösche ZIP-Datei
-        if os.path.exists(gs_zip):
-            os.remove(gs_zip)
-
-def install_ocrmypdf():
-    """Installiert OCRmyPDF."""
-    print("\n=== OCRmyPDF Installation ===")
-    
-    packages = [
-        "ocrmypdf",
-        "PyMuPDF",
-        "pandas", 
-        "openpyxl"
-    ]
-    
-    for package in packages:
-        print(f"Installiere {package}...")
-        try:
-            subprocess.check_call([
-                sys.executable, "-m", "pip", "install", 
-                "--no-cache-dir", package
-            ])
-            print(f"✓ {package} erfolgreich installiert")
-        except subprocess.CalledProcessError as e:
-            print(f"✗ Fehler beim Installieren von {package}: {e}")
-            return False
-    
-    return True
-
-def create_ghostscript_config(gs_exe_path):
-    """Erstellt eine Konfigurationsdatei für Ghostscript."""
-    config_content = f"""# Ghostscript Konfiguration für OCRmyPDF
-# Portable Ghostscript Pfad
-GHOSTSCRIPT_PATH = "{gs_exe_path}"
-"""
-    
-    with open("ghostscript_config.py", "w") as f:
-        f.write(config_content)
-    
-    print(f"✓ Ghostscript Konfiguration erstellt: ghostscript_config.py")
-
-def test_ocrmypdf_with_portable_gs(gs_exe_path):
-    """Testet OCRmyPDF mit portable Ghostscript."""
-    print("\n=== OCRmyPDF Test mit portable Ghostscript ===")
-    
-    try:
-        # Setze Ghostscript-Pfad in Umgebungsvariable
-        os.environ['GS'] = gs_exe_path
-        
-        # Teste OCRmyPDF Import
-        import ocrmypdf
-        print("✓ OCRmyPDF Import erfolgreich")
-        
-        # Teste Tesseract
-        result = subprocess.run(['tesseract', '--version'], 
-                              capture_output=True, text=True)
-        if result.returncode == 0:
-            version_line = result.stdout.split('\n')[0]
-            print(f"✓ Tesseract gefunden: {version_line}")
-        else:
-            print("✗ Tesseract nicht gefunden")
-            return False
-        
-        print("✓ OCRmyPDF mit portable Ghostscript konfiguriert")
-        return True
-        
-    except Exception as e:
-        print(f"✗ Fehler beim Testen: {e}")
-        return False
-
-def main():
-    """Hauptfunktion für die portable Installation."""
-    print("Portable Ghostscript & OCRmyPDF Installation")
-    print("=" * 50)
-    
-    # Installiere portable Ghostscript
-    gs_exe_path = download_portable_ghostscript()
-    if not gs_exe_path:
-        print("✗ Portable Ghostscript Installation fehlgeschlagen")
-        return False
-    
-    # Installiere OCRmyPDF
-    if not install_ocrmypdf():
-        print("✗ OCRmyPDF Installation fehlgeschlagen")
-        return False
-    
-    # Erstelle Konfiguration
-    create_ghostscript_config(gs_exe_path)
-    
-    # Teste Installation
-    if not test_ocrmypdf_with_portable_gs(gs_exe_path):
-        print("✗ OCRmyPDF Test fehlgeschlagen")
-        return False
-    
-    print("\n" + "=" * 50)
-    print("✓ Portable Ghostscript & OCRmyPDF Installation erfolgreich!")
-    print(f"Ghostscript Pfad: {gs_exe_path}")
-    print("Sie können jetzt das Hauptprogramm starten mit:")
-    print("python -m src.main")
-    
-    return True
-
-if __name__ == "__main__":
-    success = main()
+#!/usr/bin/env python3
+"""
+Portable Ghostscript Installation ohne Admin-Rechte.
+Lädt eine portable Version von Ghostscript herunter und konfiguriert sie.
+"""
+
+import subprocess
+import sys
+import threading
+import os
+import io
+import glob
+import functools
+import contextlib
+import urllib.request
+import zipfile
+import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+@functools.lru_cache(maxsize=None)
+def _tool_version(cmd):
+    """
+    Ermittelt die Versionsausgabe eines externen Tools und cached sie, damit
+    pro Installationslauf höchstens ein Prozess gestartet wird. shutil.which
+    dient als billiger Vorab-Check ohne Prozess-Spawn.
+    """
+    if shutil.which(cmd[0]) is None:
+        return None
+    # Gezielt nur die erwartbaren Fehler unterdrücken - kein bare except,
+    # damit KeyboardInterrupt/SystemExit durchgereicht werden
+    with contextlib.suppress(FileNotFoundError, subprocess.SubprocessError, OSError):
+        result = subprocess.run(list(cmd), capture_output=True, text=True)
+        if result.returncode == 0:
+            return result.stdout.strip()
+    return None
+
+# Gemeinsamer Wheel-Cache für alle install_*.py-Skripte - Wiederholungsläufe
+# und die überlappenden Paketlisten der Skripte laden so nichts doppelt herunter
+PIP_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".pip-cache")
+
+PIP_BASE_ARGS = [
+    "-m", "pip", "install",
+    "--cache-dir", PIP_CACHE_DIR, "--prefer-binary",
+    "--disable-pip-version-check", "--no-input", "-q"
+]
+
+# Hält die Ausgabe parallel laufender pip-Prozesse zeilenweise zusammen
+_print_lock = threading.Lock()
+
+def _pip_install_streamed(args, prefix=""):
+    """
+    Führt pip über Popen aus und reicht dessen Ausgabe zeilenweise sofort
+    durch, statt bis zum Prozessende zu blockieren. So bleibt der Fortschritt
+    auch bei langen Installationen sichtbar.
+    """
+    process = subprocess.Popen(
+        args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+        text=True, bufsize=1
+    )
+    for line in process.stdout:
+        with _print_lock:
+            print(f"{prefix}{line}", end='')
+    return process.wait()
+
+def _pip_install_many(packages):
+    """
+    Installiert mehrere Pakete über einen einzigen gebündelten pip-Aufruf.
+    Das spart N-1 Interpreter-Starts plus Versions-Checks und lässt pip den
+    Abhängigkeitsgraphen über alle Pakete teilen. Nur im Fehlerfall werden
+    die Pakete einzeln (parallel) installiert, um den Verursacher zu finden.
+    """
+    returncode = _pip_install_streamed([sys.executable, *PIP_BASE_ARGS, *packages])
+
+    if returncode == 0:
+        for package in packages:
+            print(f"✓ {package} erfolgreich installiert")
+        return True
+
+    print("✗ Gebündelte Installation fehlgeschlagen - versuche Pakete einzeln...")
+
+    max_workers = min(len(packages), os.cpu_count() or 4)
+    all_ok = True
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(
+                _pip_install_streamed,
+                [sys.executable, *PIP_BASE_ARGS, package],
+                prefix=f"[{package}] "
+            ): package
+            for package in packages
+        }
+
+        for future in as_completed(futures):
+            package = futures[future]
+            if future.result() == 0:
+                print(f"✓ {package} erfolgreich installiert")
+            else:
+                print(f"✗ Fehler beim Installieren von {package}")
+                all_ok = False
+
+    return all_ok
+
+# Portable Ghostscript Download (ohne Installer)
+GS_URL = "https://github.com/ArtifexSoftware/ghostpdl-downloads/releases/download/gs10031/gs10031w64.zip"
+GS_DIR = "ghostscript"
+
+def download_ghostscript_zip():
+    """
+    Lädt das portable Ghostscript-ZIP direkt in den Speicher herunter
+    (kann im Hintergrund-Thread laufen). Ohne Zwischendatei entfällt ein
+    kompletter Schreib-/Lese-Durchlauf über die ~30 MB auf der Platte.
+    """
+    try:
+        print("Lade portable Ghostscript herunter...")
+        with urllib.request.urlopen(GS_URL) as response:
+            gs_buffer = io.BytesIO(response.read())
+        print("✓ Ghostscript heruntergeladen")
+        return gs_buffer
+    except Exception as e:
+        print(f"✗ Fehler beim Ghostscript-Download: {e}")
+        return None
+
+def extract_portable_ghostscript(gs_buffer):
+    """Entpackt das heruntergeladene ZIP aus dem Speicher und findet die Executable."""
+    print("=== Portable Ghostscript Installation ===")
+
+    gs_dir = GS_DIR
+
+    try:
+        # Entpacke Ghostscript direkt aus dem Speicher
+        print("Entpacke Ghostscript...")
+        with zipfile.ZipFile(gs_buffer) as zip_ref:
+            zip_ref.extractall(gs_dir)
+
+        # Finde die Ghostscript-Executable - das ZIP hat das bekannte Layout
+        # gs10031w64/bin/, daher zuerst den direkten Pfad prüfen und nur im
+        # Fallback per Glob suchen statt den ganzen Baum zu durchlaufen
+        gs_exe = None
+        known_path = os.path.join(gs_dir, 'gs10031w64', 'bin', 'gswin64c.exe')
+        if os.path.exists(known_path):
+            gs_exe = known_path
+        else:
+            candidates = (glob.glob(os.path.join(gs_dir, '**', 'gswin64c.exe'), recursive=True)
+                          or glob.glob(os.path.join(gs_dir, '**', 'gs.exe'), recursive=True))
+            if candidates:
+                gs_exe = candidates[0]
+
+        if gs_exe:
+            gs_exe = os.path.abspath(gs_exe)
+            print(f"✓ Ghostscript gefunden: {gs_exe}")
+            
+            # Teste Ghostscript
+            result = subprocess.run([gs_exe, '--version'], 
+                                  capture_output=True, text=True)
+            if result.returncode == 0:
+                print(f"✓ Ghostscript funktionsfähig: {result.stdout.strip()}")
+                return gs_exe
+            else:
+                print("✗ Ghostscript Test fehlgeschlagen")
+                return None
+        else:
+            print("✗ Ghostscript Executable nicht gefunden")
+            return None
+            
+    except Exception as e:
+        print(f"✗ Fehler bei Ghostscript Installation: {e}")
+        return None
+
+def download_portable_ghostscript():
+    """Lädt portable Ghostscript-Version herunter und entpackt sie (serielle Variante)."""
+    gs_buffer = download_ghostscript_zip()
+    if gs_buffer is None:
+        return None
+    return extract_portable_ghostscript(gs_buffer)
+
+def install_ocrmypdf():
+    """Installiert OCRmyPDF."""
+    print("\n=== OCRmyPDF Installation ===")
+    
+    packages = [
+        "ocrmypdf",
+        "PyMuPDF",
+        "pandas",
+        "openpyxl"
+    ]
+
+    print(f"Installiere parallel: {', '.join(packages)}...")
+    return _pip_install_many(packages)
+
+def create_ghostscript_config(gs_exe_path):
+    """Erstellt eine Konfigurationsdatei für Ghostscript."""
+    config_content = f"""# Ghostscript Konfiguration für OCRmyPDF
+# Portable Ghostscript Pfad
+GHOSTSCRIPT_PATH = "{gs_exe_path}"
+"""
+    
+    with open("ghostscript_config.py", "w") as f:
+        f.write(config_content)
+    
+    print(f"✓ Ghostscript Konfiguration erstellt: ghostscript_config.py")
+
+def test_ocrmypdf_with_portable_gs(gs_exe_path):
+    """Testet OCRmyPDF mit portable Ghostscript."""
+    print("\n=== OCRmyPDF Test mit portable Ghostscript ===")
+    
+    try:
+        # Setze Ghostscript-Pfad in Umgebungsvariable
+        os.environ['GS'] = gs_exe_path
+        
+        # Teste OCRmyPDF Import
+        import ocrmypdf
+        print("✓ OCRmyPDF Import erfolgreich")
+        
+        # Teste Tesseract (gecachte Erkennung, kein erneuter Prozess-Spawn)
+        tesseract_version = _tool_version(('tesseract', '--version'))
+        if tesseract_version:
+            version_line = tesseract_version.split('\n')[0]
+            print(f"✓ Tesseract gefunden: {version_line}")
+        else:
+            print("✗ Tesseract nicht gefunden")
+            return False
+        
+        print("✓ OCRmyPDF mit portable Ghostscript konfiguriert")
+        return True
+        
+    except Exception as e:
+        print(f"✗ Fehler beim Testen: {e}")
+        return False
+
+def main():
+    """Hauptfunktion für die portable Installation."""
+    print("Portable Ghostscript & OCRmyPDF Installation")
+    print("=" * 50)
+    
+    # Der Ghostscript-Download und die pip-Installationen sind beides reine
+    # Netzwerk-I/O: Download im Hintergrund starten und erst vor dem
+    # Entpacken auf das Ergebnis warten.
+    print("Starte Ghostscript-Download im Hintergrund...")
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        gs_download = executor.submit(download_ghostscript_zip)
+        ocrmypdf_ok = install_ocrmypdf()
+        gs_buffer = gs_download.result()
+
+    # Entpacke portable Ghostscript
+    gs_exe_path = extract_portable_ghostscript(gs_buffer) if gs_buffer else None
+    if not gs_exe_path:
+        print("✗ Portable Ghostscript Installation fehlgeschlagen")
+        return False
+
+    if not ocrmypdf_ok:
+        print("✗ OCRmyPDF Installation fehlgeschlagen")
+        return False
+
+    # Erstelle Konfiguration
+    create_ghostscript_config(gs_exe_path)
+    
+    # Teste Installation
+    if not test_ocrmypdf_with_portable_gs(gs_exe_path):
+        print("✗ OCRmyPDF Test fehlgeschlagen")
+        return False
+    
+    print("\n" + "=" * 50)
+    print("✓ Portable Ghostscript & OCRmyPDF Installation erfolgreich!")
+    print(f"Ghostscript Pfad: {gs_exe_path}")
+    print("Sie können jetzt das Hauptprogramm starten mit:")
+    print("python -m src.main")
+    
+    return True
+
+if __name__ == "__main__":
+    success = main()
     sys.exit(0 if success else 1)
\ No newline at end of file
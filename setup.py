@@ -1,10 +1,11 @@
-from setuptools import setup, find_packages
+from setuptools import setup
 
 with open("README.md", "r", encoding="utf-8") as fh:
     long_description = fh.read()
 
 with open("requirements.txt", "r", encoding="utf-8") as fh:
-    requirements = [line.strip() for line in fh if line.strip() and not line.startswith("#")]
+    # strip() nur einmal pro Zeile aufrufen
+    requirements = [s for s in (line.strip() for line in fh) if s and not s.startswith("#")]
 
 setup(
     name="pdf-code-comparator",
@@ -13,7 +14,9 @@ setup(
     description="Ein Tool zum Vergleich von Fahrzeugausstattungs-Codes zwischen PDFs mit intelligenter OCR-Korrektur",
     long_description=long_description,
     long_description_content_type="text/markdown",
-    packages=find_packages(),
+    # Explizite Paketliste statt find_packages() - erspart setuptools den
+    # Verzeichnis-Walk über den gesamten Quellbaum bei jedem Aufruf
+    packages=["src"],
     classifiers=[
         "Development Status :: 4 - Beta",
         "Intended Audience :: End Users/Desktop",
@@ -9,18 +9,27 @@ __version__ = "1.0.0"
 __author__ = "PDF Code Comparator Team"
 
 # Hauptmodule exportieren
-from . import core
-from . import config
-from . import gui
-from . import reporting
-from . import ocr_correction
-from . import code_filters
-
 __all__ = [
     "core",
-    "config", 
+    "config",
     "gui",
     "reporting",
     "ocr_correction",
     "code_filters"
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    """
+    Lädt die Untermodule erst beim ersten Zugriff (PEP 562).
+
+    Ein eifriges 'from . import gui, reporting, ...' würde bei jedem
+    'import src' Tkinter, pandas und openpyxl mitladen, auch wenn nur ein
+    einzelnes Modul (z.B. code_filters) benötigt wird.
+    """
+    if name in __all__:
+        import importlib
+        module = importlib.import_module(f".{name}", __name__)
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
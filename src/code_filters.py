@@ -14,9 +14,11 @@ def is_control_code(code):
     Returns:
         bool: True wenn es ein Steuer-Code ist
     """
-    if not isinstance(code, str) or not code:
+    if type(code) is not str:
         return False
-    return code.upper().startswith('I')
+    # Direkter Test des ersten Zeichens - vermeidet die upper()-Kopie des
+    # gesamten Strings für einen Ein-Zeichen-Vergleich
+    return bool(code) and code[0] in 'Ii'
 
 # Minus Options Funktionen entfernt - nicht mehr benötigt
 
@@ -30,15 +32,11 @@ def categorize_codes_by_type(codes_set):
     Returns:
         dict: {'normal': set, 'control': set}
     """
-    normal_codes = set()
-    control_codes = set()
-    
-    for code in codes_set:
-        if is_control_code(code):
-            control_codes.add(code)
-        else:
-            normal_codes.add(code)
-    
+    # Ein Durchlauf: Steuer-Codes per billigem Präfix-Test herausfiltern,
+    # die normalen Codes ergeben sich als Set-Differenz auf C-Ebene
+    control_codes = {code for code in codes_set if code and code[:1] in ('I', 'i')}
+    normal_codes = set(codes_set) - control_codes
+
     return {
         'normal': normal_codes,
         'control': control_codes
@@ -1,40 +1,205 @@
 # src/config.py
 import configparser
+import functools
 import os
+import pickle
 import sys
-import pandas as pd # NEU: Für das Lesen der Excel-Masterliste
+
+try:
+    import tomllib # Python 3.11+: C-beschleunigter TOML-Parser in der stdlib
+except ImportError:
+    tomllib = None
+# HINWEIS: Kein pandas-Import mehr auf Modulebene - pandas (inkl. NumPy)
+# kostet beim Import mehrere hundert ms und zig MB RSS, und dieses Modul
+# liest die Masterliste inzwischen direkt über openpyxl.
+
+# Cache für load_config/load_master_codes: settings.ini und die Masterliste
+# ändern sich während eines Programmlaufs praktisch nie, werden aber von
+# mehreren Stellen erneut angefordert. Schlüssel ist der Dateipfad, Wert ist
+# ((st_mtime_ns, st_size), Ergebnis) - ändert sich die Datei, wird neu geparst.
+_stat_cache_store = {}
+
+
+def stat_cache(path_getter):
+    """
+    Decorator: cached das Ergebnis der Funktion, solange sich die Datei
+    hinter path_getter(*args) nicht geändert hat (geprüft über mtime_ns und
+    Dateigröße - ein os.stat statt eines kompletten Parse-Durchlaufs).
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            path = path_getter(*args, **kwargs)
+            try:
+                st = os.stat(path)
+            except OSError:
+                # Datei fehlt oder nicht lesbar - die Fehlerbehandlung der
+                # Funktion selbst greifen lassen, nichts cachen
+                return func(*args, **kwargs)
+            stat_key = (st.st_mtime_ns, st.st_size)
+            cached = _stat_cache_store.get(path)
+            if cached is not None and cached[0] == stat_key:
+                return cached[1]
+            result = func(*args, **kwargs)
+            _stat_cache_store[path] = (stat_key, result)
+            return result
+        return wrapper
+    return decorator
+
+
+# Basis-Pfad einmal zur Importzeit bestimmen: weder sys.frozen noch __file__
+# ändern sich zur Laufzeit, die Entscheidung ist also eine echte Konstante.
+if getattr(sys, 'frozen', False):
+    # Wenn in einem PyInstaller Bundle
+    # sys._MEIPASS ist das temporäre Verzeichnis, wo PyInstaller die Dateien entpackt
+    _BASE_PATH = sys._MEIPASS
+else:
+    # Wenn normales Skript (aus dem src Ordner)
+    # Gehe einen Ordner hoch, um den Projekt-Basisordner zu erhalten
+    _BASE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
 
 def get_base_path():
     """Hilfsfunktion, um den Basis-Pfad zu erhalten (funktioniert auch mit PyInstaller)."""
-    if getattr(sys, 'frozen', False):
-        # Wenn in einem PyInstaller Bundle
-        # sys._MEIPASS ist das temporäre Verzeichnis, wo PyInstaller die Dateien entpackt
-        return sys._MEIPASS
-    else:
-        # Wenn normales Skript (aus dem src Ordner)
-        # Gehe einen Ordner hoch, um den Projekt-Basisordner zu erhalten
-        return os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    return _BASE_PATH
+
+
+def _config_file_path():
+    """
+    Pfad zur Konfigurationsdatei (liegt im config-Unterordner vom Basis-Pfad).
+
+    Eine settings.toml wird bevorzugt, wenn sie existiert und tomllib
+    verfügbar ist - der C-Parser ist deutlich schneller als configparser.
+    Fallback ist wie bisher die settings.ini.
+    """
+    config_dir = os.path.join(get_base_path(), 'config')
+    if tomllib is not None:
+        toml_path = os.path.join(config_dir, 'settings.toml')
+        if os.path.exists(toml_path):
+            return toml_path
+    return os.path.join(config_dir, 'settings.ini')
+
+
+def _master_file_path(config):
+    """Pfad zur Excel-Masterliste (liegt im config-Unterordner)."""
+    master_file_name = config.get('Files', 'master_codes_path', fallback='master_codes.xlsx')
+    return os.path.join(get_base_path(), 'config', master_file_name)
 
 
+@stat_cache(_config_file_path)
 def load_config():
     """Lädt die Konfiguration aus settings.ini."""
     config = configparser.ConfigParser()
-    base_path = get_base_path()
-    config_path = os.path.join(base_path, 'config', 'settings.ini') # settings.ini liegt im config-Unterordner vom Basis-Pfad
+    config_path = _config_file_path()
 
-    if not os.path.exists(config_path):
+    try:
+        # Direkt öffnen statt os.path.exists + config.read: das spart einen
+        # stat-Syscall auf dem Startpfad (config.read öffnet intern ohnehin)
+        # und behandelt eine fehlende Datei über die Exception statt per Vorab-Check
+        if config_path.endswith('.toml'):
+            # read_dict übernimmt die TOML-Tabellen als Sektionen in den
+            # ConfigParser (Werte werden dabei zu Strings) - alle Aufrufer
+            # behalten so ihre config.get('Sektion', 'key', fallback=...)-API
+            with open(config_path, 'rb') as fh:
+                config.read_dict(tomllib.load(fh))
+        else:
+            with open(config_path, encoding='utf-8') as fh:
+                config.read_file(fh)
+        print(f"Konfiguration geladen von: {config_path}")
+    except FileNotFoundError:
         print(f"FEHLER: Konfigurationsdatei nicht gefunden unter {config_path}")
         # Gibt leere Konfiguration zurück oder beendet das Programm
         return configparser.ConfigParser() # Gibt ein leeres Config-Objekt zurück
-
-    try:
-        config.read(config_path, encoding='utf-8') # Versucht, die Datei zu lesen
-        print(f"Konfiguration geladen von: {config_path}")
     except Exception as e:
          print(f"FEHLER beim Lesen der Konfiguration: {e}")
 
     return config
 
+# Name der Code-Spalte in den Masterlisten
+_EXPECTED_COLUMN_NAME = 'Code' # <-- ANPASSEN, falls Ihre Excel-Spalte anders heisst
+
+
+def _read_master_codes_calamine(master_file_path, expected_column_name):
+    """
+    Liest die Code-Spalte über python-calamine (Rust-Backend). Das ist der
+    schnellste verfügbare XLSX-Pfad: die Zeilen kommen als fertige
+    Python-Listen zurück, ganz ohne DataFrame oder Workbook-DOM.
+
+    Wirft ImportError, wenn python-calamine nicht installiert ist, und
+    KeyError (mit den verfügbaren Spalten als Argument), wenn die erwartete
+    Spalte fehlt.
+    """
+    from python_calamine import CalamineWorkbook
+
+    wb = CalamineWorkbook.from_path(master_file_path)
+    rows = wb.get_sheet_by_name(wb.sheet_names[0]).to_python()
+    header = rows[0] if rows else []
+
+    try:
+        col_idx = header.index(expected_column_name)
+    except ValueError:
+        raise KeyError(list(header)) from None
+
+    # Gleiche Normalisierung wie im openpyxl-Pfad (strip/upper/intern);
+    # calamine kürzt Zeilen mit leeren hinteren Zellen - daher die Längenprüfung
+    intern = sys.intern
+    return frozenset(
+        intern(str(row[col_idx]).strip().upper())
+        for row in rows[1:]
+        if col_idx < len(row) and row[col_idx] not in (None, '')
+    )
+
+
+def _read_master_codes_openpyxl(master_file_path, expected_column_name):
+    """
+    Fallback-Leser über openpyxl im read_only-Modus: streamt nur die
+    Code-Spalte aus dem XLSX, ohne den Workbook-DOM aufzubauen.
+
+    Wirft KeyError (mit den verfügbaren Spalten als Argument), wenn die
+    erwartete Spalte fehlt.
+    """
+    from openpyxl import load_workbook
+
+    wb = load_workbook(master_file_path, read_only=True, data_only=True)
+    try:
+        ws = wb.active
+        header = next(ws.iter_rows(min_row=1, max_row=1, values_only=True), None)
+
+        # Ein einziger Scan über den Header: index() liefert Position und
+        # Existenz-Prüfung in einem, statt 'in' plus anschließendem index()
+        try:
+            col_idx = header.index(expected_column_name) if header else -1
+        except ValueError:
+            col_idx = -1
+
+        if col_idx < 0:
+            raise KeyError(list(header) if header else [])
+
+        # Nur die Code-Spalte streamen: mit min_col/max_col baut openpyxl
+        # für alle anderen Spalten gar keine Zellwerte auf - auf breiten
+        # Masterlisten entfällt damit der Großteil der Parse-Arbeit.
+        rows = ws.iter_rows(min_row=2, min_col=col_idx + 1,
+                            max_col=col_idx + 1, values_only=True)
+
+        # Extrahiert die Codes aus der Spalte und fügt sie zum Set hinzu
+        # - leere Zellen werden ignoriert (entspricht .dropna())
+        # - .strip(): Entfernt führende/abschließende Leerzeichen
+        # - .upper(): Konvertiert zu Großbuchstaben (wichtig für konsistenten Vergleich)
+        # sys.intern: dedupliziert identische Code-Strings und lässt die
+        # Membership-Tests im Vergleichs-Hotpath ('code in valid_codes')
+        # über Pointer-Gleichheit abkürzen, bevor gehasht werden muss.
+        # Lokale Bindung: spart den Modul-Attribut-Lookup pro Zeile.
+        intern = sys.intern
+        return frozenset(
+            intern(str(row[0]).strip().upper())
+            for row in rows
+            if row and row[0] is not None
+        )
+    finally:
+        wb.close()
+
+
+@stat_cache(_master_file_path)
 def load_master_codes(config):
     """
     Lädt die Masterliste der gültigen Codes aus einer Excel-Datei.
@@ -43,48 +208,135 @@ def load_master_codes(config):
         config (configparser.ConfigParser): Die geladene Anwendungskonfiguration.
 
     Returns:
-        set: Ein Set mit allen gültigen Codes in Großbuchstaben,
-             oder ein leeres Set im Fehlerfall oder wenn die Datei leer ist.
+        frozenset: Ein Frozenset mit allen gültigen Codes in Großbuchstaben,
+                   oder ein leeres Frozenset im Fehlerfall oder wenn die Datei
+                   leer ist. Frozenset, damit das gecachte Objekt von Aufrufern
+                   nicht verändert werden kann.
+
+                   Alle Codes sind über sys.intern dedupliziert. Aufrufer mit
+                   vielen Membership-Tests sollten ihren Suchschlüssel ebenfalls
+                   internieren - dann greift beim 'in'-Test die
+                   Pointer-Gleichheit, bevor gehasht werden muss.
     """
     master_file_name = config.get('Files', 'master_codes_path', fallback='master_codes.xlsx')
-    base_path = get_base_path()
-    master_file_path = os.path.join(base_path, 'config', master_file_name) # Masterliste liegt im config-Unterordner
+    master_file_path = _master_file_path(config)
 
-    valid_codes = set()
-    expected_column_name = 'Code' # <-- ANPASSEN, falls Ihre Excel-Spalte anders heisst
+    valid_codes = frozenset()
+    expected_column_name = _EXPECTED_COLUMN_NAME
 
     if not os.path.exists(master_file_path):
         # print(f"FEHLER: Mastercodes-Datei nicht gefunden unter {master_file_path}") # Wird in main.py besser behandelt
         return valid_codes # Gibt ein leeres Set zurück
 
+    # Pickle-Cache neben der XLSX: ein fertiges Set zu entpacken ist um
+    # Größenordnungen schneller als jeder Excel-Parse. Der Cache gilt nur,
+    # solange er nicht älter als die Masterliste ist; Lese-/Schreibfehler
+    # sind unkritisch und führen einfach zum normalen Excel-Parse.
+    cache_path = master_file_path + '.pkl'
     try:
-        # Versucht, die Excel-Datei zu lesen
-        df = pd.read_excel(master_file_path)
+        if os.path.getmtime(cache_path) >= os.path.getmtime(master_file_path):
+            with open(cache_path, 'rb') as fh:
+                cached_codes = pickle.load(fh)
+            # Nach dem Unpickling erneut internieren, damit die
+            # Pointer-Gleichheits-Abkürzung beim Membership-Test erhalten bleibt
+            valid_codes = frozenset(map(sys.intern, cached_codes))
+            print(f"Mastercodes-Cache geladen ({len(valid_codes)} gültige Codes aus '{os.path.basename(cache_path)}').")
+            return valid_codes
+    except (OSError, pickle.PickleError, EOFError, AttributeError):
+        pass # Kein oder unbrauchbarer Cache - normal aus der XLSX lesen
 
-        if expected_column_name not in df.columns:
-            print(f"FEHLER: Spalte '{expected_column_name}' nicht in Mastercodes-Datei '{master_file_name}' gefunden.")
-            print(f"Verfügbare Spalten: {df.columns.tolist()}")
-            return valid_codes # Gibt ein leeres Set zurück
+    try:
+        # Bevorzugt den calamine-Direktleser; fällt auf den
+        # openpyxl-Streaming-Pfad zurück, wenn python-calamine fehlt oder
+        # die Datei nicht lesen kann. Eine fehlende Spalte (KeyError) ist
+        # kein Leserproblem und wird nicht erneut versucht.
+        try:
+            valid_codes = _read_master_codes_calamine(master_file_path, expected_column_name)
+        except KeyError:
+            raise
+        except Exception:
+            valid_codes = _read_master_codes_openpyxl(master_file_path, expected_column_name)
 
-        # Extrahiert die Codes aus der Spalte und fügt sie zum Set hinzu
-        # .dropna(): Ignoriert leere Zellen in der Spalte
-        # .astype(str): Stellt sicher, dass alle Einträge Strings sind
-        # .str.strip(): Entfernt führende/abschließende Leerzeichen
-        # .str.upper(): Konvertiert zu Großbuchstaben (wichtig für konsistenten Vergleich)
-        valid_codes = set(df[expected_column_name].dropna().astype(str).str.strip().str.upper())
+        # Cache für den nächsten Lauf schreiben (best effort - z.B. auf einem
+        # schreibgeschützten Medium schlägt das fehl und wird ignoriert)
+        try:
+            with open(cache_path, 'wb') as fh:
+                pickle.dump(valid_codes, fh, protocol=5)
+        except OSError:
+            pass
 
         print(f"Mastercodes-Datei '{master_file_name}' geladen ({len(valid_codes)} gültige Codes gefunden).")
 
+    except KeyError as e:
+        print(f"FEHLER: Spalte '{expected_column_name}' nicht in Mastercodes-Datei '{master_file_name}' gefunden.")
+        print(f"Verfügbare Spalten: {e.args[0] if e.args else []}")
+        return frozenset() # Gibt ein leeres Frozenset zurück
+
     except FileNotFoundError:
          print(f"FEHLER: Mastercodes-Datei nicht gefunden: {master_file_path}")
-         return set() # Gibt ein leeres Set zurück
+         return frozenset() # Gibt ein leeres Frozenset zurück
 
     except Exception as e:
         print(f"FEHLER beim Lesen der Mastercodes-Datei '{master_file_name}': {e}")
-        return set() # Gibt ein leeres Set zurück
+        return frozenset() # Gibt ein leeres Frozenset zurück
 
     return valid_codes
 
+def _read_one_master(master_file_path):
+    """
+    Picklebarer Worker für load_master_codes_many: liest eine einzelne
+    Masterliste (calamine, Fallback openpyxl) und gibt das Code-Frozenset
+    zurück. Fehler einer Datei brechen den Gesamtlauf nicht ab, sondern
+    ergeben ein leeres Frozenset.
+    """
+    try:
+        try:
+            return _read_master_codes_calamine(master_file_path, _EXPECTED_COLUMN_NAME)
+        except KeyError:
+            raise
+        except Exception:
+            return _read_master_codes_openpyxl(master_file_path, _EXPECTED_COLUMN_NAME)
+    except Exception as e:
+        print(f"FEHLER beim Lesen der Mastercodes-Datei '{os.path.basename(master_file_path)}': {e}")
+        return frozenset()
+
+
+def load_master_codes_many(config, filenames):
+    """
+    Lädt mehrere Masterlisten (z.B. pro Kategorie oder Region) und vereinigt
+    ihre Codes zu einem Frozenset.
+
+    XLSX-Parsing ist GIL-gebunden, deshalb laufen die Dateien in einem
+    ProcessPoolExecutor statt in Threads - N Dateien skalieren damit nahezu
+    linear über die Kerne. Für eine einzelne Datei wird kein Prozess
+    gestartet.
+
+    Args:
+        config (configparser.ConfigParser): Die geladene Anwendungskonfiguration
+                                            (für den config-Unterordner als Basis).
+        filenames (list): Dateinamen der Masterlisten im config-Unterordner.
+
+    Returns:
+        frozenset: Vereinigung aller gültigen Codes (Großbuchstaben, interniert).
+    """
+    paths = [os.path.join(get_base_path(), 'config', name) for name in filenames]
+
+    if len(paths) <= 1:
+        # Prozess-Start und Pickling lohnen sich erst ab mehreren Dateien
+        results = [_read_one_master(path) for path in paths]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=min(len(paths), os.cpu_count() or 1)) as executor:
+            results = list(executor.map(_read_one_master, paths))
+
+    if not results:
+        return frozenset()
+    # Strings aus Kindprozessen kommen unpickled (nicht interniert) zurück -
+    # erneut internieren, damit der Lookup-Fast-Path erhalten bleibt
+    return frozenset(map(sys.intern, frozenset().union(*results)))
+
+
 # Beispiel der Nutzung (wird nicht ausgeführt, wenn importiert)
 if __name__ == '__main__':
     # Für diesen Test muss eine dummy settings.ini und master_codes.xlsx im Ordner ../config existieren
@@ -93,12 +345,18 @@ if __name__ == '__main__':
     print(dummy_config.get('General', 'tesseract_path', fallback='Pfad nicht gefunden'))
 
     # Erstelle eine Dummy-Excel-Datei für den Test, falls nicht vorhanden
+    # (direkt über openpyxl - pandas wird dafür nicht benötigt)
     dummy_master_path = os.path.join(get_base_path(), 'config', 'master_codes.xlsx')
     if not os.path.exists(dummy_master_path):
+        from openpyxl import Workbook
         print(f"Erstelle Dummy Mastercodes Datei: {dummy_master_path}")
-        dummy_df = pd.DataFrame({'Code': ['A1X', 'B2Y', 'P0B', 'XYZ', 'a01x']})
+        dummy_wb = Workbook()
+        dummy_ws = dummy_wb.active
+        dummy_ws.append(['Code'])
+        for dummy_code in ['A1X', 'B2Y', 'P0B', 'XYZ', 'a01x']:
+            dummy_ws.append([dummy_code])
         os.makedirs(os.path.dirname(dummy_master_path), exist_ok=True) # config Ordner erstellen
-        dummy_df.to_excel(dummy_master_path, index=False)
+        dummy_wb.save(dummy_master_path)
 
 
     dummy_master_codes = load_master_codes(dummy_config)
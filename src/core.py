@@ -1,1215 +1,1773 @@
-# src/core.py
-import fitz  # PyMuPDF
-import re
-import os
-import time
-from datetime import datetime
-import subprocess
-import tempfile
-import io
-from PIL import Image, ImageEnhance, ImageFilter
-import cv2
-import numpy as np
-from .ocr_correction import OCRCorrector
-from .code_filters import categorize_codes_by_type
-
-# --- Erweiterte OCR-Korrektur Funktionen ---
-def generate_all_ocr_variants(code):
-    """
-    Generiert alle möglichen OCR-Korrektur-Varianten eines Codes durch systematische Permutation.
-    """
-    # OCR-Verwechslungen (bidirektional)
-    ocr_substitutions = {
-        '0': ['O'],
-        'O': ['0'],
-        '8': ['B'],
-        'B': ['8'],
-        'I': ['1', 'L'],
-        '1': ['I', 'L'],
-        'L': ['I', '1'],
-        '5': ['S'],
-        'S': ['5'],
-        '6': ['G'],
-        'G': ['6'],
-        '2': ['Z'],
-        'Z': ['2']
-    }
-    
-    def get_variants_for_position(char):
-        """Gibt alle möglichen Varianten für ein Zeichen zurück (inklusive Original)"""
-        variants = [char]  # Original immer dabei
-        if char in ocr_substitutions:
-            variants.extend(ocr_substitutions[char])
-        return list(set(variants))  # Duplikate entfernen
-    
-    # Generiere alle Kombinationen
-    import itertools
-    
-    position_variants = []
-    for char in code:
-        position_variants.append(get_variants_for_position(char))
-    
-    # Alle Permutationen generieren
-    all_variants = []
-    for combination in itertools.product(*position_variants):
-        variant = ''.join(combination)
-        if variant != code:  # Original nicht doppelt hinzufügen
-            all_variants.append(variant)
-    
-    # Original an den Anfang, dann nach Anzahl Änderungen sortieren
-    def count_changes(variant):
-        return sum(1 for i, char in enumerate(variant) if i < len(code) and char != code[i])
-    
-    all_variants.sort(key=count_changes)
-    return [code] + all_variants  # Original zuerst
-
-def clean_code_advanced(code, master_codes_set=None):
-    """
-    Erweiterte Code-Bereinigung mit systematischer OCR-Korrektur.
-    
-    Ablauf:
-    1. Grundbereinigung
-    2. Systematische OCR-Korrektur (alle Permutationen)
-    3. Falls nichts gefunden: 0/O an zweiter Stelle entfernen
-    4. Nochmals systematische OCR-Korrektur
-    """
-    if not isinstance(code, str) or not code:
-        return code.strip().upper() if isinstance(code, str) else ""
-
-    # Grundbereinigung
-    cleaned = code.strip()
-    cleaned = re.sub(r'[.,:;)]+$', '', cleaned)
-    cleaned = cleaned.upper()
-    
-    if not master_codes_set:
-        return cleaned
-    
-    print(f"    Erweiterte Korrektur für: '{cleaned}'")
-    
-    # Phase 1: Systematische OCR-Korrektur
-    variants = generate_all_ocr_variants(cleaned)
-    
-    for i, variant in enumerate(variants):
-        if variant in master_codes_set:
-            if variant != cleaned:
-                print(f"      OCR-Korrektur: '{cleaned}' -> '{variant}' (Variante {i+1})")
-            return variant
-    
-    # Phase 2: Falls 0 oder O an zweiter Stelle, entfernen und nochmals versuchen
-    if len(cleaned) > 3 and len(cleaned) > 1 and cleaned[1] in ['0', 'O']:
-        shortened = cleaned[0] + cleaned[2:]
-        if len(shortened) >= 3:
-            print(f"      Versuche ohne 2. Stelle: '{cleaned}' -> '{shortened}'")
-            
-            # Nochmals alle Varianten für die verkürzte Version
-            shortened_variants = generate_all_ocr_variants(shortened)
-            
-            for i, variant in enumerate(shortened_variants):
-                if variant in master_codes_set:
-                    print(f"      0/O-Korrektur + OCR: '{cleaned}' -> '{variant}' (Verkürzt + Variante {i+1})")
-                    return variant
-    
-    # Nichts gefunden, Original zurückgeben
-    print(f"      Keine Korrektur gefunden für: '{cleaned}'")
-    return cleaned
-
-# --- Alte Funktion für Rückwärtskompatibilität ---
-def clean_code(code, master_codes_set=None):
-    """
-    Wrapper für Rückwärtskompatibilität - verwendet die erweiterte Funktion.
-    """
-    return clean_code_advanced(code, master_codes_set)
-
-def count_corrections_needed(original, corrected):
-    """
-    Zählt die Anzahl der Korrekturen zwischen Original und korrigiertem Code.
-    """
-    if original == corrected:
-        return 0
-    
-    original = original.upper().strip()
-    corrected = corrected.upper().strip()
-    
-    corrections = 0
-    
-    # Längenunterschiede (Entfernung/Hinzufügung von Zeichen)
-    length_diff = abs(len(original) - len(corrected))
-    corrections += length_diff
-    
-    # Zeichen-Substitutionen
-    min_length = min(len(original), len(corrected))
-    for i in range(min_length):
-        if original[i] != corrected[i]:
-            corrections += 1
-    
-    return corrections
-
-def get_validated_context_codes(all_validated_codes, target_code, context_size=1):
-    """
-    Holt validierte Kontext-Codes vor und nach einem Ziel-Code.
-    
-    Args:
-        all_validated_codes (list): Liste aller validierten Codes in Reihenfolge
-        target_code (str): Der Ziel-Code
-        context_size (int): Anzahl Codes vor und nach dem Ziel
-    
-    Returns:
-        dict: {'before': [codes], 'after': [codes]}
-    """
-    try:
-        index = all_validated_codes.index(target_code)
-        before = all_validated_codes[max(0, index - context_size):index]
-        after = all_validated_codes[index + 1:index + 1 + context_size]
-        return {'before': before, 'after': after}
-    except ValueError:
-        return {'before': [], 'after': []}
-
-def calculate_precise_probability(code, corrections_pdf1, corrections_pdf2, context_pdf1, context_pdf2, is_in_both=True):
-    """
-    Präzise Wahrscheinlichkeits-Berechnung nach den spezifischen Regeln:
-    
-    - Basis: 40% pro PDF wenn Code in Masterliste gefunden
-    - -10% pro Korrektur die vorgenommen werden musste
-    - Kontext-Bonus: 3 Codes vorher/nachher mit unterschiedlichen Gewichtungen
-    
-    Returns:
-        tuple: (probability, context_details) - Wahrscheinlichkeit und Kontext-Details für Kommentare
-    """
-    probability = 0.0
-    context_details = {'before_matches': 0, 'after_matches': 0, 'before_total': 0, 'after_total': 0}
-    
-    # Basis-Wahrscheinlichkeit: 40% pro PDF wenn Code in Masterliste
-    if is_in_both:
-        probability = 0.80  # 40% + 40% = 80% für beide PDFs
-    else:
-        probability = 0.40  # 40% für nur ein PDF
-    
-    # Korrektur-Abzüge
-    total_corrections = corrections_pdf1 + corrections_pdf2
-    probability -= total_corrections * 0.10  # -10% pro Korrektur
-    
-    # Stelle sicher, dass Wahrscheinlichkeit nicht unter 0 fällt
-    probability = max(0.0, probability)
-    
-    if is_in_both:
-        # Kontext-Bonus nur wenn Code in beiden PDFs gefunden
-        context_bonus = 0.0
-        
-        # Bestimme Kontext-Gewichtungen basierend auf Korrekturen
-        if total_corrections == 0:
-            # Keine Korrekturen: Standard-Gewichtung
-            before_weights = [0.10, 0.05, 0.02]  # 1., 2., 3. Code vorher
-            after_weights = [0.08, 0.05, 0.02]   # 1., 2., 3. Code nachher
-        elif total_corrections == 2 and corrections_pdf1 == 1 and corrections_pdf2 == 1:
-            # Je eine Korrektur in beiden PDFs: Erhöhte Gewichtung
-            before_weights = [0.10, 0.07, 0.03]  # 1., 2., 3. Code vorher
-            after_weights = [0.10, 0.07, 0.03]   # 1., 2., 3. Code nachher
-        else:
-            # Andere Fälle: Standard-Gewichtung
-            before_weights = [0.08, 0.05, 0.02]  # 1., 2., 3. Code vorher
-            after_weights = [0.08, 0.05, 0.02]   # 1., 2., 3. Code nachher
-        
-        # Prüfe Kontext vorher (3 Codes)
-        before_pdf1 = context_pdf1.get('before', [])
-        before_pdf2 = context_pdf2.get('before', [])
-        context_details['before_total'] = min(len(before_pdf1), len(before_pdf2), 3)
-        
-        for i in range(context_details['before_total']):
-            if before_pdf1[-(i+1)] == before_pdf2[-(i+1)]:  # Von hinten nach vorne
-                context_bonus += before_weights[i]
-                context_details['before_matches'] += 1
-        
-        # Prüfe Kontext nachher (3 Codes)
-        after_pdf1 = context_pdf1.get('after', [])
-        after_pdf2 = context_pdf2.get('after', [])
-        context_details['after_total'] = min(len(after_pdf1), len(after_pdf2), 3)
-        
-        for i in range(context_details['after_total']):
-            if after_pdf1[i] == after_pdf2[i]:
-                context_bonus += after_weights[i]
-                context_details['after_matches'] += 1
-        
-        probability += context_bonus
-    
-    # Begrenze auf 0% - 100%
-    probability = max(0.0, min(1.0, probability))
-    
-    return probability, context_details
-
-def generate_korrekturmatch_comment(original, corrected, corrections_count, corrections_applied, context_details, pdf_source):
-    """
-    Generiert Kommentare speziell für Korrekturmatches nach den neuen Anforderungen.
-    """
-    # Korrekturmatch mit Anzahl Korrekturen
-    comment_parts = [f"Korrekturmatch, {corrections_count} Korrekturen durchgeführt"]
-    
-    # Validierungs-Text für 3 Codes vor/nach
-    validation_parts = []
-    
-    if context_details['before_matches'] > 0:
-        if context_details['before_matches'] == 1:
-            validation_parts.append("1 Code davor validiert")
-        else:
-            validation_parts.append(f"{context_details['before_matches']} Codes davor validiert")
-    
-    if context_details['after_matches'] > 0:
-        if context_details['after_matches'] == 1:
-            validation_parts.append("1 Code danach validiert")
-        else:
-            validation_parts.append(f"{context_details['after_matches']} Codes danach validiert")
-    
-    if validation_parts:
-        comment_parts.extend(validation_parts)
-    
-    return ", ".join(comment_parts)
-
-def generate_detailed_comment(original, corrected, corrections_pdf1, corrections_pdf2, context_details, pdf1_original=None, pdf2_original=None, corrections_applied=None):
-    """
-    Generiert detaillierte Kommentare mit PDF-spezifischen Korrektur-Informationen.
-    """
-    total_corrections = corrections_pdf1 + corrections_pdf2
-    
-    # Bestimme Match-Typ und Kontext-Größe
-    if total_corrections == 0:
-        match_type = "Direkter Match"
-        corrections_text = None
-        context_size = 1  # Bei direktem Match nur 1 Code vor/nach prüfen
-    else:
-        match_type = "Korrektur Match"
-        context_size = 3  # Bei Korrekturen 3 Codes vor/nach prüfen
-        
-        # Verwende tatsächliche Korrektur-Details wenn verfügbar
-        if corrections_applied:
-            correction_parts = []
-            
-            if corrections_pdf1 > 0:
-                pdf1_corrections = corrections_applied if pdf1_original else []
-                if pdf1_corrections:
-                    correction_parts.append(f"PDF1: {', '.join(pdf1_corrections)}")
-            
-            if corrections_pdf2 > 0:
-                pdf2_corrections = corrections_applied if pdf2_original else []
-                if pdf2_corrections:
-                    correction_parts.append(f"PDF2: {', '.join(pdf2_corrections)}")
-            
-            # Fallback wenn keine PDF-spezifischen Details
-            if not correction_parts and corrections_applied:
-                correction_parts.append(', '.join(corrections_applied))
-        else:
-            # Fallback: Analysiere Unterschiede zwischen original und corrected
-            correction_parts = []
-            
-            if corrections_pdf1 > 0 and pdf1_original:
-                pdf1_details = analyze_corrections(pdf1_original, corrected)
-                if pdf1_details:
-                    correction_parts.append(f"PDF1: {pdf1_details}")
-            
-            if corrections_pdf2 > 0 and pdf2_original:
-                pdf2_details = analyze_corrections(pdf2_original, corrected)
-                if pdf2_details:
-                    correction_parts.append(f"PDF2: {pdf2_details}")
-            
-            if not correction_parts and original != corrected:
-                simple_details = analyze_corrections(original, corrected)
-                if simple_details:
-                    correction_parts.append(simple_details)
-        
-        if not correction_parts:
-            correction_parts = ["OCR-Korrektur"]
-        
-        corrections_text = f"{total_corrections} Korrekturen ({', '.join(correction_parts)})"
-    
-    # Generiere Validierungs-Text basierend auf Kontext-Größe
-    validation_parts = []
-    
-    if total_corrections == 0:
-        # Direkter Match: nur 1 Code vor/nach
-        if context_details['before_matches'] > 0:
-            validation_parts.append("1 Code davor validiert")
-        if context_details['after_matches'] > 0:
-            validation_parts.append("1 Code danach validiert")
-    else:
-        # Korrekturen: bis zu 3 Codes vor/nach
-        if context_details['before_matches'] > 0:
-            if context_details['before_matches'] == 1:
-                validation_parts.append("1 Code davor validiert")
-            else:
-                validation_parts.append(f"{context_details['before_matches']} Codes davor validiert")
-        
-        if context_details['after_matches'] > 0:
-            if context_details['after_matches'] == 1:
-                validation_parts.append("1 Code danach validiert")
-            else:
-                validation_parts.append(f"{context_details['after_matches']} Codes danach validiert")
-    
-    # Kombiniere alles
-    if corrections_text:
-        comment_parts = [match_type, corrections_text]
-    else:
-        comment_parts = [match_type]
-    
-    if validation_parts:
-        comment_parts.extend(validation_parts)
-    
-    return ", ".join(comment_parts)
-
-def analyze_corrections(original, corrected):
-    """
-    Analysiert welche spezifischen Korrekturen zwischen original und corrected durchgeführt wurden.
-    """
-    if original == corrected:
-        return None
-    
-    correction_details = []
-    
-    # Prüfe auf 0/O-Entfernung an zweiter Stelle
-    if len(original) > len(corrected) and len(original) > 1 and original[1] in ['0', 'O']:
-        if original[0] + original[2:] == corrected:
-            correction_details.append("0 an 2. Stelle entfernt")
-            return ', '.join(correction_details)
-    
-    # Prüfe auf Zeichen-Substitutionen
-    for i, (orig_char, corr_char) in enumerate(zip(original, corrected)):
-        if orig_char != corr_char:
-            if orig_char == '8' and corr_char == 'B':
-                correction_details.append("8→B")
-            elif orig_char == 'B' and corr_char == '8':
-                correction_details.append("B→8")
-            elif orig_char == 'I' and corr_char == '1':
-                correction_details.append("I→1")
-            elif orig_char == '1' and corr_char == 'I':
-                correction_details.append("1→I")
-            elif orig_char == '0' and corr_char == 'O':
-                correction_details.append("0→O")
-            elif orig_char == 'O' and corr_char == '0':
-                correction_details.append("O→0")
-            elif orig_char == '5' and corr_char == 'S':
-                correction_details.append("5→S")
-            elif orig_char == 'S' and corr_char == '5':
-                correction_details.append("S→5")
-            elif orig_char == '6' and corr_char == 'G':
-                correction_details.append("6→G")
-            elif orig_char == 'G' and corr_char == '6':
-                correction_details.append("G→6")
-            elif orig_char == '2' and corr_char == 'Z':
-                correction_details.append("2→Z")
-            elif orig_char == 'Z' and corr_char == '2':
-                correction_details.append("Z→2")
-    
-    # Prüfe auf Leerzeichen-Entfernung
-    if ' ' in original and ' ' not in corrected:
-        correction_details.append("Leerzeichen entfernt")
-    
-    return ', '.join(correction_details) if correction_details else "OCR-Korrektur"
-
-def calculate_unified_probability(original, corrected, context_pdf1, context_pdf2, master_codes_set):
-    """
-    Wrapper für Rückwärtskompatibilität - verwendet die neue präzise Berechnung.
-    """
-    corrections_count = count_corrections_needed(original, corrected)
-    
-    # Für diese Funktion nehmen wir an, dass es sich um einen Match in beiden PDFs handelt
-    # und die Korrekturen gleichmäßig verteilt sind
-    corrections_pdf1 = corrections_count // 2
-    corrections_pdf2 = corrections_count - corrections_pdf1
-    
-    probability, context_details = calculate_precise_probability(
-        corrected, corrections_pdf1, corrections_pdf2, 
-        context_pdf1, context_pdf2, is_in_both=True
-    )
-    
-    return probability
-
-# --- Debug Funktion zum Speichern des OCR-Textes ---
-def save_ocr_debug(pdf_base_name, page_num, text_lines):
-    """Speichert die erkannten OCR-Textzeilen für eine Seite in einer Debug-Datei."""
-    debug_dir = "debug_ocr_text"
-    os.makedirs(debug_dir, exist_ok=True)
-    safe_pdf_name = re.sub(r'[\\/*?:"<>|]', '', pdf_base_name)
-    filename = f"{safe_pdf_name}_page_{page_num+1}_multi_ocr.txt"
-    filepath = os.path.join(debug_dir, filename)
-
-    try:
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(f"--- Multi-Ansatz OCR Text von {pdf_base_name}, Seite {page_num+1} ---\n\n")
-            for line in text_lines:
-                f.write(line + "\n")
-            f.write("\n--------------------------------------------")
-        # print(f"  OCR Debug Text gespeichert: {filepath}") # Optional: Bestätigung im Terminal
-    except Exception as e:
-        print(f"  FEHLER beim Speichern des OCR Debug Textes für Seite {page_num+1}: {e}")
-
-
-# --- Extraktion und Vergleichslogik mit OCRmyPDF ---
-def extract_codes(pdf_path, regex_pattern, tesseract_path, master_codes_set, return_raw_codes=False, is_pdf2=False):
-    """
-    Extrahiert Codes aus einer PDF-Datei mit OCRmyPDF und Tesseract.
-    Wendet die clean_code Funktion an und validiert gegen die Masterliste.
-    Erstellt Debug-Ausgaben für bessere Analyse.
-
-    Args:
-        pdf_path (str): Pfad zur PDF-Datei.
-        regex_pattern (str): Das Regex-Muster zum Finden von Codes.
-        tesseract_path (str): Pfad zur Tesseract-Executable.
-        master_codes_set (set): Ein Set mit allen gültigen Codes aus der Masterliste.
-
-    Returns:
-        set: Ein Set mit den bereinigten und validierten, eindeutigen Codes aus der PDF.
-             Gibt ein leeres Set zurück im Fehlerfall oder wenn keine Codes gefunden/validiert.
-    """
-    pdf_base_name = os.path.basename(pdf_path)
-    print(f"Verarbeite PDF: {pdf_base_name} mit Multi-Ansatz OCR...")
-    start_time = time.time()
-    
-    validated_codes_from_pdf = set()
-    raw_codes_with_positions = []  # Für OCR-Korrektur: (code, page_num, position_in_page)
-    
-    try:
-        # --- Erweiterte Tesseract OCR mit Bildverbesserung ---
-        print("  Führe erweiterte OCR mit Tesseract durch...")
-        
-        doc = fitz.open(pdf_path)
-        all_text_lines = []
-        
-        for page_num in range(doc.page_count):
-            page = doc.load_page(page_num)
-            
-            # Extrahiere nur linken Bereich (70% der Seitenbreite)
-            page_width = page.rect.width
-            page_height = page.rect.height
-            left_area_rect = fitz.Rect(0, 0, page_width * 0.7, page_height)
-            
-            # Prüfe zuerst Text-Layer
-            page_text = page.get_text(clip=left_area_rect)
-            
-            if len(page_text.strip()) < 50:  # Wenig Text = wahrscheinlich Scan
-                print(f"    Seite {page_num + 1}: Führe Multi-Ansatz OCR durch...")
-                
-                # OPTIMIERT: Reduzierte DPI für bessere Performance
-                pix = page.get_pixmap(clip=left_area_rect, dpi=300, alpha=False)  # Reduzierte DPI
-                img_data = pix.tobytes("png")
-                
-                # Sammle OCR-Ergebnisse von verschiedenen Ansätzen
-                all_ocr_results = []
-                
-                # --- ANSATZ 1: Standard Verbesserung ---
-                img_pil = Image.open(io.BytesIO(img_data))
-                enhancer = ImageEnhance.Contrast(img_pil)
-                img_enhanced = enhancer.enhance(1.8)
-                enhancer = ImageEnhance.Sharpness(img_enhanced)
-                img_enhanced = enhancer.enhance(2.5)
-                
-                img_cv = cv2.cvtColor(np.array(img_enhanced), cv2.COLOR_RGB2BGR)
-                gray = cv2.cvtColor(img_cv, cv2.COLOR_BGR2GRAY)
-                
-                # OPTIMIERT: Nur die besten 2 Binarisierungsmethoden
-                methods = [
-                    ("otsu", cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)[1]),
-                    ("denoised_otsu", cv2.threshold(cv2.fastNlMeansDenoising(gray), 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)[1])
-                ]
-                
-                # OPTIMIERT: Nur die besten 3 PSM-Modi
-                psm_modes = ["3", "6", "8"]
-                
-                # Frühzeitige Beendigung wenn genug Codes gefunden
-                codes_found = 0
-                target_codes = 10  # Beende wenn 10+ Codes gefunden
-                
-                for method_name, processed_img in methods:
-                    if codes_found >= target_codes:
-                        break
-                        
-                    for psm in psm_modes:
-                        if codes_found >= target_codes:
-                            break
-                            
-                        temp_img_path = f"temp_{method_name}_psm{psm}_page_{page_num}.png"
-                        cv2.imwrite(temp_img_path, processed_img)
-                        
-                        try:
-                            # OPTIMIERT: Nur eine Tesseract-Konfiguration
-                            cmd = [tesseract_path, temp_img_path, "stdout", "-l", "deu+eng+fra+ita", "--psm", psm, 
-                                   "-c", "tessedit_char_whitelist=ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"]
-                            
-                            result = subprocess.run(cmd, capture_output=True, text=True, encoding='utf-8', timeout=10)
-                            
-                            if result.returncode == 0:
-                                ocr_text = result.stdout.strip()
-                                if ocr_text:
-                                    lines = [line.strip() for line in ocr_text.splitlines() if line.strip()]
-                                    all_ocr_results.append({
-                                        'method': f"{method_name}_psm{psm}",
-                                        'text': ocr_text,
-                                        'lines': lines
-                                    })
-                                    # Zähle potenzielle Codes für frühzeitige Beendigung
-                                    codes_found += len([line for line in lines if re.search(r'[A-Z0-9]{3,7}', line)])
-                        
-                        except Exception as e:
-                            pass  # Ignoriere Fehler einzelner Versuche
-                        
-                        finally:
-                            if os.path.exists(temp_img_path):
-                                os.remove(temp_img_path)
-                
-                # --- ANSATZ 2: OPTIMIERT - Nur bei Bedarf skalieren ---
-                # Nur wenn noch nicht genug Codes gefunden wurden
-                if codes_found < target_codes:
-                    # Nur eine Skalierung testen
-                    scale_factor = 2.0
-                    try:
-                        # Skaliere Bild
-                        img_scaled = img_pil.resize((int(img_pil.width * scale_factor), int(img_pil.height * scale_factor)), Image.LANCZOS)
-                        
-                        # Verarbeitung
-                        img_cv = cv2.cvtColor(np.array(img_scaled), cv2.COLOR_RGB2BGR)
-                        gray = cv2.cvtColor(img_cv, cv2.COLOR_BGR2GRAY)
-                        processed = cv2.threshold(cv2.fastNlMeansDenoising(gray), 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)[1]
-                        
-                        temp_img_path = f"temp_scaled_{scale_factor}_page_{page_num}.png"
-                        cv2.imwrite(temp_img_path, processed)
-                        
-                        cmd = [tesseract_path, temp_img_path, "stdout", "-l", "deu+eng+fra+ita", "--psm", "6", 
-                               "-c", "tessedit_char_whitelist=ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"]
-                        
-                        result = subprocess.run(cmd, capture_output=True, text=True, encoding='utf-8', timeout=10)
-                        
-                        if result.returncode == 0:
-                            ocr_text = result.stdout.strip()
-                            if ocr_text:
-                                lines = [line.strip() for line in ocr_text.splitlines() if line.strip()]
-                                all_ocr_results.append({
-                                    'method': f"scaled_{scale_factor}",
-                                    'text': ocr_text,
-                                    'lines': lines
-                                })
-                                codes_found += len([line for line in lines if re.search(r'[A-Z0-9]{3,7}', line)])
-                    
-                    except Exception:
-                        pass
-                    
-                    finally:
-                        if os.path.exists(temp_img_path):
-                            os.remove(temp_img_path)
-                
-                # --- Kombiniere alle Ergebnisse ---
-                all_text_from_ocr = set()
-                for result in all_ocr_results:
-                    for line in result['lines']:
-                        all_text_from_ocr.add(line)
-                
-                page_lines = list(all_text_from_ocr)
-                print(f"    Seite {page_num + 1}: {len(page_lines)} einzigartige Zeilen aus {len(all_ocr_results)} OCR-Versuchen")
-                
-                # Debug: Speichere alle OCR-Versuche
-                debug_all_results = []
-                for result in all_ocr_results:
-                    debug_all_results.append(f"=== {result['method']} ===")
-                    debug_all_results.extend(result['lines'])
-                    debug_all_results.append("")
-                
-                save_ocr_debug(pdf_base_name, page_num, debug_all_results)
-                
-            else:
-                print(f"    Seite {page_num + 1}: Nutze Text-Layer ({len(page_text.strip())} Zeichen)")
-                page_lines = [line.strip() for line in page_text.splitlines() if line.strip()]
-                
-                # Debug: Speichere Text-Layer
-                save_ocr_debug(pdf_base_name, page_num, ["=== TEXT-LAYER ==="] + page_lines)
-            
-            # Sammle alle Textzeilen
-            all_text_lines.extend(page_lines)
-        
-        doc.close()
-        
-        # --- Codes mit Regex finden und Positionen merken ---
-        raw_codes = []
-        
-        # Einfachere Logik: Durchlaufe alle Textzeilen
-        page_line_counter = 0  # Separate Zeilenzählung für Seitenschätzung
-        for i, line in enumerate(all_text_lines):
-            found_codes = re.findall(r'\b' + regex_pattern + r'\b', line.upper())
-            for j, code in enumerate(found_codes):
-                raw_codes.append(code)
-                # Schätze Seite basierend auf Zeilennummer
-                if is_pdf2:
-                    # PDF2: Separate Seitenzählung (beginnt bei 1, unabhängig von PDF1)
-                    estimated_page = (page_line_counter // 50) + 1
-                else:
-                    # PDF1: Normale Seitenzählung
-                    estimated_page = (i // 50) + 1
-                raw_codes_with_positions.append((code, estimated_page, i * 10 + j))
-            
-            if found_codes:  # Nur Zeilen mit Codes zählen für PDF2
-                page_line_counter += 1
-        
-        # --- DEBUGGING: Gefundene Roh-Codes ausgeben ---
-        print(f"  Gefundene Roh-Codes ({len(raw_codes)}): {raw_codes}")
-        
-        # Keine speziellen Filter für PDF2 mehr nötig (Minus Options Anforderung entfernt)
-
-        # --- Codes bereinigen und validieren (mit detaillierter Korrektur-Dokumentation) ---
-        correction_info = []  # Sammle Korrektur-Informationen für Reporting
-        
-        for i, code in enumerate(raw_codes):
-            original_code = code.upper().strip()
-            
-            # SCHRITT 1: Prüfe direkten Match mit Masterliste (nach Grundbereinigung)
-            basic_cleaned = re.sub(r'[.,:;)]+$', '', original_code.strip()).upper()
-            
-            if basic_cleaned in master_codes_set:
-                # DIREKTER MATCH - keine Korrekturen nötig
-                validated_codes_from_pdf.add(basic_cleaned)
-                print(f"  Direkter Match: '{original_code}' -> '{basic_cleaned}' (keine Korrekturen)")
-                continue
-            
-            # SCHRITT 2: Code ist nicht direkt in Masterliste - versuche Korrekturen
-            print(f"  '{original_code}' nicht in Masterliste - versuche Korrekturen...")
-            
-            # Dokumentiere alle durchgeführten Korrekturen
-            corrections_applied = []
-            current_code = basic_cleaned
-            
-            # Phase 1: Systematische OCR-Korrektur (alle Permutationen)
-            variants = generate_all_ocr_variants(current_code)
-            found_match = None
-            
-            for i_var, variant in enumerate(variants):
-                if variant in master_codes_set:
-                    found_match = variant
-                    if variant != current_code:
-                        # Dokumentiere welche Korrekturen gemacht wurden
-                        variant_corrections = analyze_corrections(current_code, variant)
-                        if variant_corrections:
-                            corrections_applied.append(variant_corrections)
-                        print(f"    OCR-Korrektur: '{current_code}' -> '{variant}' (Variante {i_var+1})")
-                    break
-            
-            # Phase 2: Falls 0 oder O an zweiter Stelle, entfernen und nochmals versuchen
-            if not found_match and len(current_code) > 3 and len(current_code) > 1 and current_code[1] in ['0', 'O']:
-                shortened = current_code[0] + current_code[2:]
-                if len(shortened) >= 3:
-                    corrections_applied.append("0 an 2. Stelle entfernt")
-                    print(f"    0/O-Entfernung: '{current_code}' -> '{shortened}'")
-                    current_code = shortened
-                    
-                    # Nochmals alle Varianten für die verkürzte Version
-                    shortened_variants = generate_all_ocr_variants(current_code)
-                    
-                    for i_var, variant in enumerate(shortened_variants):
-                        if variant in master_codes_set:
-                            found_match = variant
-                            if variant != current_code:
-                                # Dokumentiere zusätzliche Korrekturen
-                                additional_corrections = analyze_corrections(current_code, variant)
-                                if additional_corrections:
-                                    corrections_applied.append(additional_corrections)
-                                print(f"    Zusätzliche OCR-Korrektur: '{current_code}' -> '{variant}' (Variante {i_var+1})")
-                            break
-            
-            # Ergebnis verarbeiten
-            if found_match:
-                validated_codes_from_pdf.add(found_match)
-                
-                # Dokumentiere alle Korrekturen
-                if corrections_applied:
-                    estimated_page = (i // 10) + 1 if i < len(raw_codes_with_positions) else 1
-                    
-                    correction_info.append({
-                        'original': original_code,
-                        'corrected': found_match,
-                        'page': estimated_page,
-                        'position': i,
-                        'method': 'Erweiterte OCR-Korrektur',
-                        'corrections_applied': corrections_applied,
-                        'corrections_count': len(corrections_applied)
-                    })
-                    print(f"  Korrektur-Match dokumentiert: '{original_code}' -> '{found_match}' ({len(corrections_applied)} Korrekturen: {', '.join(corrections_applied)})")
-                else:
-                    print(f"  Unerwarteter Fall: Match gefunden aber keine Korrekturen dokumentiert")
-            else:
-                # Nichts gefunden, auch nicht mit Korrekturen
-                print(f"  Code '{original_code}' konnte nicht korrigiert werden (nicht in Masterliste)")
-        
-        print(f"  Validierte Codes gefunden: {len(validated_codes_from_pdf)}")
-        end_time = time.time()
-        print(f"  Verarbeitung abgeschlossen in {end_time - start_time:.2f} Sekunden.")
-        
-        if return_raw_codes:
-            return validated_codes_from_pdf, raw_codes_with_positions, all_text_lines, correction_info
-        else:
-            return validated_codes_from_pdf
-
-    except subprocess.CalledProcessError as e:
-        print(f"FEHLER: Tesseract Aufruf fehlgeschlagen: {e}")
-        print("Stellen Sie sicher, dass Tesseract korrekt installiert ist.")
-        if return_raw_codes:
-            return set(), [], []
-        else:
-            return set()
-    except FileNotFoundError:
-        print(f"FEHLER: PDF-Datei nicht gefunden: {pdf_path}")
-        if return_raw_codes:
-            return set(), [], []
-        else:
-            return set()
-    except Exception as e:
-        print(f"FEHLER bei der Verarbeitung von {pdf_base_name}: {e}")
-        if return_raw_codes:
-            return set(), [], []
-        else:
-            return set()
-
-# Erweiterte compare_codes Funktion mit bidirektionaler OCR-Korrektur
-def compare_codes_with_correction(codes_pdf1, codes_pdf2, raw_codes_pdf1, raw_codes_pdf2, master_codes_set, all_text_lines_pdf1=None, correction_info_pdf1=None, correction_info_pdf2=None):
-    """
-    Vergleicht zwei Sets von Codes und versucht erweiterte OCR-Korrekturen mit Kontext-Analyse.
-    Implementiert spezielle Behandlung für Steuer-Codes (I-Codes).
-    """
-    print("Vergleiche Codes mit erweiterter bidirektionaler OCR-Korrektur...")
-    
-    # --- NEUE ANFORDERUNG 3: Kategorisiere Codes nach Typ ---
-    pdf1_categories = categorize_codes_by_type(codes_pdf1)
-    pdf2_categories = categorize_codes_by_type(codes_pdf2)
-    
-    print(f"  PDF1: {len(pdf1_categories['normal'])} normale, {len(pdf1_categories['control'])} Steuer-Codes")
-    print(f"  PDF2: {len(pdf2_categories['normal'])} normale, {len(pdf2_categories['control'])} Steuer-Codes")
-    
-    # Basis-Vergleich für normale Codes
-    normal_in_both = pdf1_categories['normal'].intersection(pdf2_categories['normal'])
-    normal_only_in_pdf1 = pdf1_categories['normal'].difference(pdf2_categories['normal'])
-    normal_only_in_pdf2 = pdf2_categories['normal'].difference(pdf1_categories['normal'])
-    
-    # Basis-Vergleich für Steuer-Codes (I-Codes)
-    control_in_both = pdf1_categories['control'].intersection(pdf2_categories['control'])
-    control_only_in_pdf1 = pdf1_categories['control'].difference(pdf2_categories['control'])
-    control_only_in_pdf2 = pdf2_categories['control'].difference(pdf1_categories['control'])
-    
-    # Kombiniere für Gesamtvergleich
-    in_both = normal_in_both.union(control_in_both)
-    only_in_pdf1 = normal_only_in_pdf1.union(control_only_in_pdf1)
-    only_in_pdf2 = normal_only_in_pdf2.union(control_only_in_pdf2)
-    
-    print(f"Vor Korrektur: Beide={len(in_both)}, Nur PDF1={len(only_in_pdf1)}, Nur PDF2={len(only_in_pdf2)}")
-    
-    # OCR-Korrektur anwenden
-    corrector = OCRCorrector(master_codes_set)
-    
-    # Verwende raw_codes_pdf2 direkt (keine Minus Options Filterung mehr nötig)
-    filtered_raw_codes_pdf2 = raw_codes_pdf2
-    
-    # Erstelle sortierte Listen für Kontext-Analyse (nur validierte Codes)
-    pdf1_codes_list = [code for code, page, pos in sorted(raw_codes_pdf1, key=lambda x: (x[1], x[2])) if clean_code_advanced(code, master_codes_set) in master_codes_set]
-    pdf2_codes_list = [code for code, page, pos in sorted(filtered_raw_codes_pdf2, key=lambda x: (x[1], x[2])) if clean_code_advanced(code, master_codes_set) in master_codes_set]
-    
-    # Alle Korrekturen sammeln (inklusive erweiterte OCR-Korrekturen)
-    all_corrections = []
-    corrected_codes_pdf1 = set(codes_pdf1)
-    
-    # Erstelle Liste aller validierten Codes für Kontext-Analyse
-    all_validated_pdf1 = [clean_code_advanced(code, master_codes_set) for code, page, pos in sorted(raw_codes_pdf1, key=lambda x: (x[1], x[2]))]
-    all_validated_pdf1 = [code for code in all_validated_pdf1 if code in master_codes_set]
-    
-    all_validated_pdf2 = [clean_code_advanced(code, master_codes_set) for code, page, pos in sorted(filtered_raw_codes_pdf2, key=lambda x: (x[1], x[2]))]
-    all_validated_pdf2 = [code for code in all_validated_pdf2 if code in master_codes_set]
-    
-    print(f"  Validierte Code-Sequenzen: PDF1={len(all_validated_pdf1)}, PDF2={len(all_validated_pdf2)}")
-    
-    # Füge erweiterte OCR-Korrekturen aus extract_codes hinzu
-    if correction_info_pdf1:
-        for corr_info in correction_info_pdf1:
-            # Hole Kontext für diese Korrektur
-            context_pdf1 = get_validated_context_codes(all_validated_pdf1, corr_info['corrected'], context_size=3)
-            context_pdf2 = get_validated_context_codes(all_validated_pdf2, corr_info['corrected'], context_size=3)
-            
-            # Berechne präzise Wahrscheinlichkeit für erweiterte OCR-Korrekturen
-            corrections_count = count_corrections_needed(corr_info['original'], corr_info['corrected'])
-            
-            # Für erweiterte OCR-Korrekturen: Alle Korrekturen sind in PDF1
-            # WICHTIG: 3 Codes vor/nach prüfen da Korrekturen durchgeführt wurden
-            probability, context_details = calculate_precise_probability(
-                corr_info['corrected'], 
-                corrections_count, 0,  # Alle Korrekturen in PDF1, 0 in PDF2
-                context_pdf1, context_pdf2, 
-                is_in_both=True  # Code wird in beiden PDFs gefunden (nach Korrektur)
-            )
-            
-            # Generiere Korrekturmatch-Kommentar mit 3 Codes vor/nach
-            corrections_details = corr_info.get('corrections_applied', [])
-            detailed_comment = generate_korrekturmatch_comment(
-                corr_info['original'], corr_info['corrected'], 
-                corrections_count, corrections_details, context_details, "PDF1"
-            )
-            
-            all_corrections.append({
-                'original': corr_info['original'],
-                'corrected': corr_info['corrected'],
-                'page': corr_info['page'],
-                'probability': probability,
-                'method': detailed_comment,
-                'factors': ['Erweiterte OCR-Korrektur', 'Kontext-Validierung', 'Master-Code gefunden'],
-                'correction_type': 'Erweiterte OCR-Korrektur'
-            })
-            # WICHTIG: Füge korrigierten Code zu corrected_codes_pdf1 hinzu
-            corrected_codes_pdf1.add(corr_info['corrected'])
-            print(f"  Erweiterte OCR-Korrektur hinzugefügt: '{corr_info['original']}' -> '{corr_info['corrected']}' (P={probability:.0%})")
-    
-    if correction_info_pdf2:
-        for corr_info in correction_info_pdf2:
-            context_pdf1 = get_validated_context_codes(all_validated_pdf1, corr_info['corrected'], context_size=3)
-            context_pdf2 = get_validated_context_codes(all_validated_pdf2, corr_info['corrected'], context_size=3)
-            
-            corrections_count = count_corrections_needed(corr_info['original'], corr_info['corrected'])
-            
-            # Für PDF2 erweiterte OCR-Korrekturen: Alle Korrekturen sind in PDF2
-            probability, context_details = calculate_precise_probability(
-                corr_info['corrected'], 
-                0, corrections_count,  # 0 in PDF1, alle Korrekturen in PDF2
-                context_pdf1, context_pdf2, 
-                is_in_both=True  # Code wird in beiden PDFs gefunden (nach Korrektur)
-            )
-            
-            # Generiere detaillierten Kommentar
-            # Generiere Korrekturmatch-Kommentar für PDF2
-            corrections_details = corr_info.get('corrections_applied', [])
-            detailed_comment = generate_korrekturmatch_comment(
-                corr_info['original'], corr_info['corrected'], 
-                corrections_count, corrections_details, context_details, "PDF2"
-            )
-            
-            all_corrections.append({
-                'original': corr_info['original'],
-                'corrected': corr_info['corrected'],
-                'page': f"PDF2 Seite {corr_info['page']}",
-                'probability': probability,
-                'method': detailed_comment,
-                'factors': ['Erweiterte OCR-Korrektur', 'Kontext-Validierung', 'Master-Code gefunden'],
-                'correction_type': 'Erweiterte OCR-Korrektur'
-            })
-            # Für PDF2 Korrekturen: Diese sind bereits in codes_pdf2, keine Änderung nötig
-            print(f"  Erweiterte OCR-Korrektur PDF2 hinzugefügt: '{corr_info['original']}' -> '{corr_info['corrected']}' (P={probability:.0%})")
-    
-    # 1. Intelligente Leerzeichen-Korrekturen (nur relevante Kombinationen)
-    print("  Suche intelligente Leerzeichen-getrennte Codes...")
-    
-    whitespace_combinations = []
-    
-    if all_text_lines_pdf1:
-        # Sammle alle einzelnen Tokens die potenzielle Code-Fragmente sein könnten
-        potential_fragments = set()
-        for line in all_text_lines_pdf1:
-            tokens = line.split()
-            for token in tokens:
-                clean_token = corrector.clean_whitespace(token).upper()
-                # Nur Tokens die wie Code-Fragmente aussehen (1-4 Zeichen, alphanumerisch)
-                if 1 <= len(clean_token) <= 4 and clean_token.isalnum():
-                    potential_fragments.add(clean_token)
-        
-        print(f"    Gefundene potenzielle Code-Fragmente: {len(potential_fragments)}")
-        
-        # Prüfe nur Kombinationen die zu bekannten Codes führen könnten
-        for line_idx, line in enumerate(all_text_lines_pdf1):
-            tokens = line.split()
-            
-            # Prüfe nur 2-3 Token Kombinationen (nicht 4-5)
-            for start_idx in range(len(tokens)):
-                for end_idx in range(start_idx + 2, min(start_idx + 4, len(tokens) + 1)):
-                    token_group = tokens[start_idx:end_idx]
-                    
-                    # Basis-Kombination
-                    base_combined = corrector.clean_whitespace(''.join(token_group))
-                    
-                    # Nur prüfen wenn die Länge stimmt und es potenzielle Fragmente enthält
-                    if 3 <= len(base_combined) <= 7:
-                        # Prüfe ob mindestens ein Fragment in bekannten Codes vorkommt
-                        is_relevant = False
-                        for token in token_group:
-                            clean_token = corrector.clean_whitespace(token).upper()
-                            if any(clean_token in master_code for master_code in master_codes_set):
-                                is_relevant = True
-                                break
-                        
-                        if is_relevant:
-                            whitespace_combinations.append({
-                                'combined': base_combined,
-                                'parts': token_group,
-                                'line': line_idx,
-                                'method': 'Leerzeichen entfernt',
-                                'substitutions': [],
-                                'penalty': 0
-                            })
-                            
-                            # Nur eine einfache Substitution pro relevante Kombination
-                            simple_variants = corrector.generate_simple_variants(base_combined)
-                            for variant in simple_variants[:3]:  # Maximal 3 Varianten
-                                if variant != base_combined and 3 <= len(variant) <= 7:
-                                    whitespace_combinations.append({
-                                        'combined': variant,
-                                        'parts': token_group,
-                                        'line': line_idx,
-                                        'method': f'Leerzeichen entfernt + einfache Substitution',
-                                        'substitutions': ['OCR-Korrektur'],
-                                        'penalty': 0.1
-                                    })
-        
-        print(f"    Generierte Leerzeichen-Kombinationen: {len(whitespace_combinations)}")
-    else:
-        # Fallback: Einfache Kombinationen
-        raw_codes_only = [code for code, page, pos in raw_codes_pdf1]
-        for i in range(len(raw_codes_only) - 1):
-            combined = corrector.clean_whitespace(raw_codes_only[i] + raw_codes_only[i + 1])
-            if 3 <= len(combined) <= 7:
-                whitespace_combinations.append({
-                    'combined': combined,
-                    'parts': [raw_codes_only[i], raw_codes_only[i + 1]],
-                    'line': i,
-                    'method': 'Leerzeichen entfernt',
-                    'substitutions': [],
-                    'penalty': 0
-                })
-    
-    for combo in whitespace_combinations:
-        combined_cleaned = clean_code_advanced(combo['combined'], master_codes_set)
-        if combined_cleaned in master_codes_set and combined_cleaned in codes_pdf2:
-            # Verbesserte Kontext-Analyse mit nur validierten Codes
-            try:
-                context_pdf1 = corrector.get_validated_context_codes(raw_codes_pdf1, master_codes_set, combo['line'])
-                context_pdf2 = corrector.get_validated_context_codes(filtered_raw_codes_pdf2, master_codes_set, 
-                                                                    pdf2_codes_list.index(combined_cleaned) if combined_cleaned in pdf2_codes_list else 0)
-            except:
-                context_pdf1 = {'before': [], 'after': []}
-                context_pdf2 = {'before': [], 'after': []}
-            
-            # Höhere Wahrscheinlichkeit für komplexere Korrekturen
-            has_substitutions = len(combo['substitutions']) > 0
-            correction_type = "whitespace_and_substitution" if has_substitutions else "whitespace_removal"
-            
-            # Verwende präzise Wahrscheinlichkeits-Berechnung für Leerzeichen-Korrekturen
-            context_pdf1_unified = get_validated_context_codes(all_validated_pdf1, combined_cleaned, context_size=3)
-            context_pdf2_unified = get_validated_context_codes(all_validated_pdf2, combined_cleaned, context_size=3)
-            
-            corrections_count = count_corrections_needed(" ".join(combo['parts']), combined_cleaned)
-            
-            # Leerzeichen-Korrekturen sind normalerweise nur in PDF1
-            probability, context_details = calculate_precise_probability(
-                combined_cleaned, 
-                corrections_count, 0,  # Alle Korrekturen in PDF1
-                context_pdf1_unified, context_pdf2_unified, 
-                is_in_both=True  # Code wird in beiden PDFs gefunden
-            )
-            
-            # Generiere detaillierten Kommentar für Leerzeichen-Korrektur
-            # Generiere Korrekturmatch-Kommentar für Leerzeichen-Korrektur
-            detailed_comment = generate_korrekturmatch_comment(
-                " ".join(combo['parts']), combined_cleaned, 
-                corrections_count, ["Leerzeichen entfernt"], context_details, "PDF1"
-            )
-            
-            factors = []  # Keine Faktoren mehr nötig
-            
-            # Anpassung für komplexe Korrekturen
-            if has_substitutions:
-                # Bonus für erfolgreiche komplexe Korrektur, aber Penalty für mehrfache Substitutionen
-                penalty = combo.get('penalty', 0)
-                probability += 0.1 - penalty  # Extra Bonus minus Penalty
-                probability = max(0.1, min(1.0, probability))
-            
-            if probability >= 0.6:
-                corrected_codes_pdf1.add(combined_cleaned)
-                all_corrections.append({
-                    'original': " ".join(combo['parts']),
-                    'corrected': combined_cleaned,
-                    'page': f"Zeile {combo['line'] + 1}",
-                    'probability': probability,
-                    'method': detailed_comment,
-                    'factors': factors,
-                    'correction_type': 'Korrekturmatch'
-                })
-                print(f"  Erweiterte Korrektur: '{' '.join(combo['parts'])}' -> '{combined_cleaned}' ({combo['method']}, P={probability:.0%})")
-    
-    # 2. Substitutions-Korrekturen (bidirektional)
-    print("  Suche OCR-Verwechslungen...")
-    for target_code in only_in_pdf2:
-        # Generiere mögliche Fehlerkennungen
-        possible_variants = corrector.generate_variants(target_code)
-        
-        # Prüfe rohe Codes aus PDF1
-        for raw_code, page_num, position in raw_codes_pdf1:
-            cleaned_raw = clean_code_advanced(raw_code, master_codes_set)
-            
-            if cleaned_raw in possible_variants and cleaned_raw not in master_codes_set:
-                # Kontext-Analyse
-                try:
-                    pdf1_pos = pdf1_codes_list.index(cleaned_raw) if cleaned_raw in pdf1_codes_list else position
-                    pdf2_pos = pdf2_codes_list.index(target_code) if target_code in pdf2_codes_list else 0
-                except ValueError:
-                    pdf1_pos = position
-                    pdf2_pos = 0
-                
-                context_pdf1 = corrector.get_context_codes(pdf1_codes_list, pdf1_pos)
-                context_pdf2 = corrector.get_context_codes(pdf2_codes_list, pdf2_pos)
-                
-                # Bestimme Korrektur-Typ
-                has_substitution = any(char1 in corrector.substitutions and char2 in corrector.substitutions[char1] 
-                                     for char1, char2 in zip(cleaned_raw, target_code) if char1 != char2)
-                correction_type = "substitution" if has_substitution else "other"
-                
-                # Verwende präzise Wahrscheinlichkeits-Berechnung für OCR-Verwechslungen
-                context_pdf1_unified = get_validated_context_codes(all_validated_pdf1, target_code, context_size=3)
-                context_pdf2_unified = get_validated_context_codes(all_validated_pdf2, target_code, context_size=3)
-                
-                corrections_count = count_corrections_needed(cleaned_raw, target_code)
-                
-                # OCR-Verwechslungen sind normalerweise nur in PDF1
-                probability, context_details = calculate_precise_probability(
-                    target_code, 
-                    corrections_count, 0,  # Alle Korrekturen in PDF1
-                    context_pdf1_unified, context_pdf2_unified, 
-                    is_in_both=True  # Code wird in beiden PDFs gefunden
-                )
-                
-                # Generiere detaillierten Kommentar für OCR-Verwechslung
-                # Generiere Korrekturmatch-Kommentar für OCR-Verwechslung
-                correction_detail = analyze_corrections(cleaned_raw, target_code)
-                detailed_comment = generate_korrekturmatch_comment(
-                    cleaned_raw, target_code, 
-                    corrections_count, [correction_detail], context_details, "PDF1"
-                )
-                
-                factors = []  # Keine Faktoren mehr nötig
-                
-                if probability >= 0.6:
-                    corrected_codes_pdf1.add(target_code)
-                    all_corrections.append({
-                        'original': cleaned_raw,
-                        'corrected': target_code,
-                        'page': page_num,
-                        'probability': probability,
-                        'method': detailed_comment,
-                        'factors': factors,
-                        'correction_type': 'Korrekturmatch'
-                    })
-                    print(f"  OCR-Korrektur: '{cleaned_raw}' -> '{target_code}' (Seite {page_num}, P={probability:.0%})")
-    
-    # 3. Klassifiziere Matches korrekt (Direkter Match vs. Korrekturmatch)
-    print("  Klassifiziere Matches basierend auf tatsächlich durchgeführten Korrekturen...")
-    
-    # Sammle alle Codes die Korrekturen benötigten
-    codes_with_corrections = set()
-    for corr_info in (correction_info_pdf1 or []) + (correction_info_pdf2 or []):
-        if corr_info.get('corrections_count', 0) > 0:
-            codes_with_corrections.add(corr_info['corrected'])
-    
-    for code in in_both:
-        try:
-            # Prüfe ob dieser Code Korrekturen benötigte
-            had_corrections = code in codes_with_corrections
-            
-            if had_corrections:
-                # Bereits als Korrekturmatch in correction_info dokumentiert
-                print(f"    Code '{code}' bereits als Korrekturmatch dokumentiert")
-                continue
-            else:
-                # ECHTER direkter Match - keine Korrekturen waren nötig
-                context_pdf1_unified = get_validated_context_codes(all_validated_pdf1, code, context_size=1)
-                context_pdf2_unified = get_validated_context_codes(all_validated_pdf2, code, context_size=1)
-                
-                # Präzise Wahrscheinlichkeits-Berechnung für echte direkte Matches
-                probability, context_details = calculate_precise_probability(
-                    code, 0, 0,  # 0 Korrekturen in beiden PDFs
-                    context_pdf1_unified, context_pdf2_unified, is_in_both=True
-                )
-                
-                # Generiere Kommentar für echten direkten Match (nur 1 Code vor/nach)
-                detailed_comment = generate_detailed_comment(code, code, 0, 0, context_details, None, None, None)
-                
-                all_corrections.append({
-                    'original': code,
-                    'corrected': code,
-                    'page': 'Beide',
-                    'probability': probability,
-                    'method': detailed_comment,
-                    'factors': [],
-                    'correction_type': 'Direkter Match'
-                })
-                
-                print(f"    Echter direkter Match: '{code}' (P={probability:.0%}) - keine Korrekturen nötig")
-            
-        except ValueError:
-            # Code nicht in sortierter Liste gefunden
-            pass
-    
-    # Neuer Vergleich nach Korrekturen mit Kategorisierung
-    corrected_pdf1_categories = categorize_codes_by_type(corrected_codes_pdf1)
-    corrected_pdf2_categories = categorize_codes_by_type(codes_pdf2)
-    
-    # Normale Codes nach Korrektur
-    normal_in_both_corrected = corrected_pdf1_categories['normal'].intersection(corrected_pdf2_categories['normal'])
-    normal_only_in_pdf1_corrected = corrected_pdf1_categories['normal'].difference(corrected_pdf2_categories['normal'])
-    normal_only_in_pdf2_corrected = corrected_pdf2_categories['normal'].difference(corrected_pdf1_categories['normal'])
-    
-    # Steuer-Codes nach Korrektur
-    control_in_both_corrected = corrected_pdf1_categories['control'].intersection(corrected_pdf2_categories['control'])
-    control_only_in_pdf1_corrected = corrected_pdf1_categories['control'].difference(corrected_pdf2_categories['control'])
-    control_only_in_pdf2_corrected = corrected_pdf2_categories['control'].difference(corrected_pdf1_categories['control'])
-    
-    # Kombinierte Ergebnisse
-    in_both_corrected = normal_in_both_corrected.union(control_in_both_corrected)
-    only_in_pdf1_corrected = normal_only_in_pdf1_corrected.union(control_only_in_pdf1_corrected)
-    only_in_pdf2_corrected = normal_only_in_pdf2_corrected.union(control_only_in_pdf2_corrected)
-    
-    print(f"Nach Korrektur: Beide={len(in_both_corrected)}, Nur PDF1={len(only_in_pdf1_corrected)}, Nur PDF2={len(only_in_pdf2_corrected)}")
-    print(f"  Normale Codes: Beide={len(normal_in_both_corrected)}, Nur PDF1={len(normal_only_in_pdf1_corrected)}, Nur PDF2={len(normal_only_in_pdf2_corrected)}")
-    print(f"  Steuer-Codes: Beide={len(control_in_both_corrected)}, Nur PDF1={len(control_only_in_pdf1_corrected)}, Nur PDF2={len(control_only_in_pdf2_corrected)}")
-    print(f"Korrekturen durchgeführt: {len([c for c in all_corrections if c['correction_type'] != 'Direkter Match'])}")
-    
-    return {
-        'original': {
-            'in_both': in_both,
-            'only_in_pdf1': only_in_pdf1,
-            'only_in_pdf2': only_in_pdf2,
-            # Kategorisierte Original-Ergebnisse
-            'normal': {
-                'in_both': normal_in_both,
-                'only_in_pdf1': normal_only_in_pdf1,
-                'only_in_pdf2': normal_only_in_pdf2
-            },
-            'control': {
-                'in_both': control_in_both,
-                'only_in_pdf1': control_only_in_pdf1,
-                'only_in_pdf2': control_only_in_pdf2
-            }
-        },
-        'corrected': {
-            'in_both': in_both_corrected,
-            'only_in_pdf1': only_in_pdf1_corrected,
-            'only_in_pdf2': only_in_pdf2_corrected,
-            # Kategorisierte korrigierte Ergebnisse
-            'normal': {
-                'in_both': normal_in_both_corrected,
-                'only_in_pdf1': normal_only_in_pdf1_corrected,
-                'only_in_pdf2': normal_only_in_pdf2_corrected
-            },
-            'control': {
-                'in_both': control_in_both_corrected,
-                'only_in_pdf1': control_only_in_pdf1_corrected,
-                'only_in_pdf2': control_only_in_pdf2_corrected
-            }
-        },
-        'corrections': all_corrections,
-        'legend': corrector.probability_legend
-    }
-
-# Alte Funktion für Rückwärtskompatibilität
-def compare_codes(codes_pdf1, codes_pdf2):
-    """
-    Vergleicht zwei Sets von Codes und bildet die drei Mengen.
-    """
-    print("Vergleiche Codes...")
-    in_both = codes_pdf1.intersection(codes_pdf2)
-    only_in_pdf1 = codes_pdf1.difference(codes_pdf2)
-    only_in_pdf2 = codes_pdf2.difference(codes_pdf1)
-
-    print(f"Ergebnis: Beide={len(in_both)}, Nur PDF1={len(only_in_pdf1)}, Nur PDF2={len(only_in_pdf2)}")
-
+# src/core.py
+import fitz  # PyMuPDF
+import re
+import os
+import sys
+import time
+from datetime import datetime
+from functools import lru_cache
+import subprocess
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+import cv2
+import numpy as np
+from .ocr_correction import OCRCorrector
+from .code_filters import categorize_codes_by_type
+
+# Schärfungs-Kernel (einmal berechnet): ersetzt ImageEnhance.Sharpness(2.5)
+# durch eine einzige 3x3-Faltung direkt auf dem Graustufenbild
+_SHARPEN_KERNEL = np.array([[0.0, -0.375, 0.0],
+                            [-0.375, 2.5, -0.375],
+                            [0.0, -0.375, 0.0]], dtype=np.float32)
+
+# Grobe Code-Heuristik für die Frühabbruch-Zählung in der OCR-Schleife -
+# einmal auf Modulebene kompiliert statt pro Zeile
+_CODE_CANDIDATE_RE = re.compile(r'[A-Z0-9]{3,7}')
+
+
+@lru_cache(maxsize=None)
+def _compile_code_pattern(regex_pattern):
+    """
+    Kompiliert das Code-Muster aus der Konfiguration mit Wortgrenzen einmal
+    pro Prozess - das Muster ist über alle Extraktionsläufe identisch, der
+    Cache erspart Compile bzw. Kompilat-Cache-Lookup pro Aufruf.
+    """
+    return re.compile(rf'\b{regex_pattern}\b', re.IGNORECASE)
+
+try:
+    # C++-Implementierung der Editierdistanz (bit-paralleler Myers-Algorithmus)
+    # - ersetzt die Python-Zeichenschleife in count_corrections_needed
+    from rapidfuzz.distance import Levenshtein as _Levenshtein
+except ImportError:
+    _Levenshtein = None
+
+# --- Erweiterte OCR-Korrektur Funktionen ---
+
+# OCR-Verwechslungen (bidirektional) - einmal auf Modulebene statt pro Aufruf
+OCR_SUBSTITUTIONS = {
+    '0': ('O',),
+    'O': ('0',),
+    '8': ('B',),
+    'B': ('8',),
+    'I': ('1', 'L'),
+    '1': ('I', 'L'),
+    'L': ('I', '1'),
+    '5': ('S',),
+    'S': ('5',),
+    '6': ('G',),
+    'G': ('6',),
+    '2': ('Z',),
+    'Z': ('2',)
+}
+
+# Kanonisierung der OCR-Verwechslungsklassen: jedes Zeichen einer Klasse
+# ({0,O}, {8,B}, {1,I,L}, {5,S}, {6,G}, {2,Z}) wird auf einen festen
+# Repräsentanten abgebildet. Zwei Strings sind genau dann durch
+# OCR-Substitutionen ineinander überführbar, wenn ihre kanonischen Formen
+# gleich sind - ein str.translate ersetzt damit die Varianten-Aufzählung.
+_CANON_TABLE = str.maketrans('OBILSGZ', '0811562')
+
+# OPTIMIERT: Flache, über ord() indizierte Lookup-Tabelle der Substitutionen.
+# Die inneren Schleifen der Varianten-Suche schlagen damit per Tupel-Index
+# statt per Dict-Hash nach - über einen Lauf sind das Millionen von
+# Hash-Operationen weniger. Index 0-127 deckt alle ASCII-Zeichen ab;
+# Nicht-ASCII-Zeichen (ord >= 128) haben nie Substitutionen.
+_SUBS_BY_ORD = tuple(OCR_SUBSTITUTIONS.get(chr(i), ()) for i in range(128))
+
+class MasterIndex:
+    """
+    Vorberechnete Nachschlagestrukturen für die Masterliste:
+
+    - full_set: das Original-Set (O(1)-Membership wie bisher)
+    - by_len: Codes gruppiert nach Länge
+    - by_len_first: Codes gruppiert nach (Länge, Anfangszeichen)
+    - lengths: alle in der Masterliste vorkommenden Code-Längen
+    - canonical_to_master: kanonische Form (siehe _CANON_TABLE) -> Master-Code;
+      bildet einen OCR-Token in O(len) direkt auf seinen Korrektur-Treffer ab
+    - ambiguous_canonicals: kanonische Schlüssel, die von mehreren
+      Master-Codes belegt sind, mit ihrem Kandidaten-Set - dort wählt
+      lookup_ocr_correction den Kandidaten mit den wenigsten Abweichungen
+
+    Reiner Speicher-gegen-Zeit-Tausch: die Fuzzy-Fallbacks vergleichen damit
+    nur noch längen-/präfixkompatible Kandidaten statt der ganzen Liste.
+    """
+    __slots__ = ('full_set', 'by_len', 'by_len_first', 'lengths',
+                 'canonical_to_master', 'ambiguous_canonicals')
+
+    def __init__(self, master_codes_set):
+        self.full_set = master_codes_set
+
+        by_len = {}
+        by_len_first = {}
+        for code in master_codes_set:
+            if not code:
+                continue
+            by_len.setdefault(len(code), set()).add(code)
+            by_len_first.setdefault((len(code), code[0]), set()).add(code)
+        self.by_len = by_len
+        self.by_len_first = by_len_first
+        self.lengths = frozenset(by_len)
+
+        by_canonical = {}
+        for code in master_codes_set:
+            by_canonical.setdefault(code.translate(_CANON_TABLE), []).append(code)
+        self.canonical_to_master = {key: codes[0] for key, codes in by_canonical.items() if len(codes) == 1}
+        # Mehrfach belegte Schlüssel behalten ihre Kandidaten-Sets - die
+        # Auflösung testet Varianten dann nur noch gegen diese Handvoll
+        # Codes statt gegen die komplette Masterliste
+        self.ambiguous_canonicals = {
+            key: frozenset(codes) for key, codes in by_canonical.items() if len(codes) > 1
+        }
+
+
+# Wird pro Masterliste nur einmal aufgebaut (die Masterliste ist über den
+# gesamten Lauf dasselbe Objekt, daher reicht ein Identitäts-Vergleich).
+_master_index_cache = None
+
+
+def prepare_master_index(master_codes_set):
+    """Liefert den (gecachten) MasterIndex für die übergebene Masterliste."""
+    global _master_index_cache
+    if _master_index_cache is not None and _master_index_cache.full_set is master_codes_set:
+        return _master_index_cache
+
+    _master_index_cache = MasterIndex(master_codes_set)
+    return _master_index_cache
+
+
+# Substitutionskosten innerhalb der OCR-Verwechslungsklassen: ein Tausch wie
+# 0↔O oder 8↔B ist viel wahrscheinlicher als eine beliebige Fehllesung und
+# kostet daher nur einen Bruchteil einer normalen Editier-Operation
+_OCR_SUB_COST = 0.3
+
+_OCR_CONFUSABLE_PAIRS = frozenset(
+    (orig, sub) for orig, subs in OCR_SUBSTITUTIONS.items() for sub in subs
+)
+
+# Maximale gewichtete Distanz, bis zu der der Fuzzy-Fallback einen
+# Master-Code noch als Korrektur akzeptiert (z.B. drei Klassen-Tausche
+# oder eine beliebige Einzeloperation)
+_WEIGHTED_DISTANCE_THRESHOLD = 1.0
+
+
+def weighted_edit_distance(a, b):
+    """
+    Editierdistanz mit OCR-gewichteten Substitutionskosten: Verwechslungen
+    innerhalb einer Klasse (0↔O, 8↔B, I↔1↔L, 5↔S, 6↔G, 2↔Z) kosten
+    _OCR_SUB_COST, alle anderen Substitutionen sowie Einfügen/Löschen 1.0.
+
+    Eine einzige O(n·m)-DP pro Kandidat ersetzt damit das Hashen von bis zu
+    2^k Substitutions-Varianten und rankt Mehrfach-Verwechslungen zugleich
+    realistischer als eine ungewichtete Distanz.
+    """
+    if a == b:
+        return 0.0
+
+    len_b = len(b)
+    pairs = _OCR_CONFUSABLE_PAIRS
+    prev = [float(j) for j in range(len_b + 1)]
+
+    for i in range(1, len(a) + 1):
+        char_a = a[i - 1]
+        curr = [float(i)]
+        for j in range(1, len_b + 1):
+            char_b = b[j - 1]
+            if char_a == char_b:
+                sub = prev[j - 1]
+            elif (char_a, char_b) in pairs:
+                sub = prev[j - 1] + _OCR_SUB_COST
+            else:
+                sub = prev[j - 1] + 1.0
+            curr.append(min(sub, prev[j] + 1.0, curr[j - 1] + 1.0))
+        prev = curr
+
+    return prev[len_b]
+
+
+def lookup_ocr_correction(master_index, code):
+    """
+    Bildet einen bereinigten OCR-Token in O(len) auf seinen Master-Code ab:
+    ein str.translate auf die kanonische Form plus ein Dict-Lookup ersetzt
+    die Aufzählung von bis zu 3^k Substitutions-Varianten. Teilen sich
+    mehrere Master-Codes denselben kanonischen Schlüssel, gewinnt der
+    Kandidat mit den wenigsten Zeichen-Abweichungen; bleibt auch das
+    mehrdeutig, wird wie im gewichteten Fuzzy-Fallback NICHT korrigiert.
+
+    Returns:
+        str: Der passende Master-Code, oder None wenn keine reine
+             Substitutions-Korrektur existiert oder die Auflösung
+             mehrdeutig ist.
+    """
+    key = code.translate(_CANON_TABLE)
+    hits = master_index.ambiguous_canonicals.get(key)
+    if hits is not None:
+        # Kanonische Gleichheit heißt: jede abweichende Position ist eine
+        # Klassen-Verwechslung, die Anzahl der Abweichungen also genau die
+        # Anzahl nötiger Substitutionen. Explizit über die Handvoll
+        # Kandidaten ranken statt in DFS-Reihenfolge den erstbesten Zweig
+        # zu nehmen - der hing nicht von der Änderungszahl ab
+        best = None
+        best_changes = None
+        ambiguous = False
+        for candidate in hits:
+            changes = sum(a != b for a, b in zip(code, candidate))
+            if best_changes is None or changes < best_changes:
+                best = candidate
+                best_changes = changes
+                ambiguous = False
+            elif changes == best_changes:
+                ambiguous = True
+        if ambiguous:
+            return None
+        return best
+    return master_index.canonical_to_master.get(key)
+
+
+def generate_all_ocr_variants(code):
+    """
+    Generiert alle möglichen OCR-Korrektur-Varianten eines Codes durch systematische Permutation.
+
+    HINWEIS: Nur noch für Aufrufer ohne Masterliste gedacht - die Hot-Paths
+    verwenden lookup_ocr_correction über die kanonische Form.
+    """
+    ocr_substitutions = OCR_SUBSTITUTIONS
+
+    def get_variants_for_position(char):
+        """Gibt alle möglichen Varianten für ein Zeichen zurück (inklusive Original)"""
+        variants = [char]  # Original immer dabei
+        if char in ocr_substitutions:
+            variants.extend(ocr_substitutions[char])
+        return list(set(variants))  # Duplikate entfernen
+    
+    # Generiere alle Kombinationen
+    import itertools
+    
+    position_variants = []
+    for char in code:
+        position_variants.append(get_variants_for_position(char))
+    
+    # Alle Permutationen generieren
+    all_variants = []
+    for combination in itertools.product(*position_variants):
+        variant = ''.join(combination)
+        if variant != code:  # Original nicht doppelt hinzufügen
+            all_variants.append(variant)
+    
+    # Original an den Anfang, dann nach Anzahl Änderungen sortieren
+    def count_changes(variant):
+        return sum(1 for i, char in enumerate(variant) if i < len(code) and char != code[i])
+    
+    all_variants.sort(key=count_changes)
+    return [code] + all_variants  # Original zuerst
+
+def clean_code_advanced(code, master_codes_set=None):
+    """
+    Erweiterte Code-Bereinigung mit systematischer OCR-Korrektur.
+
+    Ablauf:
+    1. Grundbereinigung
+    2. Systematische OCR-Korrektur (alle Permutationen)
+    3. Falls nichts gefunden: 0/O an zweiter Stelle entfernen
+    4. Nochmals systematische OCR-Korrektur
+
+    OPTIMIERT: Für hashbare Masterlisten (frozenset, der Normalfall aus
+    load_master_codes) werden die Ergebnisse memoisiert - dieselben
+    Roh-Tokens laufen in extract_codes und compare_codes_with_correction
+    mehrfach durch die Bereinigung.
+    """
+    if isinstance(master_codes_set, frozenset):
+        return _clean_code_advanced_cached(code, master_codes_set)
+    return _clean_code_advanced_impl(code, master_codes_set)
+
+
+def _clean_code_advanced_impl(code, master_codes_set):
+    if not isinstance(code, str) or not code:
+        return code.strip().upper() if isinstance(code, str) else ""
+
+    # Grundbereinigung - str.rstrip statt Regex: läuft auf C-Ebene und ist
+    # auf kurzen Strings rund eine Größenordnung schneller
+    cleaned = code.strip().rstrip('.,:;)').upper()
+    
+    if not master_codes_set:
+        return cleaned
+    
+    master_index = prepare_master_index(master_codes_set)
+
+    # OPTIMIERT: Längen-Frühausstieg. Alle Korrekturphasen erreichen nur
+    # Master-Codes der Längen len, len-1 (0/O-Entfernung bzw. Löschung)
+    # oder len+1 (Einfügung im Fuzzy-Fallback) - existiert keine dieser
+    # Längen in der Masterliste, kann keine Phase treffen. Das spart die
+    # komplette Varianten-Suche für das Gros des OCR-Rauschens.
+    target_len = len(cleaned)
+    if not {target_len - 1, target_len, target_len + 1} & master_index.lengths:
+        return cleaned
+
+    print(f"    Erweiterte Korrektur für: '{cleaned}'")
+
+    # Phase 1: Systematische OCR-Korrektur (kanonischer O(len)-Lookup)
+    match = lookup_ocr_correction(master_index, cleaned)
+    if match is not None:
+        if match != cleaned:
+            print(f"      OCR-Korrektur: '{cleaned}' -> '{match}'")
+        return match
+
+    # Phase 2: Falls 0 oder O an zweiter Stelle, entfernen und nochmals versuchen
+    if len(cleaned) > 3 and len(cleaned) > 1 and cleaned[1] in ['0', 'O']:
+        shortened = cleaned[0] + cleaned[2:]
+        if len(shortened) >= 3:
+            print(f"      Versuche ohne 2. Stelle: '{cleaned}' -> '{shortened}'")
+
+            match = lookup_ocr_correction(master_index, shortened)
+            if match is not None:
+                print(f"      0/O-Korrektur + OCR: '{cleaned}' -> '{match}' (Verkürzt)")
+                return match
+
+    # Phase 3: Gewichteter Fuzzy-Fallback - eine DP pro längenkompatiblem
+    # Master-Code, Verwechslungen innerhalb der OCR-Klassen kosten nur 0.3.
+    # Findet damit auch Fälle, die die exakte Substitutions-Suche verfehlt
+    # (z.B. Klassen-Tausch plus ein echter Lesefehler).
+    best_code = None
+    best_dist = None
+    best_is_ambiguous = False
+
+    # Kandidaten aus dem Längen-Index statt der kompletten Masterliste:
+    # gleiche Länge nur mit passendem (oder verwechselbarem) Anfangszeichen,
+    # dazu die vollen ±1-Längen-Buckets für Einfüge-/Löschfälle
+    candidates = set()
+    first_ord = ord(cleaned[0])
+    first_subs = _SUBS_BY_ORD[first_ord] if first_ord < 128 else ()
+    for first_char in (cleaned[0], *first_subs):
+        candidates |= master_index.by_len_first.get((target_len, first_char), set())
+    for length in (target_len - 1, target_len + 1):
+        candidates |= master_index.by_len.get(length, set())
+
+    # Mehrdeutigkeit wie in Phase 1 (ambiguous_canonicals) behandeln: teilen
+    # sich zwei Master-Codes die beste Distanz, wird NICHT korrigiert -
+    # sonst hinge die Wahl von der Iterationsreihenfolge des Sets ab
+    for candidate in candidates:
+        dist = weighted_edit_distance(cleaned, candidate)
+        if dist > _WEIGHTED_DISTANCE_THRESHOLD:
+            continue
+        if best_dist is None or dist < best_dist:
+            best_code = candidate
+            best_dist = dist
+            best_is_ambiguous = False
+        elif dist == best_dist:
+            best_is_ambiguous = True
+
+    if best_code is not None:
+        if best_is_ambiguous:
+            print(f"      Mehrdeutige Fuzzy-Korrektur für '{cleaned}' (Distanz {best_dist:.1f}) - keine Korrektur")
+            return cleaned
+        print(f"      Gewichtete Fuzzy-Korrektur: '{cleaned}' -> '{best_code}' (Distanz {best_dist:.1f})")
+        return best_code
+
+    # Nichts gefunden, Original zurückgeben
+    print(f"      Keine Korrektur gefunden für: '{cleaned}'")
+    return cleaned
+
+
+# Memoisierte Variante für hashbare Masterlisten (siehe clean_code_advanced)
+_clean_code_advanced_cached = lru_cache(maxsize=None)(_clean_code_advanced_impl)
+
+
+# --- Alte Funktion für Rückwärtskompatibilität ---
+def clean_code(code, master_codes_set=None):
+    """
+    Wrapper für Rückwärtskompatibilität - verwendet die erweiterte Funktion.
+    """
+    return clean_code_advanced(code, master_codes_set)
+
+@lru_cache(maxsize=None)
+def count_corrections_needed(original, corrected):
+    """
+    Zählt die Anzahl der Korrekturen (Editierdistanz) zwischen Original und korrigiertem Code.
+    Memoisiert - dieselben (original, corrected)-Paare kommen im Vergleich mehrfach vor.
+    """
+    if original == corrected:
+        return 0
+
+    original = original.upper().strip()
+    corrected = corrected.upper().strip()
+
+    if _Levenshtein is not None:
+        return _Levenshtein.distance(original, corrected)
+
+    # Fallback ohne rapidfuzz:
+    # Längenunterschied (Entfernung/Hinzufügung) plus positionsweise
+    # Substitutionen - zip läuft dabei auf C-Ebene über beide Strings,
+    # ohne Index-Arithmetik pro Zeichen im Interpreter
+    length_diff = abs(len(original) - len(corrected))
+    return length_diff + sum(a != b for a, b in zip(original, corrected))
+
+def _build_first_position_index(codes_list):
+    """Baut ein Dict Code -> erste Position für die Liste auf."""
+    # Einmal pro Vergleich aufbauen und an die Korrektur-Schleifen
+    # durchreichen - ohne Index kostet jeder Aufruf ein O(n)-index()
+    pos_of = {}
+    for idx, code in enumerate(codes_list):
+        pos_of.setdefault(code, idx)
+    return pos_of
+
+
+def get_validated_context_codes(all_validated_codes, target_code, context_size=1, position_index=None):
+    """
+    Holt validierte Kontext-Codes vor und nach einem Ziel-Code.
+
+    Args:
+        all_validated_codes (list): Liste aller validierten Codes in Reihenfolge
+        target_code (str): Der Ziel-Code
+        context_size (int): Anzahl Codes vor und nach dem Ziel
+        position_index (dict): Optional vorab gebauter Index Code -> erste
+                               Position für all_validated_codes
+
+    Returns:
+        dict: {'before': [codes], 'after': [codes]}
+    """
+    # OPTIMIERT: O(1)-Dict-Lookup statt list.index pro Aufruf
+    if position_index is None:
+        position_index = _build_first_position_index(all_validated_codes)
+    index = position_index.get(target_code)
+    if index is None:
+        return {'before': [], 'after': []}
+
+    before = all_validated_codes[max(0, index - context_size):index]
+    after = all_validated_codes[index + 1:index + 1 + context_size]
+    return {'before': before, 'after': after}
+
+# Kontext-Gewichtungen (1., 2., 3. Code vorher/nachher) - einmal auf
+# Modulebene als Tupel statt pro Aufruf als frische Listen; die Funktion
+# läuft pro gematchtem Code und damit sehr oft
+_WEIGHTS_NO_CORRECTIONS = ((0.10, 0.05, 0.02), (0.08, 0.05, 0.02))
+_WEIGHTS_ONE_EACH = ((0.10, 0.07, 0.03), (0.10, 0.07, 0.03))
+_WEIGHTS_DEFAULT = ((0.08, 0.05, 0.02), (0.08, 0.05, 0.02))
+
+
+def _pick_weights(total_corrections, corrections_pdf1, corrections_pdf2):
+    """Wählt das (before, after)-Gewichtungspaar für den Kontext-Bonus."""
+    if total_corrections == 0:
+        return _WEIGHTS_NO_CORRECTIONS
+    if total_corrections == 2 and corrections_pdf1 == 1 and corrections_pdf2 == 1:
+        return _WEIGHTS_ONE_EACH
+    return _WEIGHTS_DEFAULT
+
+
+@lru_cache(maxsize=65536)
+def _precise_probability_cached(corrections_pdf1, corrections_pdf2, before_pdf1, after_pdf1,
+                                before_pdf2, after_pdf2, is_in_both):
+    """Gecachter Rechenkern - Kontexte als Tupel, Details als flaches Tupel."""
+    probability = 0.0
+    before_matches = after_matches = 0
+    before_total = after_total = 0
+
+    # Basis-Wahrscheinlichkeit: 40% pro PDF wenn Code in Masterliste
+    if is_in_both:
+        probability = 0.80  # 40% + 40% = 80% für beide PDFs
+    else:
+        probability = 0.40  # 40% für nur ein PDF
+
+    # Korrektur-Abzüge
+    total_corrections = corrections_pdf1 + corrections_pdf2
+    probability -= total_corrections * 0.10  # -10% pro Korrektur
+
+    # Stelle sicher, dass Wahrscheinlichkeit nicht unter 0 fällt
+    probability = max(0.0, probability)
+
+    if is_in_both:
+        # Kontext-Bonus nur wenn Code in beiden PDFs gefunden
+        context_bonus = 0.0
+
+        # Bestimme Kontext-Gewichtungen basierend auf Korrekturen
+        # (vorab berechnete Modul-Tupel, keine Listen-Allokation pro Aufruf)
+        before_weights, after_weights = _pick_weights(total_corrections, corrections_pdf1, corrections_pdf2)
+
+        # Prüfe Kontext vorher (3 Codes)
+        before_total = min(len(before_pdf1), len(before_pdf2), 3)
+
+        for i in range(before_total):
+            if before_pdf1[-(i+1)] == before_pdf2[-(i+1)]:  # Von hinten nach vorne
+                context_bonus += before_weights[i]
+                before_matches += 1
+
+        # Prüfe Kontext nachher (3 Codes)
+        after_total = min(len(after_pdf1), len(after_pdf2), 3)
+
+        for i in range(after_total):
+            if after_pdf1[i] == after_pdf2[i]:
+                context_bonus += after_weights[i]
+                after_matches += 1
+
+        probability += context_bonus
+
+    # Begrenze auf 0% - 100%
+    probability = max(0.0, min(1.0, probability))
+
+    return probability, before_matches, after_matches, before_total, after_total
+
+
+def calculate_precise_probability(code, corrections_pdf1, corrections_pdf2, context_pdf1, context_pdf2, is_in_both=True):
+    """
+    Präzise Wahrscheinlichkeits-Berechnung nach den spezifischen Regeln:
+
+    - Basis: 40% pro PDF wenn Code in Masterliste gefunden
+    - -10% pro Korrektur die vorgenommen werden musste
+    - Kontext-Bonus: 3 Codes vorher/nachher mit unterschiedlichen Gewichtungen
+
+    Returns:
+        tuple: (probability, context_details) - Wahrscheinlichkeit und Kontext-Details für Kommentare
+    """
+    # OPTIMIERT: Die Berechnung hängt nur von Korrektur-Zahlen und Kontexten
+    # ab - wiederkehrende Codes liefern identische Parameter, daher werden
+    # die Kontexte zu hashbaren Tupeln normalisiert und das Ergebnis über
+    # lru_cache wiederverwendet. Das Details-Dict wird pro Aufruf frisch
+    # gebaut, damit Aufrufer es gefahrlos verändern können.
+    probability, before_matches, after_matches, before_total, after_total = _precise_probability_cached(
+        corrections_pdf1, corrections_pdf2,
+        tuple(context_pdf1.get('before', ())), tuple(context_pdf1.get('after', ())),
+        tuple(context_pdf2.get('before', ())), tuple(context_pdf2.get('after', ())),
+        bool(is_in_both))
+
+    context_details = {'before_matches': before_matches, 'after_matches': after_matches,
+                       'before_total': before_total, 'after_total': after_total}
+    return probability, context_details
+
+def calculate_precise_probability_batch(codes, corrections_pdf1, corrections_pdf2, contexts_pdf1, contexts_pdf2, is_in_both=True):
+    """
+    Vektorisierte Variante von calculate_precise_probability für ganze
+    Code-Listen: Basis, Korrektur-Abzüge, Kontext-Bonus und das Clipping
+    laufen als ein NumPy-Durchlauf über alle Codes statt als Python-Schleife
+    pro Code. Die Match-Masken und Kontext-Details (je maximal 3 Einträge
+    pro Richtung) werden weiterhin pro Code aufgebaut.
+
+    Aufrufer: die Korrektur-Übernahme und die Direkter-Match-Schleife in
+    compare_codes_with_correction; die übrigen (kleinen) Pfade bewerten
+    weiterhin skalar.
+
+    Args:
+        codes (list): Die zu bewertenden Codes (nur für die Länge relevant).
+        corrections_pdf1/corrections_pdf2 (list[int]): Korrekturen pro Code.
+        contexts_pdf1/contexts_pdf2 (list[dict]): Kontexte mit 'before'/'after'.
+        is_in_both (bool | list[bool]): Gefunden in beiden PDFs (skalar oder pro Code).
+
+    Returns:
+        tuple: (probabilities, context_details_list) - Listen in Code-Reihenfolge,
+               elementweise identisch zur skalaren Funktion.
+    """
+    n = len(codes)
+    if n == 0:
+        return [], []
+
+    c1 = np.asarray(corrections_pdf1, dtype=np.float64)
+    c2 = np.asarray(corrections_pdf2, dtype=np.float64)
+    if isinstance(is_in_both, bool):
+        both = np.full(n, is_in_both, dtype=bool)
+    else:
+        both = np.asarray(is_in_both, dtype=bool)
+
+    before_match = np.zeros((n, 3), dtype=np.float64)
+    after_match = np.zeros((n, 3), dtype=np.float64)
+    before_w = np.zeros((n, 3), dtype=np.float64)
+    after_w = np.zeros((n, 3), dtype=np.float64)
+    context_details_list = []
+
+    for idx in range(n):
+        details = {'before_matches': 0, 'after_matches': 0, 'before_total': 0, 'after_total': 0}
+        context_details_list.append(details)
+
+        if not both[idx]:
+            continue
+
+        weights = _pick_weights(int(c1[idx]) + int(c2[idx]), corrections_pdf1[idx], corrections_pdf2[idx])
+        before_w[idx] = weights[0]
+        after_w[idx] = weights[1]
+
+        before_pdf1 = contexts_pdf1[idx].get('before', [])
+        before_pdf2 = contexts_pdf2[idx].get('before', [])
+        details['before_total'] = min(len(before_pdf1), len(before_pdf2), 3)
+        for i in range(details['before_total']):
+            if before_pdf1[-(i + 1)] == before_pdf2[-(i + 1)]:  # Von hinten nach vorne
+                before_match[idx, i] = 1.0
+                details['before_matches'] += 1
+
+        after_pdf1 = contexts_pdf1[idx].get('after', [])
+        after_pdf2 = contexts_pdf2[idx].get('after', [])
+        details['after_total'] = min(len(after_pdf1), len(after_pdf2), 3)
+        for i in range(details['after_total']):
+            if after_pdf1[i] == after_pdf2[i]:
+                after_match[idx, i] = 1.0
+                details['after_matches'] += 1
+
+    base = np.where(both, 0.80, 0.40) - (c1 + c2) * 0.10
+    base = np.maximum(base, 0.0)
+    bonus = (before_w * before_match).sum(axis=1) + (after_w * after_match).sum(axis=1)
+    probabilities = np.clip(base + bonus, 0.0, 1.0)
+
+    return probabilities.tolist(), context_details_list
+
+
+def generate_korrekturmatch_comment(original, corrected, corrections_count, corrections_applied, context_details, pdf_source):
+    """
+    Generiert Kommentare speziell für Korrekturmatches nach den neuen Anforderungen.
+    """
+    # Korrekturmatch mit Anzahl Korrekturen
+    comment_parts = [f"Korrekturmatch, {corrections_count} Korrekturen durchgeführt"]
+    
+    # Validierungs-Text für 3 Codes vor/nach
+    validation_parts = []
+    
+    if context_details['before_matches'] > 0:
+        if context_details['before_matches'] == 1:
+            validation_parts.append("1 Code davor validiert")
+        else:
+            validation_parts.append(f"{context_details['before_matches']} Codes davor validiert")
+    
+    if context_details['after_matches'] > 0:
+        if context_details['after_matches'] == 1:
+            validation_parts.append("1 Code danach validiert")
+        else:
+            validation_parts.append(f"{context_details['after_matches']} Codes danach validiert")
+    
+    if validation_parts:
+        comment_parts.extend(validation_parts)
+    
+    return ", ".join(comment_parts)
+
+def generate_detailed_comment(original, corrected, corrections_pdf1, corrections_pdf2, context_details, pdf1_original=None, pdf2_original=None, corrections_applied=None):
+    """
+    Generiert detaillierte Kommentare mit PDF-spezifischen Korrektur-Informationen.
+    """
+    total_corrections = corrections_pdf1 + corrections_pdf2
+    
+    # Bestimme Match-Typ und Kontext-Größe
+    if total_corrections == 0:
+        match_type = "Direkter Match"
+        corrections_text = None
+        context_size = 1  # Bei direktem Match nur 1 Code vor/nach prüfen
+    else:
+        match_type = "Korrektur Match"
+        context_size = 3  # Bei Korrekturen 3 Codes vor/nach prüfen
+        
+        # Verwende tatsächliche Korrektur-Details wenn verfügbar
+        if corrections_applied:
+            correction_parts = []
+            
+            if corrections_pdf1 > 0:
+                pdf1_corrections = corrections_applied if pdf1_original else []
+                if pdf1_corrections:
+                    correction_parts.append(f"PDF1: {', '.join(pdf1_corrections)}")
+            
+            if corrections_pdf2 > 0:
+                pdf2_corrections = corrections_applied if pdf2_original else []
+                if pdf2_corrections:
+                    correction_parts.append(f"PDF2: {', '.join(pdf2_corrections)}")
+            
+            # Fallback wenn keine PDF-spezifischen Details
+            if not correction_parts and corrections_applied:
+                correction_parts.append(', '.join(corrections_applied))
+        else:
+            # Fallback: Analysiere Unterschiede zwischen original und corrected
+            correction_parts = []
+            
+            if corrections_pdf1 > 0 and pdf1_original:
+                pdf1_details = analyze_corrections(pdf1_original, corrected)
+                if pdf1_details:
+                    correction_parts.append(f"PDF1: {pdf1_details}")
+            
+            if corrections_pdf2 > 0 and pdf2_original:
+                pdf2_details = analyze_corrections(pdf2_original, corrected)
+                if pdf2_details:
+                    correction_parts.append(f"PDF2: {pdf2_details}")
+            
+            if not correction_parts and original != corrected:
+                simple_details = analyze_corrections(original, corrected)
+                if simple_details:
+                    correction_parts.append(simple_details)
+        
+        if not correction_parts:
+            correction_parts = ["OCR-Korrektur"]
+        
+        corrections_text = f"{total_corrections} Korrekturen ({', '.join(correction_parts)})"
+    
+    # Generiere Validierungs-Text basierend auf Kontext-Größe
+    validation_parts = []
+    
+    if total_corrections == 0:
+        # Direkter Match: nur 1 Code vor/nach
+        if context_details['before_matches'] > 0:
+            validation_parts.append("1 Code davor validiert")
+        if context_details['after_matches'] > 0:
+            validation_parts.append("1 Code danach validiert")
+    else:
+        # Korrekturen: bis zu 3 Codes vor/nach
+        if context_details['before_matches'] > 0:
+            if context_details['before_matches'] == 1:
+                validation_parts.append("1 Code davor validiert")
+            else:
+                validation_parts.append(f"{context_details['before_matches']} Codes davor validiert")
+        
+        if context_details['after_matches'] > 0:
+            if context_details['after_matches'] == 1:
+                validation_parts.append("1 Code danach validiert")
+            else:
+                validation_parts.append(f"{context_details['after_matches']} Codes danach validiert")
+    
+    # Kombiniere alles
+    if corrections_text:
+        comment_parts = [match_type, corrections_text]
+    else:
+        comment_parts = [match_type]
+    
+    if validation_parts:
+        comment_parts.extend(validation_parts)
+    
+    return ", ".join(comment_parts)
+
+# Labels für dokumentierte Zeichen-Substitutionen: ein Dict-Lookup pro
+# abweichendem Zeichen statt bis zu 12 sequenzieller Vergleichs-Zweige
+_SUB_LABELS = {
+    ('8', 'B'): "8→B", ('B', '8'): "B→8",
+    ('I', '1'): "I→1", ('1', 'I'): "1→I",
+    ('0', 'O'): "0→O", ('O', '0'): "O→0",
+    ('5', 'S'): "5→S", ('S', '5'): "S→5",
+    ('6', 'G'): "6→G", ('G', '6'): "G→6",
+    ('2', 'Z'): "2→Z", ('Z', '2'): "Z→2",
+}
+
+
+@lru_cache(maxsize=None)
+def analyze_corrections(original, corrected):
+    """
+    Analysiert welche spezifischen Korrekturen zwischen original und corrected durchgeführt wurden.
+    Memoisiert - reine String-Funktion, die pro Korrektur-Paar mehrfach aufgerufen wird.
+    """
+    if original == corrected:
+        return None
+    
+    correction_details = []
+    
+    # Prüfe auf 0/O-Entfernung an zweiter Stelle
+    if len(original) > len(corrected) and len(original) > 1 and original[1] in ['0', 'O']:
+        if original[0] + original[2:] == corrected:
+            correction_details.append("0 an 2. Stelle entfernt")
+            return ', '.join(correction_details)
+    
+    # Prüfe auf Zeichen-Substitutionen (Dict-Lookup statt elif-Kette)
+    for orig_char, corr_char in zip(original, corrected):
+        if orig_char != corr_char:
+            label = _SUB_LABELS.get((orig_char, corr_char))
+            if label:
+                correction_details.append(label)
+    
+    # Prüfe auf Leerzeichen-Entfernung
+    if ' ' in original and ' ' not in corrected:
+        correction_details.append("Leerzeichen entfernt")
+    
+    return ', '.join(correction_details) if correction_details else "OCR-Korrektur"
+
+def calculate_unified_probability(original, corrected, context_pdf1, context_pdf2, master_codes_set):
+    """
+    Wrapper für Rückwärtskompatibilität - verwendet die neue präzise Berechnung.
+    """
+    corrections_count = count_corrections_needed(original, corrected)
+    
+    # Für diese Funktion nehmen wir an, dass es sich um einen Match in beiden PDFs handelt
+    # und die Korrekturen gleichmäßig verteilt sind
+    corrections_pdf1 = corrections_count // 2
+    corrections_pdf2 = corrections_count - corrections_pdf1
+    
+    probability, context_details = calculate_precise_probability(
+        corrected, corrections_pdf1, corrections_pdf2, 
+        context_pdf1, context_pdf2, is_in_both=True
+    )
+    
+    return probability
+
+# --- Debug Funktion zum Speichern des OCR-Textes ---
+def save_ocr_debug(pdf_base_name, page_num, text_lines):
+    """
+    Speichert die erkannten OCR-Textzeilen für eine Seite in einer Debug-Datei.
+
+    Schreibt nur, wenn die Umgebungsvariable PDF_OCR_DEBUG gesetzt ist - im
+    Normalbetrieb entstehen sonst bei jedem Lauf ungenutzte Dateien.
+    """
+    if not os.environ.get("PDF_OCR_DEBUG"):
+        return
+
+    debug_dir = "debug_ocr_text"
+    os.makedirs(debug_dir, exist_ok=True)
+    safe_pdf_name = re.sub(r'[\\/*?:"<>|]', '', pdf_base_name)
+    filename = f"{safe_pdf_name}_page_{page_num+1}_multi_ocr.txt"
+    filepath = os.path.join(debug_dir, filename)
+
+    try:
+        # OPTIMIERT: Zeilen einmal joinen und in einem Rutsch schreiben
+        # statt ein write-Aufruf pro Zeile
+        with open(filepath, "w", encoding="utf-8") as f:
+            f.write(f"--- Multi-Ansatz OCR Text von {pdf_base_name}, Seite {page_num+1} ---\n\n")
+            f.write("\n".join(text_lines))
+            f.write("\n\n--------------------------------------------")
+        # print(f"  OCR Debug Text gespeichert: {filepath}") # Optional: Bestätigung im Terminal
+    except Exception as e:
+        print(f"  FEHLER beim Speichern des OCR Debug Textes für Seite {page_num+1}: {e}")
+
+
+def _run_tesseract_png(tesseract_path, png_bytes, psm, timeout=10):
+    """
+    Führt Tesseract über stdin/stdout aus: das Bild wird als PNG-Bytes direkt
+    in den Prozess gepipet statt über eine Temp-Datei auf der Platte. Das
+    spart pro Aufruf einen kompletten Schreib-/Lese-Durchlauf von mehreren MB.
+
+    Returns:
+        str: Der erkannte Text, oder None bei Fehlern/Timeout.
+    """
+    cmd = [tesseract_path, "stdin", "stdout", "-l", "deu+eng+fra+ita", "--psm", psm,
+           "-c", "tessedit_char_whitelist=ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"]
+    try:
+        result = subprocess.run(cmd, input=png_bytes, capture_output=True, timeout=timeout)
+    except Exception:
+        return None  # Ignoriere Fehler einzelner Versuche
+
+    if result.returncode != 0:
+        return None
+    return result.stdout.decode('utf-8', errors='replace')
+
+
+def _ingest_ocr(ocr_text, dedup_set, debug_lines, method_name):
+    """
+    Verarbeitet das Roh-Ergebnis eines Tesseract-Laufs in einem einzigen
+    Durchlauf: Zeilen strippen, leere verwerfen, in das Dedup-Set übernehmen,
+    für die Debug-Ausgabe sammeln und die Code-Kandidaten zählen. Vorher
+    liefen Strippen, Zählen und Deduplizieren als drei getrennte Durchläufe
+    über denselben Text.
+
+    Gibt die Anzahl der Zeilen mit Code-Kandidaten zurück (für den
+    Frühabbruch und die Methodenwahl der DPI-Leiter).
+    """
+    code_hits = 0
+    debug_lines.append(f"=== {method_name} ===")
+    for line in ocr_text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        dedup_set.add(line)
+        debug_lines.append(line)
+        if _CODE_CANDIDATE_RE.search(line):
+            code_hits += 1
+    debug_lines.append("")
+    return code_hits
+
+
+def _collect_ocr_clips(page, left_area_rect, page_height):
+    """
+    Bestimmt die zu rasternden Bildausschnitte über die Block-Struktur der
+    Seite. PyMuPDF liefert auch für gescannte PDFs Bild-Blöcke mit Bounding-
+    Boxen - statt pauschal die linken 70% der Seite zu rendern, werden nur
+    diese Blöcke gerastert (oft 20-30% der Fläche, entsprechend weniger
+    Vorverarbeitung und Tesseract-CPU). Kopf- und Fußbereiche werden per
+    y-Heuristik übersprungen. Liefert [left_area_rect], wenn keine
+    brauchbaren Blöcke gefunden werden.
+    """
+    clips = []
+    try:
+        blocks = page.get_text("dict", clip=left_area_rect)["blocks"]
+        for block in blocks:
+            if block.get("type") != 1:  # Nur Bild-Blöcke
+                continue
+            bbox = fitz.Rect(block["bbox"]) & left_area_rect
+            if bbox.is_empty:
+                continue
+            # Kopf-/Fußzeilen überspringen (oberste/unterste 5% der Seite)
+            if bbox.y1 < page_height * 0.05 or bbox.y0 > page_height * 0.95:
+                continue
+            # Winzige Blöcke (Logos, Linien) enthalten keine Code-Listen
+            if bbox.width < 20 or bbox.height < 10:
+                continue
+            clips.append(bbox)
+    except Exception:
+        clips = []
+
+    return clips or [left_area_rect]
+
+
+def _render_gray_clips(page, clips, dpi):
+    """
+    Rastert die übergebenen Ausschnitte als Graustufen und stapelt sie
+    (weiß aufgefüllt und durch weiße Trennstreifen getrennt) zu einem
+    einzigen Bild, damit die nachgelagerte Vorverarbeitungs-/OCR-Matrix
+    unverändert auf einem Bild arbeiten kann.
+    """
+    grays = []
+    for clip in clips:
+        pix = page.get_pixmap(clip=clip, dpi=dpi, alpha=False, colorspace=fitz.csGRAY)
+        grays.append(np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width))
+
+    if len(grays) == 1:
+        return grays[0]
+
+    width = max(gray.shape[1] for gray in grays)
+    separator = np.full((20, width), 255, dtype=np.uint8)
+    stacked = []
+    for gray in grays:
+        if gray.shape[1] < width:
+            padding = np.full((gray.shape[0], width - gray.shape[1]), 255, dtype=np.uint8)
+            gray = np.hstack((gray, padding))
+        stacked.append(gray)
+        stacked.append(separator)
+    return np.vstack(stacked[:-1])
+
+
+def _process_page(pdf_path, page_num, tesseract_path, pdf_base_name):
+    """
+    Verarbeitet eine einzelne PDF-Seite (Text-Layer-Prüfung, Vorverarbeitung,
+    Multi-Ansatz-OCR) und liefert (page_num, page_lines) zurück.
+
+    Läuft als eigenständige, picklebare Funktion, damit die Seiten über einen
+    ProcessPoolExecutor parallel verarbeitet werden können. Jeder Worker
+    öffnet das PDF selbst - das MuPDF-Dokument darf nicht zwischen Prozessen
+    geteilt werden.
+    """
+    doc = fitz.open(pdf_path)
+    try:
+        page = doc.load_page(page_num)
+
+        # Extrahiere nur linken Bereich (70% der Seitenbreite)
+        page_width = page.rect.width
+        page_height = page.rect.height
+        left_area_rect = fitz.Rect(0, 0, page_width * 0.7, page_height)
+
+        # Prüfe zuerst Text-Layer
+        page_text = page.get_text(clip=left_area_rect)
+
+        if len(page_text.strip()) < 50:  # Wenig Text = wahrscheinlich Scan
+            print(f"    Seite {page_num + 1}: Führe Multi-Ansatz OCR durch...")
+
+            # Dedupliziertes Gesamtergebnis und Debug-Zeilen werden direkt
+            # beim Eintreffen der OCR-Ergebnisse befüllt (siehe _ingest_ocr)
+            all_text_from_ocr = set()
+            debug_all_results = []
+            ocr_attempts = 0
+
+            # OPTIMIERT: Nur die besten 3 PSM-Modi
+            psm_modes = ["3", "6", "8"]
+
+            # Frühzeitige Beendigung wenn genug Codes gefunden
+            codes_found = 0
+            target_codes = 10  # Beende wenn 10+ Codes gefunden
+            codes_per_method = {}
+
+            # OPTIMIERT: DPI-Leiter statt fixer 300 DPI. Die Pixmap-Größe
+            # wächst quadratisch mit der DPI - 200 DPI braucht nur ~44% der
+            # Pixel von 300 DPI für die gesamte Vorverarbeitungskette. Erst
+            # wenn der erste Durchlauf zu wenige Codes liefert, wird mit
+            # 300 DPI nachgelegt - und dann nur mit der Methode, die im
+            # ersten Durchlauf am besten abgeschnitten hat.
+            dpi_ladder = [200, 300]
+
+            # OPTIMIERT: Nur die Bild-Blöcke der Seite rastern statt pauschal
+            # der linken 70% (Fallback, wenn keine Blöcke erkennbar sind)
+            ocr_clips = _collect_ocr_clips(page, left_area_rect, page_height)
+
+            for dpi in dpi_ladder:
+                if ocr_attempts and codes_found >= target_codes:
+                    break
+
+                # OPTIMIERT: Graustufen direkt aus MuPDF rendern - spart das
+                # RGB-Bild, die PNG-Kodierung und beide cvtColor-Durchläufe
+                gray_raw = _render_gray_clips(page, ocr_clips, dpi)
+
+                # Kontrast 1.8 um den Mittelgrauwert (ersetzt ImageEnhance.Contrast(1.8))
+                gray = cv2.convertScaleAbs(gray_raw, alpha=1.8, beta=128 * (1.0 - 1.8))
+                # Schärfung als einzelne Faltung (ersetzt ImageEnhance.Sharpness(2.5))
+                gray = cv2.filter2D(gray, -1, _SHARPEN_KERNEL)
+
+                # OPTIMIERT: Entrauschen ist der teuerste Vorverarbeitungsschritt -
+                # genau einmal pro Graubild berechnen und das Ergebnis für alle
+                # Binarisierungsmethoden wiederverwenden
+                gray_denoised = cv2.fastNlMeansDenoising(gray, h=10, templateWindowSize=7, searchWindowSize=21)
+
+                # OPTIMIERT: Nur die besten 2 Binarisierungsmethoden
+                methods = [
+                    ("otsu", cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)[1]),
+                    ("denoised_otsu", cv2.threshold(gray_denoised, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)[1])
+                ]
+
+                if codes_per_method:
+                    # Zweite Leiterstufe: nur die bisher beste Methode erneut
+                    # versuchen statt der vollen Matrix
+                    best_method = max(codes_per_method, key=codes_per_method.get)
+                    methods = [m for m in methods if m[0] == best_method] or methods
+
+                # OPTIMIERT: Alle Methode/PSM-Kombinationen vorbereiten (PNG pro
+                # Methode nur einmal im Speicher kodieren) und die unabhängigen
+                # Tesseract-Prozesse gleichzeitig starten. Python wartet sonst
+                # seriell in subprocess.run, obwohl jeder Tesseract-Prozess nur
+                # einen Kern nutzt - die Überlappung ist ein reiner Wall-Clock-Gewinn.
+                ocr_tasks = []
+                for method_name, processed_img in methods:
+                    png_bytes = cv2.imencode('.png', processed_img)[1].tobytes()
+                    for psm in psm_modes:
+                        ocr_tasks.append((method_name, f"{method_name}_dpi{dpi}_psm{psm}", png_bytes, psm))
+
+                with ThreadPoolExecutor(max_workers=len(ocr_tasks)) as executor:
+                    futures = {
+                        executor.submit(_run_tesseract_png, tesseract_path, png_bytes, psm): (method_name, task_name)
+                        for method_name, task_name, png_bytes, psm in ocr_tasks
+                    }
+
+                    for future in as_completed(futures):
+                        if codes_found >= target_codes:
+                            # Genug gefunden - noch nicht gestartete Versuche abbrechen
+                            for pending in futures:
+                                pending.cancel()
+                            break
+
+                        ocr_text = future.result()
+                        ocr_text = ocr_text.strip() if ocr_text else ""
+                        if ocr_text:
+                            method_name, task_name = futures[future]
+                            # Ein Durchlauf: strippen, deduplizieren, Debug
+                            # sammeln und Code-Kandidaten zählen (für den
+                            # Frühabbruch und die Methodenwahl der Leiter)
+                            new_codes = _ingest_ocr(ocr_text, all_text_from_ocr, debug_all_results, task_name)
+                            ocr_attempts += 1
+                            codes_found += new_codes
+                            codes_per_method[method_name] = codes_per_method.get(method_name, 0) + new_codes
+
+            page_lines = list(all_text_from_ocr)
+            print(f"    Seite {page_num + 1}: {len(page_lines)} einzigartige Zeilen aus {ocr_attempts} OCR-Versuchen")
+
+            # Debug: Speichere alle OCR-Versuche
+            save_ocr_debug(pdf_base_name, page_num, debug_all_results)
+
+        else:
+            print(f"    Seite {page_num + 1}: Nutze Text-Layer ({len(page_text.strip())} Zeichen)")
+            page_lines = [line.strip() for line in page_text.splitlines() if line.strip()]
+
+            # Debug: Speichere Text-Layer
+            save_ocr_debug(pdf_base_name, page_num, ["=== TEXT-LAYER ==="] + page_lines)
+
+        return page_num, page_lines
+    finally:
+        doc.close()
+
+
+# --- Extraktion und Vergleichslogik mit OCRmyPDF ---
+def extract_codes(pdf_path, regex_pattern, tesseract_path, master_codes_set, return_raw_codes=False, is_pdf2=False):
+    """
+    Extrahiert Codes aus einer PDF-Datei mit OCRmyPDF und Tesseract.
+    Wendet die clean_code Funktion an und validiert gegen die Masterliste.
+    Erstellt Debug-Ausgaben für bessere Analyse.
+
+    Args:
+        pdf_path (str): Pfad zur PDF-Datei.
+        regex_pattern (str): Das Regex-Muster zum Finden von Codes.
+        tesseract_path (str): Pfad zur Tesseract-Executable.
+        master_codes_set (set): Ein Set mit allen gültigen Codes aus der Masterliste.
+
+    Returns:
+        set: Ein Set mit den bereinigten und validierten, eindeutigen Codes aus der PDF.
+             Gibt ein leeres Set zurück im Fehlerfall oder wenn keine Codes gefunden/validiert.
+    """
+    pdf_base_name = os.path.basename(pdf_path)
+    print(f"Verarbeite PDF: {pdf_base_name} mit Multi-Ansatz OCR...")
+    start_time = time.time()
+    
+    validated_codes_from_pdf = set()
+    raw_codes_with_positions = []  # Für OCR-Korrektur: (code, page_num, position_in_page)
+    
+    try:
+        # --- Erweiterte Tesseract OCR mit Bildverbesserung ---
+        print("  Führe erweiterte OCR mit Tesseract durch...")
+        
+        # Nur die Seitenzahl wird hier gebraucht - jeder Worker öffnet das
+        # PDF selbst (siehe _process_page)
+        doc = fitz.open(pdf_path)
+        page_count = doc.page_count
+        doc.close()
+
+        all_text_lines = []
+
+        if page_count <= 1:
+            # Bei einer einzigen Seite lohnt der Prozess-Spawn nicht
+            page_results = [_process_page(pdf_path, 0, tesseract_path, pdf_base_name)] if page_count else []
+        else:
+            # OPTIMIERT: Seiten parallel verarbeiten - die OCR-Matrix pro
+            # Seite ist CPU-gebunden und die Seiten sind unabhängig
+            with ProcessPoolExecutor(max_workers=min(page_count, os.cpu_count() or 1)) as executor:
+                page_results = list(executor.map(
+                    _process_page,
+                    [pdf_path] * page_count,
+                    range(page_count),
+                    [tesseract_path] * page_count,
+                    [pdf_base_name] * page_count
+                ))
+
+        # --- Codes mit Regex finden und Positionen merken ---
+        raw_codes = []
+
+        # OPTIMIERT: Muster einmal pro Prozess kompilieren (siehe
+        # _compile_code_pattern) - IGNORECASE ersetzt das Uppercasen jeder
+        # kompletten Zeile, nur die Treffer selbst werden noch normalisiert
+        code_re = _compile_code_pattern(regex_pattern)
+
+        # OPTIMIERT: Zusammenführen der Seitenergebnisse und Regex-Suche in
+        # einem Durchlauf statt erst alles zu sammeln und dann erneut über
+        # alle Zeilen zu iterieren. all_text_lines wird weiterhin befüllt -
+        # compare_codes_with_correction braucht die Liste für die
+        # Kontext-Suche (return_raw_codes).
+        page_line_counter = 0  # Separate Zeilenzählung für Seitenschätzung
+        i = 0  # Globaler Zeilenindex über alle Seiten
+        for _page_num, page_lines in sorted(page_results, key=lambda r: r[0]):
+            for line in page_lines:
+                all_text_lines.append(line)
+                found_codes = [code.upper() for code in code_re.findall(line)]
+                for j, code in enumerate(found_codes):
+                    raw_codes.append(code)
+                    # Schätze Seite basierend auf Zeilennummer
+                    if is_pdf2:
+                        # PDF2: Separate Seitenzählung (beginnt bei 1, unabhängig von PDF1)
+                        estimated_page = (page_line_counter // 50) + 1
+                    else:
+                        # PDF1: Normale Seitenzählung
+                        estimated_page = (i // 50) + 1
+                    raw_codes_with_positions.append((code, estimated_page, i * 10 + j))
+
+                if found_codes:  # Nur Zeilen mit Codes zählen für PDF2
+                    page_line_counter += 1
+                i += 1
+        
+        # --- DEBUGGING: Gefundene Roh-Codes ausgeben ---
+        print(f"  Gefundene Roh-Codes ({len(raw_codes)}): {raw_codes}")
+        
+        # Keine speziellen Filter für PDF2 mehr nötig (Minus Options Anforderung entfernt)
+
+        # --- Codes bereinigen und validieren (mit detaillierter Korrektur-Dokumentation) ---
+        correction_info = []  # Sammle Korrektur-Informationen für Reporting
+        
+        for i, code in enumerate(raw_codes):
+            original_code = code.upper().strip()
+
+            # OPTIMIERT: Direkter Vorab-Match - das Gros der Codes ist bereits
+            # sauber und braucht weder Bereinigung noch Korrekturmaschinerie
+            if original_code in master_codes_set:
+                validated_codes_from_pdf.add(original_code)
+                print(f"  Direkter Match: '{original_code}' (keine Korrekturen)")
+                continue
+
+            # SCHRITT 1: Prüfe direkten Match mit Masterliste (nach Grundbereinigung)
+            # str.rstrip statt Regex - C-Ebene, deutlich schneller auf kurzen Strings
+            basic_cleaned = original_code.rstrip('.,:;)')
+
+            if basic_cleaned in master_codes_set:
+                # DIREKTER MATCH - keine Korrekturen nötig
+                validated_codes_from_pdf.add(basic_cleaned)
+                print(f"  Direkter Match: '{original_code}' -> '{basic_cleaned}' (keine Korrekturen)")
+                continue
+            
+            # SCHRITT 2: Code ist nicht direkt in Masterliste - versuche Korrekturen
+            print(f"  '{original_code}' nicht in Masterliste - versuche Korrekturen...")
+            
+            # Dokumentiere alle durchgeführten Korrekturen
+            corrections_applied = []
+            current_code = basic_cleaned
+            
+            # Phase 1: Systematische OCR-Korrektur (kanonischer O(len)-Lookup)
+            master_index = prepare_master_index(master_codes_set)
+            found_match = lookup_ocr_correction(master_index, current_code)
+
+            if found_match is not None and found_match != current_code:
+                # Dokumentiere welche Korrekturen gemacht wurden
+                variant_corrections = analyze_corrections(current_code, found_match)
+                if variant_corrections:
+                    corrections_applied.append(variant_corrections)
+                print(f"    OCR-Korrektur: '{current_code}' -> '{found_match}'")
+
+            # Phase 2: Falls 0 oder O an zweiter Stelle, entfernen und nochmals versuchen
+            if not found_match and len(current_code) > 3 and len(current_code) > 1 and current_code[1] in ['0', 'O']:
+                shortened = current_code[0] + current_code[2:]
+                if len(shortened) >= 3:
+                    corrections_applied.append("0 an 2. Stelle entfernt")
+                    print(f"    0/O-Entfernung: '{current_code}' -> '{shortened}'")
+                    current_code = shortened
+
+                    found_match = lookup_ocr_correction(master_index, current_code)
+                    if found_match is not None and found_match != current_code:
+                        # Dokumentiere zusätzliche Korrekturen
+                        additional_corrections = analyze_corrections(current_code, found_match)
+                        if additional_corrections:
+                            corrections_applied.append(additional_corrections)
+                        print(f"    Zusätzliche OCR-Korrektur: '{current_code}' -> '{found_match}'")
+            
+            # Ergebnis verarbeiten
+            if found_match:
+                validated_codes_from_pdf.add(found_match)
+                
+                # Dokumentiere alle Korrekturen
+                if corrections_applied:
+                    estimated_page = (i // 10) + 1 if i < len(raw_codes_with_positions) else 1
+                    
+                    correction_info.append({
+                        'original': original_code,
+                        'corrected': found_match,
+                        'page': estimated_page,
+                        'position': i,
+                        'method': 'Erweiterte OCR-Korrektur',
+                        'corrections_applied': corrections_applied,
+                        'corrections_count': len(corrections_applied)
+                    })
+                    print(f"  Korrektur-Match dokumentiert: '{original_code}' -> '{found_match}' ({len(corrections_applied)} Korrekturen: {', '.join(corrections_applied)})")
+                else:
+                    print(f"  Unerwarteter Fall: Match gefunden aber keine Korrekturen dokumentiert")
+            else:
+                # Nichts gefunden, auch nicht mit Korrekturen
+                print(f"  Code '{original_code}' konnte nicht korrigiert werden (nicht in Masterliste)")
+        
+        print(f"  Validierte Codes gefunden: {len(validated_codes_from_pdf)}")
+        end_time = time.time()
+        print(f"  Verarbeitung abgeschlossen in {end_time - start_time:.2f} Sekunden.")
+        
+        if return_raw_codes:
+            return validated_codes_from_pdf, raw_codes_with_positions, all_text_lines, correction_info
+        else:
+            return validated_codes_from_pdf
+
+    except subprocess.CalledProcessError as e:
+        print(f"FEHLER: Tesseract Aufruf fehlgeschlagen: {e}")
+        print("Stellen Sie sicher, dass Tesseract korrekt installiert ist.")
+        if return_raw_codes:
+            return set(), [], []
+        else:
+            return set()
+    except FileNotFoundError:
+        print(f"FEHLER: PDF-Datei nicht gefunden: {pdf_path}")
+        if return_raw_codes:
+            return set(), [], []
+        else:
+            return set()
+    except Exception as e:
+        print(f"FEHLER bei der Verarbeitung von {pdf_base_name}: {e}")
+        if return_raw_codes:
+            return set(), [], []
+        else:
+            return set()
+
+# Erweiterte compare_codes Funktion mit bidirektionaler OCR-Korrektur
+def compare_codes_with_correction(codes_pdf1, codes_pdf2, raw_codes_pdf1, raw_codes_pdf2, master_codes_set, all_text_lines_pdf1=None, correction_info_pdf1=None, correction_info_pdf2=None):
+    """
+    Vergleicht zwei Sets von Codes und versucht erweiterte OCR-Korrekturen mit Kontext-Analyse.
+    Implementiert spezielle Behandlung für Steuer-Codes (I-Codes).
+    """
+    print("Vergleiche Codes mit erweiterter bidirektionaler OCR-Korrektur...")
+
+    # OPTIMIERT: Masterliste einmal als frozenset einfrieren - damit greift
+    # der gecachte Pfad von clean_code_advanced auch dann, wenn ein Aufrufer
+    # ein normales Set übergibt (load_master_codes liefert bereits frozenset)
+    if not isinstance(master_codes_set, frozenset):
+        master_codes_set = frozenset(master_codes_set)
+
+    # OPTIMIERT: Meldungen aus den engen Korrektur-Schleifen werden gepuffert
+    # und pro Abschnitt als ein einziger stdout-Schreibvorgang ausgegeben -
+    # print pro Korrektur kostet sonst Encoding plus Flush je Zeile
+    log_lines = []
+    log = log_lines.append
+
+    def flush_log():
+        if log_lines:
+            sys.stdout.write('\n'.join(log_lines) + '\n')
+            log_lines.clear()
+
+
+    # --- NEUE ANFORDERUNG 3: Kategorisiere Codes nach Typ ---
+    pdf1_categories = categorize_codes_by_type(codes_pdf1)
+    pdf2_categories = categorize_codes_by_type(codes_pdf2)
+    
+    print(f"  PDF1: {len(pdf1_categories['normal'])} normale, {len(pdf1_categories['control'])} Steuer-Codes")
+    print(f"  PDF2: {len(pdf2_categories['normal'])} normale, {len(pdf2_categories['control'])} Steuer-Codes")
+    
+    # Basis-Vergleich für normale Codes
+    normal_in_both = pdf1_categories['normal'].intersection(pdf2_categories['normal'])
+    normal_only_in_pdf1 = pdf1_categories['normal'].difference(pdf2_categories['normal'])
+    normal_only_in_pdf2 = pdf2_categories['normal'].difference(pdf1_categories['normal'])
+    
+    # Basis-Vergleich für Steuer-Codes (I-Codes)
+    control_in_both = pdf1_categories['control'].intersection(pdf2_categories['control'])
+    control_only_in_pdf1 = pdf1_categories['control'].difference(pdf2_categories['control'])
+    control_only_in_pdf2 = pdf2_categories['control'].difference(pdf1_categories['control'])
+    
+    # Kombiniere für Gesamtvergleich
+    # OPTIMIERT: Operator-Form statt .union() - spart den Attribut-Lookup
+    # pro Aufruf und liest sich wie die übrigen Mengen-Verknüpfungen
+    in_both = normal_in_both | control_in_both
+    only_in_pdf1 = normal_only_in_pdf1 | control_only_in_pdf1
+    only_in_pdf2 = normal_only_in_pdf2 | control_only_in_pdf2
+    
+    print(f"Vor Korrektur: Beide={len(in_both)}, Nur PDF1={len(only_in_pdf1)}, Nur PDF2={len(only_in_pdf2)}")
+    
+    # OCR-Korrektur anwenden
+    corrector = OCRCorrector(master_codes_set)
+    
+    # Verwende raw_codes_pdf2 direkt (keine Minus Options Filterung mehr nötig)
+    filtered_raw_codes_pdf2 = raw_codes_pdf2
+    
+    # OPTIMIERT: Pro PDF einmal sortieren und einmal bereinigen statt
+    # derselben Sortierung und clean_code_advanced-Kaskade je zweimal für
+    # die Roh- und die validierte Liste
+    sorted_raw_pdf1 = sorted(raw_codes_pdf1, key=lambda x: (x[1], x[2]))
+    sorted_raw_pdf2 = sorted(filtered_raw_codes_pdf2, key=lambda x: (x[1], x[2]))
+    cleaned_pairs_pdf1 = [(code, clean_code_advanced(code, master_codes_set)) for code, page, pos in sorted_raw_pdf1]
+    cleaned_pairs_pdf2 = [(code, clean_code_advanced(code, master_codes_set)) for code, page, pos in sorted_raw_pdf2]
+
+    # Erstelle sortierte Listen für Kontext-Analyse (nur validierte Codes)
+    pdf1_codes_list = [raw for raw, cleaned in cleaned_pairs_pdf1 if cleaned in master_codes_set]
+    pdf2_codes_list = [raw for raw, cleaned in cleaned_pairs_pdf2 if cleaned in master_codes_set]
+
+    # Alle Korrekturen sammeln (inklusive erweiterte OCR-Korrekturen)
+    all_corrections = []
+    # copy() übernimmt die Hash-Tabelle direkt statt jedes Element neu zu hashen
+    corrected_codes_pdf1 = codes_pdf1.copy()
+
+    # Erstelle Liste aller validierten Codes für Kontext-Analyse
+    all_validated_pdf1 = [cleaned for raw, cleaned in cleaned_pairs_pdf1 if cleaned in master_codes_set]
+    all_validated_pdf2 = [cleaned for raw, cleaned in cleaned_pairs_pdf2 if cleaned in master_codes_set]
+
+    # Positions-Indizes einmal pro Vergleich aufbauen (siehe
+    # _build_first_position_index) - die Listen ändern sich danach nicht mehr
+    pdf1_pos_index = _build_first_position_index(pdf1_codes_list)
+    pdf2_pos_index = _build_first_position_index(pdf2_codes_list)
+    validated_pdf1_index = _build_first_position_index(all_validated_pdf1)
+    validated_pdf2_index = _build_first_position_index(all_validated_pdf2)
+    
+    print(f"  Validierte Code-Sequenzen: PDF1={len(all_validated_pdf1)}, PDF2={len(all_validated_pdf2)}")
+    
+    # OPTIMIERT: Ein gemeinsamer Ablauf für beide PDFs statt zwei fast
+    # identischer ~40-Zeilen-Blöcke - eine Code-Version zu pflegen, und
+    # CPython kann die heiße Aufrufstelle einheitlich spezialisieren
+    def apply_extracted_corrections(corr_infos, source_pdf):
+        """Übernimmt die in extract_codes dokumentierten Korrekturen eines PDFs."""
+        is_pdf1 = source_pdf == "PDF1"
+        corr_infos = corr_infos or []
+        if not corr_infos:
+            return
+
+        # OPTIMIERT: Kontexte und Korrektur-Zahlen erst einsammeln, dann alle
+        # Wahrscheinlichkeiten in EINEM vektorisierten Aufruf berechnen statt
+        # skalar pro Korrektur (siehe calculate_precise_probability_batch)
+        contexts_pdf1 = []
+        contexts_pdf2 = []
+        counts = []
+        for corr_info in corr_infos:
+            contexts_pdf1.append(get_validated_context_codes(all_validated_pdf1, corr_info['corrected'], context_size=3, position_index=validated_pdf1_index))
+            contexts_pdf2.append(get_validated_context_codes(all_validated_pdf2, corr_info['corrected'], context_size=3, position_index=validated_pdf2_index))
+            counts.append(count_corrections_needed(corr_info['original'], corr_info['corrected']))
+
+        # Alle Korrekturen liegen im Quell-PDF
+        # WICHTIG: 3 Codes vor/nach prüfen da Korrekturen durchgeführt wurden
+        zeros = [0] * len(corr_infos)
+        probabilities, details_list = calculate_precise_probability_batch(
+            [corr_info['corrected'] for corr_info in corr_infos],
+            counts if is_pdf1 else zeros,
+            zeros if is_pdf1 else counts,
+            contexts_pdf1, contexts_pdf2,
+            is_in_both=True  # Code wird in beiden PDFs gefunden (nach Korrektur)
+        )
+
+        for corr_info, corrections_count, probability, context_details in zip(
+                corr_infos, counts, probabilities, details_list):
+            # Generiere Korrekturmatch-Kommentar mit 3 Codes vor/nach
+            corrections_details = corr_info.get('corrections_applied', [])
+            detailed_comment = generate_korrekturmatch_comment(
+                corr_info['original'], corr_info['corrected'],
+                corrections_count, corrections_details, context_details, source_pdf
+            )
+
+            all_corrections.append({
+                'original': corr_info['original'],
+                'corrected': corr_info['corrected'],
+                'page': corr_info['page'] if is_pdf1 else f"PDF2 Seite {corr_info['page']}",
+                'probability': probability,
+                'method': detailed_comment,
+                'factors': ['Erweiterte OCR-Korrektur', 'Kontext-Validierung', 'Master-Code gefunden'],
+                'correction_type': 'Erweiterte OCR-Korrektur'
+            })
+            if is_pdf1:
+                # WICHTIG: Füge korrigierten Code zu corrected_codes_pdf1 hinzu
+                corrected_codes_pdf1.add(corr_info['corrected'])
+                log(f"  Erweiterte OCR-Korrektur hinzugefügt: '{corr_info['original']}' -> '{corr_info['corrected']}' (P={probability:.0%})")
+            else:
+                # Für PDF2 Korrekturen: Diese sind bereits in codes_pdf2, keine Änderung nötig
+                log(f"  Erweiterte OCR-Korrektur PDF2 hinzugefügt: '{corr_info['original']}' -> '{corr_info['corrected']}' (P={probability:.0%})")
+
+    # Füge erweiterte OCR-Korrekturen aus extract_codes hinzu
+    apply_extracted_corrections(correction_info_pdf1, "PDF1")
+    apply_extracted_corrections(correction_info_pdf2, "PDF2")
+
+
+    # 1. Intelligente Leerzeichen-Korrekturen (nur relevante Kombinationen)
+    flush_log()
+    print("  Suche intelligente Leerzeichen-getrennte Codes...")
+    
+    whitespace_combinations = []
+    
+    if all_text_lines_pdf1:
+        # OPTIMIERT: Ein einziger Durchlauf über die Zeilen baut die
+        # Fragment-Menge UND den Token-Cache für die Kombinations-Schleife -
+        # vorher wurde jede Zeile zweimal gesplittet und bereinigt
+        potential_fragments = set()
+        line_token_cache = []  # (tokens, upper_tokens, cum_concat) je Zeile
+        for line in all_text_lines_pdf1:
+            tokens = line.split()
+            cleaned_tokens = [corrector.clean_whitespace(token) for token in tokens]
+            upper_tokens = [token.upper() for token in cleaned_tokens]
+            cum_concat = ['']
+            for token in cleaned_tokens:
+                cum_concat.append(cum_concat[-1] + token)
+            line_token_cache.append((tokens, upper_tokens, cum_concat))
+
+            # Nur Tokens die wie Code-Fragmente aussehen (1-4 Zeichen, alphanumerisch)
+            for token in upper_tokens:
+                if 1 <= len(token) <= 4 and token.isalnum():
+                    potential_fragments.add(token)
+
+        print(f"    Gefundene potenzielle Code-Fragmente: {len(potential_fragments)}")
+
+        # OPTIMIERT: Substring-Index statt linearem Scan. Der Relevanz-Check
+        # lief vorher als `any(token in master_code for ...)` über die ganze
+        # Masterliste - pro Token O(|Masterliste|·|Code|). Alle Substrings
+        # aller Master-Codes einmal in ein Set gelegt macht daraus einen
+        # O(1)-Membership-Test; bei Codes mit 3-7 Zeichen sind das höchstens
+        # ~28 kurze Strings pro Master-Code.
+        master_substrings = {
+            master_code[i:j]
+            for master_code in master_codes_set
+            for i in range(len(master_code))
+            for j in range(i + 1, len(master_code) + 1)
+        }
+
+        # OPTIMIERT: Bereits gesehene (Kombination, Tokens)-Paare überspringen -
+        # sich wiederholende Vorlagen-Zeilen erzeugen sonst dieselbe Kombination
+        # mehrfach und jede davon durchläuft unten clean_code_advanced plus
+        # Kontext- und Wahrscheinlichkeits-Berechnung
+        seen_combinations = set()
+
+        # Prüfe nur Kombinationen die zu bekannten Codes führen könnten -
+        # die Tokens kommen fertig bereinigt aus dem Cache der ersten Schleife
+        for line_idx, (tokens, upper_tokens, cum_concat) in enumerate(line_token_cache):
+            # Prüfe nur 2-3 Token Kombinationen (nicht 4-5)
+            for start_idx in range(len(tokens)):
+                start_len = len(cum_concat[start_idx])
+                for end_idx in range(start_idx + 2, min(start_idx + 4, len(tokens) + 1)):
+                    token_group = tokens[start_idx:end_idx]
+
+                    # Basis-Kombination als Slice der kumulierten Konkatenation
+                    base_combined = cum_concat[end_idx][start_len:]
+
+                    # Nur prüfen wenn die Länge stimmt und es potenzielle Fragmente enthält
+                    if 3 <= len(base_combined) <= 7:
+                        # Prüfe ob mindestens ein Fragment in bekannten Codes vorkommt
+                        is_relevant = False
+                        for clean_token in upper_tokens[start_idx:end_idx]:
+                            if clean_token in master_substrings:
+                                is_relevant = True
+                                break
+
+                        if is_relevant:
+                            parts_key = tuple(token_group)
+                            if (base_combined, parts_key) not in seen_combinations:
+                                seen_combinations.add((base_combined, parts_key))
+                                whitespace_combinations.append({
+                                    'combined': base_combined,
+                                    'parts': token_group,
+                                    'line': line_idx,
+                                    'method': 'Leerzeichen entfernt',
+                                    'substitutions': [],
+                                    'penalty': 0
+                                })
+
+                            # Nur eine einfache Substitution pro relevante Kombination
+                            simple_variants = corrector.generate_simple_variants(base_combined)
+                            for variant in simple_variants[:3]:  # Maximal 3 Varianten
+                                if variant != base_combined and 3 <= len(variant) <= 7:
+                                    if (variant, parts_key) in seen_combinations:
+                                        continue
+                                    seen_combinations.add((variant, parts_key))
+                                    whitespace_combinations.append({
+                                        'combined': variant,
+                                        'parts': token_group,
+                                        'line': line_idx,
+                                        'method': f'Leerzeichen entfernt + einfache Substitution',
+                                        'substitutions': ['OCR-Korrektur'],
+                                        'penalty': 0.1
+                                    })
+        
+        print(f"    Generierte Leerzeichen-Kombinationen: {len(whitespace_combinations)}")
+    else:
+        # Fallback: Einfache Kombinationen
+        raw_codes_only = [code for code, page, pos in raw_codes_pdf1]
+        for i in range(len(raw_codes_only) - 1):
+            combined = corrector.clean_whitespace(raw_codes_only[i] + raw_codes_only[i + 1])
+            if 3 <= len(combined) <= 7:
+                whitespace_combinations.append({
+                    'combined': combined,
+                    'parts': [raw_codes_only[i], raw_codes_only[i + 1]],
+                    'line': i,
+                    'method': 'Leerzeichen entfernt',
+                    'substitutions': [],
+                    'penalty': 0
+                })
+    
+    for combo in whitespace_combinations:
+        combined_cleaned = clean_code_advanced(combo['combined'], master_codes_set)
+        if combined_cleaned in master_codes_set and combined_cleaned in codes_pdf2:
+            # Verbesserte Kontext-Analyse mit nur validierten Codes
+            try:
+                context_pdf1 = corrector.get_validated_context_codes(raw_codes_pdf1, master_codes_set, combo['line'])
+                context_pdf2 = corrector.get_validated_context_codes(filtered_raw_codes_pdf2, master_codes_set, 
+                                                                    pdf2_pos_index.get(combined_cleaned, 0))
+            except:
+                context_pdf1 = {'before': [], 'after': []}
+                context_pdf2 = {'before': [], 'after': []}
+            
+            # Höhere Wahrscheinlichkeit für komplexere Korrekturen
+            has_substitutions = len(combo['substitutions']) > 0
+            correction_type = "whitespace_and_substitution" if has_substitutions else "whitespace_removal"
+            
+            # Verwende präzise Wahrscheinlichkeits-Berechnung für Leerzeichen-Korrekturen
+            context_pdf1_unified = get_validated_context_codes(all_validated_pdf1, combined_cleaned, context_size=3, position_index=validated_pdf1_index)
+            context_pdf2_unified = get_validated_context_codes(all_validated_pdf2, combined_cleaned, context_size=3, position_index=validated_pdf2_index)
+            
+            corrections_count = count_corrections_needed(" ".join(combo['parts']), combined_cleaned)
+            
+            # Leerzeichen-Korrekturen sind normalerweise nur in PDF1
+            probability, context_details = calculate_precise_probability(
+                combined_cleaned, 
+                corrections_count, 0,  # Alle Korrekturen in PDF1
+                context_pdf1_unified, context_pdf2_unified, 
+                is_in_both=True  # Code wird in beiden PDFs gefunden
+            )
+            
+            # Generiere detaillierten Kommentar für Leerzeichen-Korrektur
+            # Generiere Korrekturmatch-Kommentar für Leerzeichen-Korrektur
+            detailed_comment = generate_korrekturmatch_comment(
+                " ".join(combo['parts']), combined_cleaned, 
+                corrections_count, ["Leerzeichen entfernt"], context_details, "PDF1"
+            )
+            
+            factors = []  # Keine Faktoren mehr nötig
+            
+            # Anpassung für komplexe Korrekturen
+            if has_substitutions:
+                # Bonus für erfolgreiche komplexe Korrektur, aber Penalty für mehrfache Substitutionen
+                penalty = combo.get('penalty', 0)
+                probability += 0.1 - penalty  # Extra Bonus minus Penalty
+                probability = max(0.1, min(1.0, probability))
+            
+            if probability >= 0.6:
+                corrected_codes_pdf1.add(combined_cleaned)
+                all_corrections.append({
+                    'original': " ".join(combo['parts']),
+                    'corrected': combined_cleaned,
+                    'page': f"Zeile {combo['line'] + 1}",
+                    'probability': probability,
+                    'method': detailed_comment,
+                    'factors': factors,
+                    'correction_type': 'Korrekturmatch'
+                })
+                log(f"  Erweiterte Korrektur: '{' '.join(combo['parts'])}' -> '{combined_cleaned}' ({combo['method']}, P={probability:.0%})")
+    
+    # 2. Substitutions-Korrekturen (bidirektional)
+    flush_log()
+    print("  Suche OCR-Verwechslungen...")
+
+    # OPTIMIERT: Invertierter Varianten-Index - statt für jeden Ziel-Code
+    # alle PDF1-Rohcodes gegen dessen Varianten-Set zu proben
+    # (|only_in_pdf2| x |raw_codes_pdf1| Durchläufe), wird die
+    # Varianten-Menge jedes Ziel-Codes einmal invertiert und jeder Rohcode
+    # in einem einzigen Sweep per Dict-Lookup zugeordnet. Teilen sich
+    # mehrere Ziel-Codes eine Variante, bleiben alle als Kandidaten erhalten.
+    variant_to_targets = {}
+    for target_code in only_in_pdf2:
+        for variant in corrector.generate_variants(target_code):
+            variant_to_targets.setdefault(variant, []).append(target_code)
+
+    # Prüfe rohe Codes aus PDF1
+    for raw_code, page_num, position in raw_codes_pdf1:
+        cleaned_raw = clean_code_advanced(raw_code, master_codes_set)
+
+        matched_targets = variant_to_targets.get(cleaned_raw)
+        if matched_targets and cleaned_raw not in master_codes_set:
+            for target_code in matched_targets:
+                # Kontext-Analyse (O(1)-Positions-Lookup statt list.index)
+                pdf1_pos = pdf1_pos_index.get(cleaned_raw, position)
+                pdf2_pos = pdf2_pos_index.get(target_code, 0)
+                
+                context_pdf1 = corrector.get_context_codes(pdf1_codes_list, pdf1_pos)
+                context_pdf2 = corrector.get_context_codes(pdf2_codes_list, pdf2_pos)
+                
+                # Bestimme Korrektur-Typ
+                has_substitution = any((char1, char2) in corrector.substitution_pairs
+                                     for char1, char2 in zip(cleaned_raw, target_code) if char1 != char2)
+                correction_type = "substitution" if has_substitution else "other"
+                
+                # Verwende präzise Wahrscheinlichkeits-Berechnung für OCR-Verwechslungen
+                context_pdf1_unified = get_validated_context_codes(all_validated_pdf1, target_code, context_size=3, position_index=validated_pdf1_index)
+                context_pdf2_unified = get_validated_context_codes(all_validated_pdf2, target_code, context_size=3, position_index=validated_pdf2_index)
+                
+                corrections_count = count_corrections_needed(cleaned_raw, target_code)
+                
+                # OCR-Verwechslungen sind normalerweise nur in PDF1
+                probability, context_details = calculate_precise_probability(
+                    target_code, 
+                    corrections_count, 0,  # Alle Korrekturen in PDF1
+                    context_pdf1_unified, context_pdf2_unified, 
+                    is_in_both=True  # Code wird in beiden PDFs gefunden
+                )
+                
+                # Generiere detaillierten Kommentar für OCR-Verwechslung
+                # Generiere Korrekturmatch-Kommentar für OCR-Verwechslung
+                correction_detail = analyze_corrections(cleaned_raw, target_code)
+                detailed_comment = generate_korrekturmatch_comment(
+                    cleaned_raw, target_code, 
+                    corrections_count, [correction_detail], context_details, "PDF1"
+                )
+                
+                factors = []  # Keine Faktoren mehr nötig
+                
+                if probability >= 0.6:
+                    corrected_codes_pdf1.add(target_code)
+                    all_corrections.append({
+                        'original': cleaned_raw,
+                        'corrected': target_code,
+                        'page': page_num,
+                        'probability': probability,
+                        'method': detailed_comment,
+                        'factors': factors,
+                        'correction_type': 'Korrekturmatch'
+                    })
+                    log(f"  OCR-Korrektur: '{cleaned_raw}' -> '{target_code}' (Seite {page_num}, P={probability:.0%})")
+    
+    # 3. Klassifiziere Matches korrekt (Direkter Match vs. Korrekturmatch)
+    flush_log()
+    print("  Klassifiziere Matches basierend auf tatsächlich durchgeführten Korrekturen...")
+    
+    # Sammle alle Codes die Korrekturen benötigten
+    codes_with_corrections = set()
+    for corr_info in (correction_info_pdf1 or []) + (correction_info_pdf2 or []):
+        if corr_info.get('corrections_count', 0) > 0:
+            codes_with_corrections.add(corr_info['corrected'])
+    
+    # OPTIMIERT: Mengen-Differenz statt Branch pro Code - die bereits
+    # dokumentierten Korrekturmatches werden vorab abgespalten und nur die
+    # echten direkten Matches durchlaufen Kontext- und
+    # Wahrscheinlichkeits-Berechnung
+    for code in in_both & codes_with_corrections:
+        # Bereits als Korrekturmatch in correction_info dokumentiert
+        log(f"    Code '{code}' bereits als Korrekturmatch dokumentiert")
+
+    # OPTIMIERT: Echte direkte Matches sind der größte Posten (jeder in
+    # beiden PDFs gefundene Code) - ihre Bewertung läuft als ein einziger
+    # vektorisierter Aufruf über alle Codes statt als skalare Berechnung
+    # pro Code; nur die Kommentare entstehen weiterhin pro Eintrag
+    direct_codes = list(in_both - codes_with_corrections)
+    direct_contexts_pdf1 = [get_validated_context_codes(all_validated_pdf1, code, context_size=1, position_index=validated_pdf1_index) for code in direct_codes]
+    direct_contexts_pdf2 = [get_validated_context_codes(all_validated_pdf2, code, context_size=1, position_index=validated_pdf2_index) for code in direct_codes]
+    zero_corrections = [0] * len(direct_codes)  # 0 Korrekturen in beiden PDFs
+    probabilities, details_list = calculate_precise_probability_batch(
+        direct_codes, zero_corrections, zero_corrections,
+        direct_contexts_pdf1, direct_contexts_pdf2, is_in_both=True
+    )
+
+    for code, probability, context_details in zip(direct_codes, probabilities, details_list):
+        # Generiere Kommentar für echten direkten Match (nur 1 Code vor/nach)
+        detailed_comment = generate_detailed_comment(code, code, 0, 0, context_details, None, None, None)
+
+        all_corrections.append({
+            'original': code,
+            'corrected': code,
+            'page': 'Beide',
+            'probability': probability,
+            'method': detailed_comment,
+            'factors': [],
+            'correction_type': 'Direkter Match'
+        })
+
+        log(f"    Echter direkter Match: '{code}' (P={probability:.0%}) - keine Korrekturen nötig")
+    
+    # Neuer Vergleich nach Korrekturen mit Kategorisierung
+    # OPTIMIERT: corrected_codes_pdf1 ist codes_pdf1 plus die
+    # Korrektur-Treffer - nur die Neuzugänge kategorisieren und die
+    # Partitionen inkrementell aus den oben bereits berechneten
+    # Kategorisierungen ableiten, statt beide Sets komplett neu zu scannen
+    added_categories = categorize_codes_by_type(corrected_codes_pdf1 - codes_pdf1)
+    corrected_pdf1_normal = pdf1_categories['normal'] | added_categories['normal']
+    corrected_pdf1_control = pdf1_categories['control'] | added_categories['control']
+
+    # Normale Codes nach Korrektur
+    normal_in_both_corrected = corrected_pdf1_normal.intersection(pdf2_categories['normal'])
+    normal_only_in_pdf1_corrected = corrected_pdf1_normal.difference(pdf2_categories['normal'])
+    normal_only_in_pdf2_corrected = pdf2_categories['normal'].difference(corrected_pdf1_normal)
+
+    # Steuer-Codes nach Korrektur
+    control_in_both_corrected = corrected_pdf1_control.intersection(pdf2_categories['control'])
+    control_only_in_pdf1_corrected = corrected_pdf1_control.difference(pdf2_categories['control'])
+    control_only_in_pdf2_corrected = pdf2_categories['control'].difference(corrected_pdf1_control)
+    
+    # Kombinierte Ergebnisse
+    in_both_corrected = normal_in_both_corrected | control_in_both_corrected
+    only_in_pdf1_corrected = normal_only_in_pdf1_corrected | control_only_in_pdf1_corrected
+    only_in_pdf2_corrected = normal_only_in_pdf2_corrected | control_only_in_pdf2_corrected
+    
+    flush_log()
+    print(f"Nach Korrektur: Beide={len(in_both_corrected)}, Nur PDF1={len(only_in_pdf1_corrected)}, Nur PDF2={len(only_in_pdf2_corrected)}")
+    print(f"  Normale Codes: Beide={len(normal_in_both_corrected)}, Nur PDF1={len(normal_only_in_pdf1_corrected)}, Nur PDF2={len(normal_only_in_pdf2_corrected)}")
+    print(f"  Steuer-Codes: Beide={len(control_in_both_corrected)}, Nur PDF1={len(control_only_in_pdf1_corrected)}, Nur PDF2={len(control_only_in_pdf2_corrected)}")
+    print(f"Korrekturen durchgeführt: {len([c for c in all_corrections if c['correction_type'] != 'Direkter Match'])}")
+    
+    return {
+        'original': {
+            'in_both': in_both,
+            'only_in_pdf1': only_in_pdf1,
+            'only_in_pdf2': only_in_pdf2,
+            # Kategorisierte Original-Ergebnisse
+            'normal': {
+                'in_both': normal_in_both,
+                'only_in_pdf1': normal_only_in_pdf1,
+                'only_in_pdf2': normal_only_in_pdf2
+            },
+            'control': {
+                'in_both': control_in_both,
+                'only_in_pdf1': control_only_in_pdf1,
+                'only_in_pdf2': control_only_in_pdf2
+            }
+        },
+        'corrected': {
+            'in_both': in_both_corrected,
+            'only_in_pdf1': only_in_pdf1_corrected,
+            'only_in_pdf2': only_in_pdf2_corrected,
+            # Kategorisierte korrigierte Ergebnisse
+            'normal': {
+                'in_both': normal_in_both_corrected,
+                'only_in_pdf1': normal_only_in_pdf1_corrected,
+                'only_in_pdf2': normal_only_in_pdf2_corrected
+            },
+            'control': {
+                'in_both': control_in_both_corrected,
+                'only_in_pdf1': control_only_in_pdf1_corrected,
+                'only_in_pdf2': control_only_in_pdf2_corrected
+            }
+        },
+        'corrections': all_corrections,
+        'legend': corrector.probability_legend
+    }
+
+# Alte Funktion für Rückwärtskompatibilität
+def compare_codes(codes_pdf1, codes_pdf2):
+    """
+    Vergleicht zwei Sets von Codes und bildet die drei Mengen.
+    """
+    print("Vergleiche Codes...")
+    in_both = codes_pdf1.intersection(codes_pdf2)
+    only_in_pdf1 = codes_pdf1.difference(codes_pdf2)
+    only_in_pdf2 = codes_pdf2.difference(codes_pdf1)
+
+    print(f"Ergebnis: Beide={len(in_both)}, Nur PDF1={len(only_in_pdf1)}, Nur PDF2={len(only_in_pdf2)}")
+
     return in_both, only_in_pdf1, only_in_pdf2
\ No newline at end of file
@@ -1,120 +1,203 @@
-# src/gui.py
-import tkinter as tk
-from tkinter import filedialog, messagebox, ttk # ttk für modernere Widgets
-import os
-
-class AppGUI:
-    def __init__(self, master, start_comparison_callback=None):
-        """
-        Initialisiert die GUI.
-
-        Args:
-            master (tk.Tk): Das Haupt-Tkinter-Fenster.
-            start_comparison_callback (function): Die Funktion, die aufgerufen
-                                                 werden soll, wenn der 'Vergleich starten'-Button
-                                                 geklickt wird. Diese Funktion sollte
-                                                 zwei Dateipfade als Argumente erwarten.
-        """
-        self.master = master
-        master.title("PDF Code Comparator")
-        master.geometry("500x300") # Fenstergröße anpassen
-        master.resizable(False, False) # Fenstergröße nicht änderbar machen
-
-        self.start_comparison_callback = start_comparison_callback
-
-        # Styling für modernere Elemente
-        style = ttk.Style()
-        style.theme_use("clam") # Oder "alt", "default", "classic"
-
-        # Frame für die Dateiauswahl
-        file_frame = ttk.LabelFrame(master, text="PDF Dateien auswählen", padding="10")
-        file_frame.pack(pady=10, padx=10, fill="x")
-
-        # --- PDF 1 Auswahl ---
-        self.label_pdf1 = ttk.Label(file_frame, text="PDF 1 (Kaufvertrag):")
-        self.label_pdf1.grid(row=0, column=0, sticky="w", padx=5, pady=5)
-
-        self.entry_pdf1 = ttk.Entry(file_frame, width=40)
-        self.entry_pdf1.grid(row=0, column=1, padx=5, pady=5)
-
-        self.button_pdf1 = ttk.Button(file_frame, text="Durchsuchen", command=self.select_pdf1)
-        self.button_pdf1.grid(row=0, column=2, padx=5, pady=5)
-
-        # --- PDF 2 Auswahl ---
-        self.label_pdf2 = ttk.Label(file_frame, text="PDF 2 (AB):")
-        self.label_pdf2.grid(row=1, column=0, sticky="w", padx=5, pady=5)
-
-        self.entry_pdf2 = ttk.Entry(file_frame, width=40)
-        self.entry_pdf2.grid(row=1, column=1, padx=5, pady=5)
-
-        self.button_pdf2 = ttk.Button(file_frame, text="Durchsuchen", command=self.select_pdf2)
-        self.button_pdf2.grid(row=1, column=2, padx=5, pady=5)
-
-        # Frame für Button und Status
-        action_frame = ttk.Frame(master, padding="10")
-        action_frame.pack(pady=5, padx=10, fill="x")
-
-        # --- Vergleich starten Button ---
-        self.button_start = ttk.Button(action_frame, text="Vergleich starten", command=self.on_start_button_click)
-        self.button_start.pack(pady=5)
-
-        # --- Status / Ergebnis Anzeige ---
-        self.status_label = ttk.Label(master, text="Bereit.", anchor="center") # anchor="center" für Zentrierung
-        self.status_label.pack(pady=10, fill="x")
-
-
-    def select_pdf1(self):
-        """Öffnet Dateidialog zur Auswahl von PDF 1."""
-        filepath = filedialog.askopenfilename(
-            initialdir=".", # Startverzeichnis ('.': aktueller Ordner)
-            title="PDF 1 (Kaufvertrag) auswählen",
-            filetypes=(("PDF files", "*.pdf"), ("All files", "*.*"))
-        )
-        if filepath:
-            self.entry_pdf1.delete(0, tk.END) # Löscht alten Inhalt
-            self.entry_pdf1.insert(0, filepath) # Fügt neuen Pfad ein
-            self.update_status("PDF 1 ausgewählt.")
-
-    def select_pdf2(self):
-        """Öffnet Dateidialog zur Auswahl von PDF 2."""
-        filepath = filedialog.askopenfilename(
-            initialdir=".",
-            title="PDF 2 (Auftragsbestätigung) auswählen",
-            filetypes=(("PDF files", "*.pdf"), ("All files", "*.*"))
-        )
-        if filepath:
-            self.entry_pdf2.delete(0, tk.END)
-            self.entry_pdf2.insert(0, filepath)
-            self.update_status("PDF 2 ausgewählt.")
-
-    def on_start_button_click(self):
-        """Wird aufgerufen, wenn der Start-Button geklickt wird."""
-        pdf1_path = self.entry_pdf1.get()
-        pdf2_path = self.entry_pdf2.get()
-
-        if not pdf1_path or not pdf2_path:
-            messagebox.showwarning("Eingabefehler", "Bitte beide PDF-Dateien auswählen!")
-            return
-
-        if self.start_comparison_callback:
-            # Deaktiviert den Button, um Mehrfachklicks zu verhindern
-            self.button_start.config(state=tk.DISABLED)
-            # Führt den Callback aus (verbunden in main.py)
-            self.start_comparison_callback(pdf1_path, pdf2_path)
-            # Button wird nach Abschluss des Callbacks in main.py wieder aktiviert
-
-    def update_status(self, message):
-        """Aktualisiert den Text im Status-Label."""
-        self.status_label.config(text=message)
-        self.master.update_idletasks() # Sorgt dafür, dass die GUI sofort aktualisiert wird
-
-    def enable_start_button(self):
-         """Aktiviert den Start-Button wieder."""
-         self.button_start.config(state=tk.NORMAL)
-
-# Beispielaufruf (wird nicht ausgeführt, wenn importiert)
-if __name__ == '__main__':
-    root = tk.Tk()
-    # Wenn gui.py direkt gestartet wird, gibt es keinen Callback, daher None
-    app = AppGUI(root, start_comparison_callback=None)
+# src/gui.py
+import tkinter as tk
+from tkinter import filedialog, messagebox, ttk # ttk für modernere Widgets
+import os
+import threading
+
+class AppGUI:
+    def __init__(self, master, start_comparison_callback=None):
+        """
+        Initialisiert die GUI.
+
+        Args:
+            master (tk.Tk): Das Haupt-Tkinter-Fenster.
+            start_comparison_callback (function): Die Funktion, die aufgerufen
+                                                 werden soll, wenn der 'Vergleich starten'-Button
+                                                 geklickt wird. Diese Funktion sollte
+                                                 zwei Dateipfade als Argumente erwarten.
+        """
+        self.master = master
+        master.title("PDF Code Comparator")
+        master.geometry("500x300") # Fenstergröße anpassen
+        master.resizable(False, False) # Fenstergröße nicht änderbar machen
+
+        self.start_comparison_callback = start_comparison_callback
+
+        # OPTIMIERT: Kein theme_use("clam") mehr - der Themenwechsel baut beim
+        # Start sämtliche ttk-Widget-Layouts und Element-Definitionen neu auf.
+        # Das Fenster nutzt nur Standard-Widgets (Label, Entry, Button, Frame),
+        # die im plattformeigenen Default-Theme genauso funktionieren.
+
+        # Frame für die Dateiauswahl
+        file_frame = ttk.LabelFrame(master, text="PDF Dateien auswählen", padding="10")
+        file_frame.pack(pady=10, padx=10, fill="x")
+
+        # --- PDF 1 Auswahl ---
+        self.label_pdf1 = ttk.Label(file_frame, text="PDF 1 (Kaufvertrag):")
+        self.label_pdf1.grid(row=0, column=0, sticky="w", padx=5, pady=5)
+
+        # StringVar statt delete/insert-Paar: ein einziger Tcl-Aufruf pro
+        # Pfad-Update und nur ein Redraw des Widgets
+        self.pdf1_var = tk.StringVar()
+        self.entry_pdf1 = ttk.Entry(file_frame, width=40, textvariable=self.pdf1_var)
+        self.entry_pdf1.grid(row=0, column=1, padx=5, pady=5)
+
+        self.button_pdf1 = ttk.Button(file_frame, text="Durchsuchen", command=self.select_pdf1)
+        self.button_pdf1.grid(row=0, column=2, padx=5, pady=5)
+
+        # --- PDF 2 Auswahl ---
+        self.label_pdf2 = ttk.Label(file_frame, text="PDF 2 (AB):")
+        self.label_pdf2.grid(row=1, column=0, sticky="w", padx=5, pady=5)
+
+        self.pdf2_var = tk.StringVar()
+        self.entry_pdf2 = ttk.Entry(file_frame, width=40, textvariable=self.pdf2_var)
+        self.entry_pdf2.grid(row=1, column=1, padx=5, pady=5)
+
+        self.button_pdf2 = ttk.Button(file_frame, text="Durchsuchen", command=self.select_pdf2)
+        self.button_pdf2.grid(row=1, column=2, padx=5, pady=5)
+
+        # Frame für Button und Status
+        action_frame = ttk.Frame(master, padding="10")
+        action_frame.pack(pady=5, padx=10, fill="x")
+
+        # --- Vergleich starten Button ---
+        self.button_start = ttk.Button(action_frame, text="Vergleich starten", command=self.on_start_button_click)
+        self.button_start.pack(pady=5)
+
+        # --- Status / Ergebnis Anzeige ---
+        self.status_label = ttk.Label(master, text="Bereit.", anchor="center") # anchor="center" für Zentrierung
+        self.status_label.pack(pady=10, fill="x")
+
+        # Gebündelte Status-Updates (siehe update_status)
+        self._pending_status = None
+        self._flush_scheduled = False
+
+        # Entprellte Pfad-Prüfung beim Tippen/Einfügen (siehe _schedule_validate)
+        self._validate_after_id = None
+        self._paths_were_invalid = False
+        self._comparison_running = False
+        self.entry_pdf1.bind('<KeyRelease>', self._schedule_validate)
+        self.entry_pdf2.bind('<KeyRelease>', self._schedule_validate)
+
+
+    def select_pdf1(self):
+        """Öffnet Dateidialog zur Auswahl von PDF 1."""
+        self._ask_pdf_async("PDF 1 (Kaufvertrag) auswählen", self.pdf1_var, "PDF 1 ausgewählt.")
+
+    def select_pdf2(self):
+        """Öffnet Dateidialog zur Auswahl von PDF 2."""
+        self._ask_pdf_async("PDF 2 (Auftragsbestätigung) auswählen", self.pdf2_var, "PDF 2 ausgewählt.")
+
+    def _ask_pdf_async(self, title, path_var, status_msg):
+        """Startet den PDF-Dateidialog in einem kurzlebigen Worker-Thread."""
+        # Der Windows-Shell-Dialog kann auf dem Mainloop mit anderen
+        # COM-initialisierten Bibliotheken verklemmen - der Dialog läuft
+        # deshalb mit eigenem, verstecktem Root in einem Thread und liefert
+        # den Pfad per after(0, ...) in den GUI-Thread zurück
+        def dialog_worker():
+            dialog_root = tk.Tk()
+            dialog_root.withdraw()
+            try:
+                filepath = filedialog.askopenfilename(
+                    parent=dialog_root,
+                    initialdir=".", # Startverzeichnis ('.': aktueller Ordner)
+                    title=title,
+                    filetypes=(("PDF files", "*.pdf"), ("All files", "*.*"))
+                )
+            finally:
+                dialog_root.destroy()
+            if filepath:
+                self.master.after(0, self._apply_selection, path_var, filepath, status_msg)
+
+        threading.Thread(target=dialog_worker, daemon=True).start()
+
+    def _apply_selection(self, path_var, filepath, status_msg):
+        """Trägt den gewählten Pfad ins Eingabefeld ein (läuft im GUI-Thread)."""
+        path_var.set(filepath) # Ersetzt alten Inhalt in einem Tcl-Aufruf
+        self.update_status(status_msg)
+
+    def _schedule_validate(self, event=None):
+        """Plant die Pfad-Prüfung mit 200 ms Entprellung."""
+        # Ohne Entprellung würde jeder Tastendruck einen stat()-Syscall
+        # auslösen - so läuft die Prüfung höchstens ~5x pro Sekunde und
+        # nur einmal pro Tipp-Pause
+        if self._validate_after_id is not None:
+            self.master.after_cancel(self._validate_after_id)
+        self._validate_after_id = self.master.after(200, self._validate_paths)
+
+    def _validate_paths(self):
+        """Prüft die eingetragenen Pfade und meldet fehlende Dateien sofort."""
+        self._validate_after_id = None
+        entries = (("PDF 1", self.pdf1_var.get()), ("PDF 2", self.pdf2_var.get()))
+        invalid = [name for name, path in entries if path and not os.path.exists(path)]
+
+        if invalid:
+            self.update_status(f"WARNUNG: Datei nicht gefunden: {', '.join(invalid)}")
+        elif self._paths_were_invalid:
+            self.update_status("Bereit.")
+        self._paths_were_invalid = bool(invalid)
+
+        # Start-Button nur außerhalb eines laufenden Vergleichs anfassen -
+        # währenddessen verwaltet on_start_button_click/enable_start_button
+        # den Button-Zustand
+        if not self._comparison_running:
+            self.button_start.config(state=tk.DISABLED if invalid else tk.NORMAL)
+
+    def on_start_button_click(self):
+        """Wird aufgerufen, wenn der Start-Button geklickt wird."""
+        pdf1_path = self.pdf1_var.get()
+        pdf2_path = self.pdf2_var.get()
+
+        if not pdf1_path or not pdf2_path:
+            messagebox.showwarning("Eingabefehler", "Bitte beide PDF-Dateien auswählen!")
+            return
+
+        if self.start_comparison_callback:
+            # Deaktiviert den Button, um Mehrfachklicks zu verhindern
+            self._comparison_running = True
+            self.button_start.config(state=tk.DISABLED)
+            # Führt den Callback aus (verbunden in main.py)
+            self.start_comparison_callback(pdf1_path, pdf2_path)
+            # Button wird nach Abschluss des Callbacks in main.py wieder aktiviert
+
+    def update_status(self, message):
+        """Aktualisiert den Text im Status-Label (gebündelt über einen Timer)."""
+        # OPTIMIERT: Status-Updates werden über einen after()-Timer gebündelt -
+        # das bisherige update_idletasks() erzwang einen kompletten Tk-Idle-Flush
+        # pro Meldung; bei Update-Schüben sind es so maximal ~20 Redraws/Sekunde
+        self._pending_status = message
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self.master.after(50, self._flush_status)
+
+    def post_status(self, message):
+        """Thread-sicheres Status-Update aus Worker-Threads."""
+        # Tk ist nicht threadsicher - Worker dürfen keine Widgets anfassen.
+        # after(0, ...) reiht die Meldung in den Mainloop ein, der sie dann
+        # über update_status gebündelt ins Label schreibt.
+        self.master.after(0, self.update_status, message)
+
+    def post_messagebox(self, kind, title, text):
+        """Thread-sicherer Dialog aus Worker-Threads (kind z.B. 'showerror')."""
+        # Gleiches Muster wie post_status: der Dialog wird im Mainloop
+        # geöffnet, nie im aufrufenden Worker-Thread
+        self.master.after(0, lambda: getattr(messagebox, kind)(title, text))
+
+    def _flush_status(self):
+        """Schreibt die zuletzt gesetzte Status-Meldung ins Label."""
+        self._flush_scheduled = False
+        if self._pending_status is not None:
+            self.status_label.config(text=self._pending_status)
+            self._pending_status = None
+
+    def enable_start_button(self):
+         """Aktiviert den Start-Button wieder."""
+         self._comparison_running = False
+         self.button_start.config(state=tk.NORMAL)
+
+# Beispielaufruf (wird nicht ausgeführt, wenn importiert)
+if __name__ == '__main__':
+    root = tk.Tk()
+    # Wenn gui.py direkt gestartet wird, gibt es keinen Callback, daher None
+    app = AppGUI(root, start_comparison_callback=None)
     root.mainloop()
\ No newline at end of file
@@ -1,173 +1,336 @@
-# src/main.py
-import tkinter as tk
-from tkinter import messagebox
-import os
-import sys
-import threading
-import time # Für Zeitmessung der Initialisierung
-
-# Relative Importe (werden im Thread geladen, um GUI-Start zu beschleunigen)
-from . import config
-from . import gui
-# from . import core # Importiert im Thread
-# from . import reporting # Importiert im Thread
-
-master_codes_set = set()
-app_config = None
-# OCRmyPDF wird direkt in core.py verwendet
-
-def start_comparison_process(pdf1_path, pdf2_path, app_gui):
-    """
-    Startet den eigentlichen Vergleichsprozess in einem separaten Thread.
-    Greift auf globale Variablen master_codes_set, app_config, easyocr_reader zu.
-    """
-    # Prüfen, ob Konfiguration und Mastercodes geladen wurden
-    if not app_config or not master_codes_set:
-        app_gui.update_status("FEHLER: Anwendung nicht korrekt initialisiert.")
-        messagebox.showerror("FEHLER", "Anwendung nicht korrekt initialisiert (Konfiguration/Mastercodes fehlen).")
-        app_gui.enable_start_button()
-        return
-
-    app_gui.update_status("Verarbeitung gestartet...")
-
-    # Laden von core und reporting erst im Thread, um die GUI-Initialisierung nicht zu verzögern
-    # und Abhängigkeiten besser zu handhaben (besonders für PyInstaller --onefile)
-    try:
-        from . import core
-        from . import reporting
-    except ImportError as e:
-        print(f"FEHLER: Konnte interne Module (core/reporting) nicht importieren: {e}")
-        app_gui.update_status("FEHLER: Internes Modul fehlt.")
-        messagebox.showerror("FEHLER", f"Internes Modul fehlt: {e}")
-        app_gui.enable_start_button()
-        return
-
-
-    output_dir = os.path.dirname(pdf1_path)
-    report_format = app_config.get('Report', 'format', fallback='xlsx')
-    regex_pattern = app_config.get('Codes', 'regex_pattern', fallback=r"[A-Z0-9]{3,7}")
-    # Tesseract Pfad für OCRmyPDF
-    tesseract_path = app_config.get('General', 'tesseract_path', fallback='')
-    tesseract_is_available = (tesseract_path and os.path.exists(tesseract_path))
-
-
-    def run_in_thread():
-        """Funktion, die im separaten Thread läuft."""
-        try:
-            app_gui.update_status(f"Verarbeite PDF 1 mit Multi-OCR ({os.path.basename(pdf1_path)})...")
-            # Multi-OCR Extraktion mit rohen Codes für Korrektur
-            result_pdf1 = core.extract_codes(pdf1_path, regex_pattern, tesseract_path, master_codes_set, return_raw_codes=True)
-            if result_pdf1 is None or (isinstance(result_pdf1, tuple) and result_pdf1[0] is None): # Fehlerbehandlung aus core.extract_codes
-                app_gui.update_status(f"FEHLER bei Verarbeitung von PDF 1. Siehe Terminal/Log.")
-                messagebox.showerror("Verarbeitungsfehler", f"Fehler bei der Verarbeitung von {os.path.basename(pdf1_path)}. Details in der Konsole.")
-                return # Thread beenden
-
-            app_gui.update_status(f"Verarbeite PDF 2 mit Multi-OCR ({os.path.basename(pdf2_path)})...")
-            # Multi-OCR Extraktion mit rohen Codes für Korrektur
-            codes_pdf1, raw_codes_pdf1, all_text_lines_pdf1, correction_info_pdf1 = result_pdf1
-            
-            result_pdf2 = core.extract_codes(pdf2_path, regex_pattern, tesseract_path, master_codes_set, return_raw_codes=True, is_pdf2=True)
-            if result_pdf2 is None or (isinstance(result_pdf2, tuple) and result_pdf2[0] is None): # Fehlerbehandlung aus core.extract_codes
-                 app_gui.update_status(f"FEHLER bei Verarbeitung von PDF 2. Siehe Terminal/Log.")
-                 messagebox.showerror("Verarbeitungsfehler", f"Fehler bei der Verarbeitung von {os.path.basename(pdf2_path)}. Details in der Konsole.")
-                 return # Thread beenden
-            
-            codes_pdf2, raw_codes_pdf2, all_text_lines_pdf2, correction_info_pdf2 = result_pdf2
-
-            app_gui.update_status("Vergleiche Codes mit intelligenter OCR-Korrektur...")
-            comparison_result = core.compare_codes_with_correction(codes_pdf1, codes_pdf2, raw_codes_pdf1, raw_codes_pdf2, master_codes_set, all_text_lines_pdf1, correction_info_pdf1, correction_info_pdf2)
-            
-            # Extrahiere Ergebnisse
-            in_both = comparison_result['corrected']['in_both']
-            only_in_pdf1 = comparison_result['corrected']['only_in_pdf1'] 
-            only_in_pdf2 = comparison_result['corrected']['only_in_pdf2']
-            corrections = comparison_result['corrections']
-
-            if in_both or only_in_pdf1 or only_in_pdf2 or corrections:
-                report_path = reporting.generate_enhanced_report(
-                    comparison_result['original'], comparison_result['corrected'], 
-                    comparison_result['corrections'], output_dir, report_format,
-                    raw_codes_pdf1, raw_codes_pdf2
-                )
-            else:
-                 report_path = None # Kein Report, wenn absolut keine Codes gefunden/validiert wurden
-
-
-            # --- Ergebnisnachricht (FR-05, IO-03) ---
-            # Abweichungen gefunden, wenn Codes NUR in PDF1 oder NUR in PDF2 sind
-            diff_found = len(only_in_pdf1) > 0 or len(only_in_pdf2) > 0
-
-            if diff_found:
-                result_message = "VERGLEICH ABGESCHLOSSEN: Abweichungen gefunden!"
-                detail_message = f"Details im Report: {report_path}" if report_path else "Report konnte nicht erstellt werden."
-                app_gui.update_status(result_message)
-                messagebox.showwarning("Ergebnis: Abweichungen", f"{result_message}\n{detail_message}")
-            else:
-                # Keine Abweichungen, aber prüfen ob überhaupt Codes gefunden wurden
-                if len(in_both) > 0:
-                    result_message = "VERGLEICH ABGESCHLOSSEN: Keine Abweichungen gefunden (Codes in beiden Dokumenten stimmen überein)."
-                else:
-                    result_message = "VERGLEICH ABGESCHLOSSEN: Keine Codes gefunden oder keine relevanten Codes in der Masterliste."
-
-                detail_message = f"Report erstellt: {report_path}" if report_path else "Kein Report erstellt (keine Codes gefunden/validiert)."
-                app_gui.update_status(result_message)
-                messagebox.showinfo("Ergebnis: Keine Abweichungen", f"{result_message}\n{detail_message}")
-
-
-        except Exception as e:
-            error_message = f"Ein unerwarteter Fehler ist aufgetreten: {e}"
-            print(error_message) # Auch im Terminal ausgeben
-            app_gui.update_status(error_message)
-            messagebox.showerror("Unerwarteter Fehler", error_message)
-        finally:
-            # Wichtig: Button nach Abschluss (egal ob Erfolg oder Fehler) wieder aktivieren
-            app_gui.master.after(100, app_gui.enable_start_button) # Nutzt after(), um im GUI-Thread zu laufen
-
-
-    # Startet die Funktion run_in_thread in einem separaten Thread
-    thread = threading.Thread(target=run_in_thread)
-    thread.start()
-
-
-if __name__ == "__main__":
-    # 1. Konfiguration laden (global speichern)
-    app_config = config.load_config()
-
-    if not app_config or not app_config.sections():
-         messagebox.showerror("FEHLER", "Konfiguration (settings.ini) konnte nicht geladen werden oder ist leer.")
-         sys.exit("Konfiguration fehlt.")
-
-    # 2. Master Codes Liste laden (global speichern)
-    master_codes_set = config.load_master_codes(app_config)
-
-    if not master_codes_set:
-         messagebox.showwarning("WARNUNG", "Master Codes Liste (master_codes.xlsx) konnte nicht geladen werden oder ist leer.\n"
-                                        "Der Vergleich wird keine gültigen Codes finden!")
-         # WARNUNG statt FEHLER, da die App starten soll, aber die Validierung nicht funktioniert
-
-
-    # 3. Tesseract Pfad prüfen (wichtig für OCRmyPDF)
-    tesseract_path_check = app_config.get('General', 'tesseract_path', fallback='')
-    if not tesseract_path_check or not os.path.exists(tesseract_path_check):
-         messagebox.showwarning("Konfigurations-Warnung",
-                                f"Tesseract-Pfad '{tesseract_path_check}' ist ungültig oder nicht gesetzt.\n"
-                                "Die OCR-Verarbeitung mit OCRmyPDF wird fehlschlagen.")
-    else:
-        print(f"Tesseract gefunden: {tesseract_path_check}")
-        # Setze Tesseract-Pfad in PATH für OCRmyPDF
-        tesseract_dir = os.path.dirname(tesseract_path_check)
-        os.environ['PATH'] = tesseract_dir + os.pathsep + os.environ.get('PATH', '')
-        print("Tesseract-Pfad wurde temporär zum System-PATH hinzugefügt.")
-
-
-    # 4. GUI erstellen
-    root = tk.Tk()
-    # Übergeben Sie die Funktion, die beim Button-Klick aufgerufen werden soll.
-    # Die Funktion start_comparison_process greift jetzt direkt auf die globalen
-    # master_codes_set, app_config und easyocr_reader zu.
-    app = gui.AppGUI(root,
-                     start_comparison_callback=lambda p1, p2: start_comparison_process(p1, p2, app))
-
-
-    # 5. GUI starten
+# src/main.py
+import tkinter as tk
+from tkinter import messagebox
+import os
+from collections import namedtuple
+from dataclasses import dataclass
+import sys
+import threading
+import time # Für Zeitmessung der Initialisierung
+import hashlib
+import pickle
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+# Relative Importe (werden im Thread geladen, um GUI-Start zu beschleunigen)
+from . import config
+from . import gui
+# from . import core # Importiert im Thread
+# from . import reporting # Importiert im Thread
+
+# OPTIMIERT: Die pro Vergleich benötigten Konfigurationswerte werden einmal
+# beim Start in einen unveränderlichen Snapshot gezogen - configparser.get
+# läuft sonst bei jedem Klick durch Mapping plus Interpolation, und der
+# Tesseract-Check kostet einen stat()-Syscall pro Aufruf
+_Settings = namedtuple('_Settings', 'report_format regex_pattern tesseract_path tesseract_available ocr_cache_dir skip_if_no_diff')
+
+
+# OPTIMIERT: Statt Modul-Globals wandert der gesamte unveränderliche
+# Anwendungszustand in einen eingefrorenen Kontext, der dem Vergleichslauf
+# explizit übergeben wird - keine dict-Lookups im Modul-Namespace pro
+# Zugriff und keine versehentlichen Mutationen aus Worker-Threads
+@dataclass(frozen=True)
+class AppContext:
+    """Unveränderlicher Anwendungskontext (Masterliste plus Einstellungen)."""
+    master_codes: frozenset
+    settings: _Settings
+
+# OPTIMIERT: core und reporting (samt fitz, cv2, numpy, openpyxl) werden beim
+# Start in einem Hintergrund-Thread importiert, parallel zum GUI-Aufbau -
+# der erste Klick wartete sonst mehrere hundert Millisekunden auf die Importe
+_modules_loaded = threading.Event()
+_core = None
+_reporting = None
+_import_error = None
+
+
+def _preload_heavy_modules():
+    """Importiert die schweren Module nebenläufig zum GUI-Start."""
+    global _core, _reporting, _import_error
+    try:
+        from . import core
+        from . import reporting
+        _core = core
+        _reporting = reporting
+    except ImportError as e:
+        print(f"FEHLER: Konnte interne Module (core/reporting) nicht importieren: {e}")
+        _import_error = e
+    finally:
+        _modules_loaded.set()
+# OCRmyPDF wird direkt in core.py verwendet
+
+def _ocr_cache_path(pdf_path, regex_pattern, codes_set, is_pdf2, ocr_cache_dir):
+    """
+    Pfad der OCR-Cache-Datei für ein PDF: inhaltsadressiert über den Hash von
+    PDF-Bytes, Regex, Masterliste und PDF2-Flag - alles, was das
+    Extraktionsergebnis beeinflusst.
+    """
+    with open(pdf_path, 'rb') as fh:
+        if hasattr(hashlib, 'file_digest'):
+            # Python >= 3.11: liest per readinto in einen festen Puffer,
+            # ohne pro Block ein neues Bytes-Objekt zu allokieren
+            hasher = hashlib.file_digest(fh, 'blake2b')
+        else:
+            hasher = hashlib.blake2b()
+            for block in iter(lambda: fh.read(1 << 16), b''):
+                hasher.update(block)
+    hasher.update(regex_pattern.encode('utf-8'))
+    # Sortiert hashen - der eingebaute str-Hash ist pro Prozess gesalzen
+    # und damit nicht über Läufe hinweg stabil
+    hasher.update('\n'.join(sorted(codes_set)).encode('utf-8'))
+    hasher.update(b'pdf2' if is_pdf2 else b'pdf1')
+
+    cache_dir = ocr_cache_dir or \
+        os.path.join(tempfile.gettempdir(), 'pdf_code_comparator_ocr_cache')
+    os.makedirs(cache_dir, exist_ok=True)
+    return os.path.join(cache_dir, hasher.hexdigest() + '.pkl')
+
+
+def _extraction_ok(result):
+    """True, wenn extract_codes ein vollständiges 4-Tupel geliefert hat."""
+    # Die Fehlerpfade von extract_codes liefern ein 3-Tupel (set(), [], []) -
+    # nur das vollständige Ergebnis mit Korrektur-Infos zählt als Erfolg
+    return isinstance(result, tuple) and len(result) == 4
+
+
+def _extract_codes_cached(core, pdf_path, regex_pattern, tesseract_path, codes_set, ocr_cache_dir, is_pdf2=False):
+    """
+    core.extract_codes mit Festplatten-Cache: identische PDFs überspringen
+    die minutenlange OCR komplett. Das Hashen der PDF-Bytes kostet dagegen
+    nur Millisekunden; Cache-Fehler jeder Art führen einfach zur normalen
+    Extraktion (gleiches Best-effort-Muster wie der Mastercodes-Cache).
+    """
+    try:
+        cache_path = _ocr_cache_path(pdf_path, regex_pattern, codes_set, is_pdf2, ocr_cache_dir)
+    except OSError:
+        cache_path = None
+
+    if cache_path and os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'rb') as fh:
+                result = pickle.load(fh)
+            # Nur vollständige Ergebnisse akzeptieren - ein alter oder
+            # fehlerhafter Eintrag fällt auf die normale Extraktion zurück
+            if _extraction_ok(result):
+                print(f"OCR-Cache-Treffer für {os.path.basename(pdf_path)} - überspringe OCR.")
+                return result
+        except (OSError, pickle.PickleError, EOFError, AttributeError):
+            pass # Unbrauchbarer Cache-Eintrag - normal extrahieren
+
+    result = core.extract_codes(pdf_path, regex_pattern, tesseract_path, codes_set,
+                                return_raw_codes=True, is_pdf2=is_pdf2)
+
+    # Nur erfolgreiche Ergebnisse cachen (Fehler sollen erneut versucht werden)
+    if cache_path and _extraction_ok(result):
+        try:
+            with open(cache_path, 'wb') as fh:
+                pickle.dump(result, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        except OSError:
+            pass
+
+    return result
+
+
+def start_comparison_process(pdf1_path, pdf2_path, app_gui, ctx):
+    """
+    Startet den eigentlichen Vergleichsprozess in einem separaten Thread.
+    Der gesamte benötigte Zustand kommt über den AppContext herein.
+    """
+    # Prüfen, ob Konfiguration und Mastercodes geladen wurden
+    if ctx is None or not ctx.master_codes:
+        app_gui.update_status("FEHLER: Anwendung nicht korrekt initialisiert.")
+        messagebox.showerror("FEHLER", "Anwendung nicht korrekt initialisiert (Konfiguration/Mastercodes fehlen).")
+        app_gui.enable_start_button()
+        return
+
+    app_gui.update_status("Verarbeitung gestartet...")
+
+    # core und reporting wurden beim Start im Hintergrund importiert
+    # (besonders wichtig für PyInstaller --onefile) - hier nur noch auf das
+    # Ergebnis warten; beim ersten Klick ist das in der Regel längst fertig
+    _modules_loaded.wait()
+    core = _core
+    reporting = _reporting
+    if core is None or reporting is None:
+        app_gui.update_status("FEHLER: Internes Modul fehlt.")
+        messagebox.showerror("FEHLER", f"Internes Modul fehlt: {_import_error}")
+        app_gui.enable_start_button()
+        return
+
+
+    output_dir = os.path.dirname(pdf1_path)
+    # Einmalig beim Start ermittelte Konfigurationswerte (siehe _Settings)
+    master_codes_set = ctx.master_codes
+    report_format = ctx.settings.report_format
+    regex_pattern = ctx.settings.regex_pattern
+    # Tesseract Pfad für OCRmyPDF
+    tesseract_path = ctx.settings.tesseract_path
+    tesseract_is_available = ctx.settings.tesseract_available
+    ocr_cache_dir = ctx.settings.ocr_cache_dir
+
+
+    def run_in_thread():
+        """Funktion, die im separaten Thread läuft."""
+        # Tk ist nicht threadsicher: alle Status- und Dialog-Aufrufe aus
+        # diesem Worker-Thread laufen über after(0, ...) im GUI-Thread
+        try:
+            # OPTIMIERT: Beide PDFs sind unabhängig und werden parallel
+            # extrahiert - die eigentliche Arbeit läuft in den
+            # Tesseract-Subprozessen bzw. im Seiten-Prozesspool von
+            # extract_codes, daher genügt hier ein Thread-Pool ohne
+            # zusätzliches Pickling der Argumente
+            app_gui.post_status(f"Verarbeite PDF 1 und PDF 2 parallel mit Multi-OCR "
+                                f"({os.path.basename(pdf1_path)}, {os.path.basename(pdf2_path)})...")
+            # Multi-OCR Extraktion mit rohen Codes für Korrektur
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                future_pdf1 = executor.submit(_extract_codes_cached, core, pdf1_path, regex_pattern, tesseract_path, master_codes_set, ocr_cache_dir)
+                future_pdf2 = executor.submit(_extract_codes_cached, core, pdf2_path, regex_pattern, tesseract_path, master_codes_set, ocr_cache_dir, is_pdf2=True)
+                # Fortschritt pro PDF melden, sobald dessen Extraktion fertig
+                # ist - die Callbacks laufen im Worker-Thread, post_status ist
+                # dafür threadsicher
+                future_pdf1.add_done_callback(
+                    lambda f: f.exception() is None and app_gui.post_status(
+                        f"PDF 1 ({os.path.basename(pdf1_path)}) extrahiert."))
+                future_pdf2.add_done_callback(
+                    lambda f: f.exception() is None and app_gui.post_status(
+                        f"PDF 2 ({os.path.basename(pdf2_path)}) extrahiert."))
+                result_pdf1 = future_pdf1.result()
+                result_pdf2 = future_pdf2.result()
+
+            if not _extraction_ok(result_pdf1): # Fehlerbehandlung aus core.extract_codes
+                app_gui.post_status(f"FEHLER bei Verarbeitung von PDF 1. Siehe Terminal/Log.")
+                app_gui.post_messagebox("showerror", "Verarbeitungsfehler", f"Fehler bei der Verarbeitung von {os.path.basename(pdf1_path)}. Details in der Konsole.")
+                return # Thread beenden
+
+            codes_pdf1, raw_codes_pdf1, all_text_lines_pdf1, correction_info_pdf1 = result_pdf1
+
+            if not _extraction_ok(result_pdf2): # Fehlerbehandlung aus core.extract_codes
+                 app_gui.post_status(f"FEHLER bei Verarbeitung von PDF 2. Siehe Terminal/Log.")
+                 app_gui.post_messagebox("showerror", "Verarbeitungsfehler", f"Fehler bei der Verarbeitung von {os.path.basename(pdf2_path)}. Details in der Konsole.")
+                 return # Thread beenden
+
+            codes_pdf2, raw_codes_pdf2, all_text_lines_pdf2, correction_info_pdf2 = result_pdf2
+
+            app_gui.post_status("Vergleiche Codes mit intelligenter OCR-Korrektur...")
+            comparison_result = core.compare_codes_with_correction(codes_pdf1, codes_pdf2, raw_codes_pdf1, raw_codes_pdf2, master_codes_set, all_text_lines_pdf1, correction_info_pdf1, correction_info_pdf2)
+            
+            # Extrahiere Ergebnisse
+            in_both = comparison_result['corrected']['in_both']
+            only_in_pdf1 = comparison_result['corrected']['only_in_pdf1'] 
+            only_in_pdf2 = comparison_result['corrected']['only_in_pdf2']
+            corrections = comparison_result['corrections']
+
+            # Abweichungen gefunden, wenn Codes NUR in PDF1 oder NUR in PDF2 sind
+            diff_found = len(only_in_pdf1) > 0 or len(only_in_pdf2) > 0
+
+            if in_both or only_in_pdf1 or only_in_pdf2 or corrections:
+                # OPTIMIERT: Optionaler Schnellpfad per [Report] skip_if_no_diff -
+                # stimmen alle Codes überein, wird der (teure) Excel-Report
+                # übersprungen; Läufe mit Abweichungen bekommen ihn immer
+                if diff_found or not ctx.settings.skip_if_no_diff:
+                    report_path = reporting.generate_enhanced_report(
+                        comparison_result['original'], comparison_result['corrected'], 
+                        comparison_result['corrections'], output_dir, report_format,
+                        raw_codes_pdf1, raw_codes_pdf2
+                    )
+                else:
+                    report_path = None
+                    print("Keine Abweichungen - Report übersprungen (skip_if_no_diff=true).")
+            else:
+                 report_path = None # Kein Report, wenn absolut keine Codes gefunden/validiert wurden
+
+
+            # --- Ergebnisnachricht (FR-05, IO-03) ---
+
+            if diff_found:
+                result_message = "VERGLEICH ABGESCHLOSSEN: Abweichungen gefunden!"
+                detail_message = f"Details im Report: {report_path}" if report_path else "Report konnte nicht erstellt werden."
+                app_gui.post_status(result_message)
+                app_gui.post_messagebox("showwarning", "Ergebnis: Abweichungen", f"{result_message}\n{detail_message}")
+            else:
+                # Keine Abweichungen, aber prüfen ob überhaupt Codes gefunden wurden
+                if len(in_both) > 0:
+                    result_message = "VERGLEICH ABGESCHLOSSEN: Keine Abweichungen gefunden (Codes in beiden Dokumenten stimmen überein)."
+                else:
+                    result_message = "VERGLEICH ABGESCHLOSSEN: Keine Codes gefunden oder keine relevanten Codes in der Masterliste."
+
+                detail_message = f"Report erstellt: {report_path}" if report_path else "Kein Report erstellt (keine Codes gefunden/validiert)."
+                app_gui.post_status(result_message)
+                app_gui.post_messagebox("showinfo", "Ergebnis: Keine Abweichungen", f"{result_message}\n{detail_message}")
+
+
+        except Exception as e:
+            error_message = f"Ein unerwarteter Fehler ist aufgetreten: {e}"
+            print(error_message) # Auch im Terminal ausgeben
+            app_gui.post_status(error_message)
+            app_gui.post_messagebox("showerror", "Unerwarteter Fehler", error_message)
+        finally:
+            # Wichtig: Button nach Abschluss (egal ob Erfolg oder Fehler) wieder aktivieren
+            app_gui.master.after(100, app_gui.enable_start_button) # Nutzt after(), um im GUI-Thread zu laufen
+
+
+    # Startet die Funktion run_in_thread in einem separaten Thread
+    thread = threading.Thread(target=run_in_thread)
+    thread.start()
+
+
+if __name__ == "__main__":
+    # 1. Konfiguration laden (global speichern)
+    app_config = config.load_config()
+
+    if not app_config or not app_config.sections():
+         messagebox.showerror("FEHLER", "Konfiguration (settings.ini) konnte nicht geladen werden oder ist leer.")
+         sys.exit("Konfiguration fehlt.")
+
+    # 2. Master Codes Liste laden (global speichern)
+    master_codes_set = config.load_master_codes(app_config)
+
+    if not master_codes_set:
+         messagebox.showwarning("WARNUNG", "Master Codes Liste (master_codes.xlsx) konnte nicht geladen werden oder ist leer.\n"
+                                        "Der Vergleich wird keine gültigen Codes finden!")
+         # WARNUNG statt FEHLER, da die App starten soll, aber die Validierung nicht funktioniert
+
+
+    # 3. Tesseract Pfad prüfen (wichtig für OCRmyPDF)
+    tesseract_path_check = app_config.get('General', 'tesseract_path', fallback='')
+    tesseract_available = bool(tesseract_path_check and os.path.exists(tesseract_path_check))
+
+    # Konfigurations-Snapshot für die Vergleichsläufe (einmal lesen statt
+    # pro Klick durch configparser und os.path.exists)
+    app_settings = _Settings(
+        report_format=app_config.get('Report', 'format', fallback='xlsx'),
+        regex_pattern=app_config.get('Codes', 'regex_pattern', fallback=r"[A-Z0-9]{3,7}"),
+        tesseract_path=tesseract_path_check,
+        tesseract_available=tesseract_available,
+        ocr_cache_dir=app_config.get('General', 'ocr_cache_dir', fallback=''),
+        skip_if_no_diff=app_config.getboolean('Report', 'skip_if_no_diff', fallback=False),
+    )
+
+    if not tesseract_available:
+         messagebox.showwarning("Konfigurations-Warnung",
+                                f"Tesseract-Pfad '{tesseract_path_check}' ist ungültig oder nicht gesetzt.\n"
+                                "Die OCR-Verarbeitung mit OCRmyPDF wird fehlschlagen.")
+    else:
+        print(f"Tesseract gefunden: {tesseract_path_check}")
+        # Setze Tesseract-Pfad in PATH für OCRmyPDF
+        tesseract_dir = os.path.dirname(tesseract_path_check)
+        os.environ['PATH'] = tesseract_dir + os.pathsep + os.environ.get('PATH', '')
+        print("Tesseract-Pfad wurde temporär zum System-PATH hinzugefügt.")
+
+
+    # Schwere Module parallel zum GUI-Aufbau importieren (siehe oben)
+    threading.Thread(target=_preload_heavy_modules, daemon=True).start()
+
+    # Eingefrorener Kontext für alle Vergleichsläufe (siehe AppContext)
+    ctx = AppContext(master_codes=master_codes_set, settings=app_settings)
+
+    # 4. GUI erstellen
+    root = tk.Tk()
+    # Übergeben Sie die Funktion, die beim Button-Klick aufgerufen werden soll.
+    # Die Funktion start_comparison_process bekommt den Kontext explizit mit.
+    app = gui.AppGUI(root,
+                     start_comparison_callback=lambda p1, p2: start_comparison_process(p1, p2, app, ctx))
+
+
+    # 5. GUI starten
     root.mainloop()
\ No newline at end of file
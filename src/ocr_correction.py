@@ -1,5 +1,4 @@
 # src/ocr_correction.py
-import re
 from itertools import product
 from difflib import SequenceMatcher
 
@@ -31,6 +30,15 @@ class OCRCorrector:
             'F': ['E'],           
         }
         
+        # OPTIMIERT: Substitutions-Relation zusätzlich als flache Paar-Menge -
+        # der Check "ist (a, b) eine bekannte Verwechslung?" wird damit zu
+        # einem einzigen Set-Lookup statt zwei verketteten Dict-/Listen-Zugriffen
+        self.substitution_pairs = frozenset(
+            (char, replacement)
+            for char, replacements in self.substitutions.items()
+            for replacement in replacements
+        )
+
         # Wahrscheinlichkeitslegende entsprechend der spezifizierten Logik
         self.probability_legend = {
             "PDF_Code_ohne_Korrektur": "40% - PDF Code in Master-Liste ohne Korrektur",
@@ -52,7 +60,10 @@ class OCRCorrector:
     
     def clean_whitespace(self, code):
         """Entfernt Leerzeichen und andere Whitespace-Zeichen."""
-        return re.sub(r'\s+', '', code.strip())
+        # OPTIMIERT: split/join auf C-Ebene statt re.sub pro Aufruf - die
+        # Funktion läuft pro Token und das Regex-Matching dominierte bei den
+        # kurzen Strings; str.split deckt dieselben Whitespace-Zeichen ab wie \s
+        return ''.join(code.split())
     
     def apply_zero_rule(self, code):
         """Wendet die spezielle 0-Regel an."""
@@ -95,43 +106,30 @@ class OCRCorrector:
         Generiert alle möglichen Varianten eines Codes basierend auf 
         bekannten OCR-Verwechslungen.
         """
-        variants = set()
-        
         # Originaler Code (nach Whitespace-Bereinigung)
         cleaned_code = self.clean_whitespace(code).upper()
-        variants.add(cleaned_code)
-        
-        # Generiere Varianten durch Zeichensubstitution
-        positions_to_substitute = []
-        for i, char in enumerate(cleaned_code):
-            if char in self.substitutions:
-                positions_to_substitute.append((i, char, self.substitutions[char]))
-        
-        # Generiere alle Kombinationen von Substitutionen
-        if positions_to_substitute:
-            # Erstelle alle möglichen Kombinationen
-            substitution_combinations = []
-            for pos, original_char, replacements in positions_to_substitute:
-                substitution_combinations.append([(pos, original_char)] + [(pos, repl) for repl in replacements])
-            
-            # Generiere Kartesisches Produkt aller Kombinationen
-            for combination in product(*substitution_combinations):
-                variant = list(cleaned_code)
-                substitutions_made = []
-                
-                for pos, new_char in combination:
-                    if variant[pos] != new_char:
-                        substitutions_made.append((pos, variant[pos], new_char))
-                        variant[pos] = new_char
-                
-                variant_code = ''.join(variant)
-                
-                # Teste auch mit 0-Regel
-                variant_with_zero_rule = self.apply_zero_rule(variant_code)
-                
-                variants.add(variant_code)
-                variants.add(variant_with_zero_rule)
-        
+
+        # OPTIMIERT: Das Kartesische Produkt läuft direkt über
+        # itertools.product auf Auswahl-Tupeln je Position - statt pro
+        # Kombination eine Zeichenliste zu kopieren und Positionen einzeln
+        # zu patchen, liefert product die fertigen Zeichenfolgen und join
+        # baut den String auf C-Ebene zusammen
+        choices = [
+            (char,) + tuple(self.substitutions[char]) if char in self.substitutions else (char,)
+            for char in cleaned_code
+        ]
+
+        # Keine verwechselbaren Zeichen: nur der Code selbst
+        if all(len(choice) == 1 for choice in choices):
+            return {cleaned_code}
+
+        variants = set()
+        for combination in product(*choices):
+            variant_code = ''.join(combination)
+            variants.add(variant_code)
+            # Teste auch mit 0-Regel
+            variants.add(self.apply_zero_rule(variant_code))
+
         return variants
     
     def find_advanced_whitespace_combinations(self, all_text_lines):